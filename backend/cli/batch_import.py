@@ -0,0 +1,181 @@
+"""
+Imports a directory of bank exports in one run, outside the app.
+
+    python -m backend.cli.batch_import exports/ --map "revolut*.csv=acc_01" --map "ptsb*=acc_02"
+    python -m backend.cli.batch_import exports/ --mapping mapping.json --dry-run
+    python -m backend.cli.batch_import exports/ --auto
+
+Files are matched to accounts by filename pattern (first match wins); the mapping file is
+a JSON object of the same {pattern: account_id} pairs. With --auto, files no pattern
+matches are routed by their detected bank format when exactly one active account uses
+that bank. Every file's format is checked before it is parsed. Exports are parsed in parallel
+worker processes, each account's files are deduplicated as one stream, and every account's
+new rows go to the warehouse in a single load job. Run from the repo root: like the app it
+reads .streamlit/secrets.toml.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from backend.domain import account_logic
+from backend.infrastructure import parsers
+from backend.services import accounts_service, ingestion_service, rules_service
+import config
+
+def match_files(directory, mapping):
+    """Returns ({account_id: [paths]}, [unmatched filenames]) for the files in directory."""
+    by_account, unmatched = {}, []
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path) or filename.startswith("."):
+            continue
+        account_id = account_for_filename(filename, mapping)
+        if account_id is None:
+            unmatched.append(filename)
+        else:
+            by_account.setdefault(account_id, []).append(path)
+    return by_account, unmatched
+
+def account_for_filename(filename, mapping):
+    """The account of the first {pattern: account_id} pattern the filename matches, or None."""
+    return next((acc for pattern, acc in mapping.items() if fnmatch.fnmatch(filename, pattern)), None)
+
+def account_for_format(path, account_data):
+    """The only active account using the file's sniffed bank format, or None."""
+    bank = parsers.sniff_bank_format(path).bank
+    candidates = [
+        account_id for account_id, account in account_data.items()
+        if account.get("active", True) and account.get("bank") == bank
+    ]
+    return candidates[0] if bank is not None and len(candidates) == 1 else None
+
+def route_by_format(directory, filenames, account_data):
+    """
+    Routes files by sniffed bank to the only active account with that bank.
+    Returns ({account_id: [paths]}, [filenames left unrouted]).
+    """
+    routed, unrouted = {}, []
+    for filename in filenames:
+        path = os.path.join(directory, filename)
+        account_id = account_for_format(path, account_data)
+        if account_id is not None:
+            routed.setdefault(account_id, []).append(path)
+        else:
+            unrouted.append(filename)
+    return routed, unrouted
+
+def parse_all(jobs, workers):
+    """Parses [(account_id, bank, path)] in worker processes. Returns {path: frame or exception}."""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: pool.submit(parsers.parse_file, bank, path) for _, bank, path in jobs}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                results[path] = e
+    return results
+
+def _load_mapping(args, parser, required=True):
+    mapping = {}
+    if args.mapping:
+        with open(args.mapping, "r") as f:
+            mapping.update(json.load(f))
+    for item in args.map:
+        pattern, sep, account_id = item.rpartition("=")
+        if not sep or not pattern:
+            parser.error(f"--map expects PATTERN=ACCOUNT_ID, got '{item}'")
+        mapping[pattern] = account_id
+    if required and not mapping:
+        parser.error("Give at least one --map, a --mapping file or --auto.")
+    return mapping
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a directory of bank exports.")
+    parser.add_argument("directory", help="Directory holding the exports")
+    parser.add_argument("--map", action="append", default=[], metavar="PATTERN=ACCOUNT_ID",
+                        help="Filename pattern to account id (repeatable)")
+    parser.add_argument("--mapping", default=None, help="JSON file of {pattern: account_id}")
+    parser.add_argument("--auto", action="store_true",
+                        help="Route unmatched files by detected bank format")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and deduplicate, but load nothing")
+    args = parser.parse_args(argv)
+
+    mapping = _load_mapping(args, parser, required=not args.auto)
+    start = time.perf_counter()
+
+    account_data = accounts_service.load_account_data()
+    unknown = sorted({acc for acc in mapping.values() if acc not in account_data})
+    if unknown:
+        parser.error(f"Unknown accounts: {', '.join(unknown)}")
+
+    by_account, unmatched = match_files(args.directory, mapping)
+    if args.auto:
+        routed, unmatched = route_by_format(args.directory, unmatched, account_data)
+        for account_id, paths in routed.items():
+            by_account.setdefault(account_id, []).extend(paths)
+
+    # Sniff every file first, so one from the wrong bank is never fully parsed
+    jobs, failed = [], []
+    for account_id, paths in by_account.items():
+        bank = account_logic.get_bank_from_account(account_data, account_id)
+        for path in list(paths):
+            try:
+                ingestion_service.check_file_format(bank, path)
+            except ValueError as e:
+                failed.append(f"{os.path.basename(path)}: {e}")
+                paths.remove(path)
+                continue
+            jobs.append((account_id, bank, path))
+    parsed = parse_all(jobs, args.workers)
+
+    table_id = config.get_table_id()
+    category_data = rules_service.get_all_categories()
+    report, new_by_account = {}, {}
+    for account_id, paths in by_account.items():
+        frames = []
+        for path in paths:
+            if isinstance(parsed[path], Exception):
+                failed.append(f"{os.path.basename(path)}: {parsed[path]}")
+            else:
+                frames.append((os.path.basename(path), parsed[path]))
+
+        new_transactions, warnings = ingestion_service.process_account_stream(
+            account_id, table_id, frames, category_data
+        )
+        new_by_account[account_id] = new_transactions
+        report[account_id] = {
+            "files": len(frames),
+            "parsed": sum(len(df) for _, df in frames),
+            "new": len(new_transactions),
+            "warnings": warnings,
+        }
+
+    saved, update_success, error_msg = {}, True, None
+    if not args.dry_run:
+        saved, update_success, error_msg = ingestion_service.save_batch(table_id, new_by_account)
+
+    # --- Summary ---
+    print(f"{'account':<16}{'files':>7}{'parsed':>10}{'new':>9}{'saved':>9}")
+    for account_id, row in report.items():
+        print(f"{account_id:<16}{row['files']:>7}{row['parsed']:>10,}{row['new']:>9,}{saved.get(account_id, 0):>9,}")
+        for warning in row["warnings"]:
+            print(f"    ⚠️ {warning}")
+    for filename in unmatched:
+        print(f"Skipped {filename}: no account pattern matches" + (" and no unique account for its format" if args.auto else ""))
+    for failure in failed:
+        print(f"FAILED {failure}")
+    if args.dry_run:
+        print("Dry run: nothing was loaded.")
+    elif not update_success:
+        print(f"Transactions saved, but the net worth update failed: {error_msg}")
+    print(f"Done in {time.perf_counter() - start:.1f} s")
+
+    return 1 if failed or not update_success else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Watches the import inbox and imports every export that lands there.
+
+    python -m backend.cli.inbox            # poll every INBOX_POLL_SECONDS until stopped
+    python -m backend.cli.inbox --once     # one sweep of the files present, then exit
+
+Files are routed by the [inbox] mapping in secrets.toml ({filename pattern: account_id}),
+else to the only active account using their detected bank format. A background worker
+runs each one through parse -> dedup -> categorize -> load, one file at a time, and moves
+it to archive/YYYY-MM/ (or failed/YYYY-MM/). A sha256 of the contents is recorded per
+imported file, so a re-downloaded copy is archived without importing anything. Rows no
+rule matches are saved uncategorized and show up on the Categorize page as usual.
+"""
+import argparse
+import hashlib
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from backend.cli.batch_import import account_for_filename, account_for_format
+from backend.domain import account_logic
+from backend.infrastructure import parsers, sqlite_store
+from backend.services import accounts_service, ingestion_service, rules_service
+import config
+
+def fingerprint(path):
+    """sha256 of the file contents, read in 1 MB blocks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def move_to(path, directory):
+    """Moves a file into directory/YYYY-MM/, renaming instead of overwriting. Returns the new path."""
+    target_dir = os.path.join(directory, datetime.now().strftime("%Y-%m"))
+    os.makedirs(target_dir, exist_ok=True)
+    base, ext = os.path.splitext(os.path.basename(path))
+    target, n = os.path.join(target_dir, base + ext), 1
+    while os.path.exists(target):
+        target = os.path.join(target_dir, f"{base} ({n}){ext}")
+        n += 1
+    shutil.move(path, target)
+    return target
+
+def _log(message):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+class Inbox:
+    """Polls a directory and feeds finished files to a single worker thread."""
+    def __init__(self, inbox_dir, mapping, db_path):
+        self.inbox_dir = inbox_dir
+        self.mapping = mapping
+        self.db_path = db_path
+        self.queue = queue.Queue()
+        self._sizes = {}       # size seen at the previous poll, per pending file
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def poll(self, wait_until_stable=True):
+        """
+        Queues the files in the inbox. A file still being written (its size changed
+        since the previous poll) waits for the next one, unless wait_until_stable is off.
+        """
+        for entry in os.scandir(self.inbox_dir):
+            if not entry.is_file() or entry.name.startswith(".") or entry.name.endswith((".part", ".crdownload")):
+                continue
+            size = entry.stat().st_size
+            with self._lock:
+                if entry.path in self._queued:
+                    continue
+                stable = self._sizes.get(entry.path) == size
+                self._sizes[entry.path] = size
+                if size > 0 and (stable or not wait_until_stable):
+                    self._queued.add(entry.path)
+                    self.queue.put(entry.path)
+
+    def work(self):
+        """Worker loop: processes queued files until a None arrives."""
+        while True:
+            path = self.queue.get()
+            try:
+                if path is None:
+                    return
+                self.process(path)
+            except Exception as e:
+                _log(f"Unexpected error on {path}: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard(path)
+                    self._sizes.pop(path, None)
+                self.queue.task_done()
+
+    def process(self, path):
+        filename = os.path.basename(path)
+        digest = fingerprint(path)
+        if sqlite_store.is_inbox_file_imported(self.db_path, digest):
+            move_to(path, config.INBOX_ARCHIVE_DIR)
+            _log(f"{filename}: already imported, archived")
+            return
+
+        account_data = accounts_service.load_account_data()
+        account_id = account_for_filename(filename, self.mapping) or account_for_format(path, account_data)
+        try:
+            if account_id is None:
+                raise ValueError("no mapping pattern matches and no single account uses its format")
+            bank = account_logic.get_bank_from_account(account_data, account_id)
+            ingestion_service.check_file_format(bank, path)
+
+            table_id = config.get_table_id()
+            new_transactions, warnings = ingestion_service.process_account_stream(
+                account_id, table_id, [(filename, parsers.parse_file(bank, path))], rules_service.get_all_categories()
+            )
+            saved, update_success, error_msg = ingestion_service.save_batch(table_id, {account_id: new_transactions})
+        except Exception as e:
+            sqlite_store.record_inbox_file(self.db_path, digest, filename, account_id, "failed", message=str(e))
+            move_to(path, config.INBOX_FAILED_DIR)
+            _log(f"{filename}: failed ({e}), moved to failed/")
+            return
+
+        rows = saved.get(account_id, 0)
+        sqlite_store.record_inbox_file(
+            self.db_path, digest, filename, account_id, "imported", rows=rows, message="; ".join(warnings) or None
+        )
+        move_to(path, config.INBOX_ARCHIVE_DIR)
+        _log(f"{filename}: {rows} new rows into {account_id}, archived")
+        for warning in warnings:
+            _log(f"    ⚠️ {warning}")
+        if not update_success:
+            _log(f"    Net worth update failed: {error_msg}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import exports dropped into the inbox directory.")
+    parser.add_argument("--once", action="store_true", help="Import the files present now, then exit")
+    parser.add_argument("--interval", type=float, default=config.INBOX_POLL_SECONDS, help="Seconds between polls")
+    args = parser.parse_args(argv)
+
+    for directory in (config.INBOX_DIR, config.INBOX_ARCHIVE_DIR, config.INBOX_FAILED_DIR):
+        os.makedirs(directory, exist_ok=True)
+    inbox = Inbox(config.INBOX_DIR, config.INBOX_MAPPING, accounts_service.get_db_path())
+    worker = threading.Thread(target=inbox.work, name="inbox-worker", daemon=True)
+    worker.start()
+
+    if args.once:
+        inbox.poll(wait_until_stable=False)
+        inbox.queue.put(None)
+        worker.join()
+        return 0
+
+    _log(f"Watching {config.INBOX_DIR} every {args.interval:g} s")
+    try:
+        while True:
+            inbox.poll()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        # Let the file in progress finish; queued files are picked up again on the next start
+        _log("Stopping after the current file...")
+        while not inbox.queue.empty():
+            try:
+                inbox.queue.get_nowait()
+                inbox.queue.task_done()
+            except queue.Empty:
+                break
+        inbox.queue.put(None)
+        worker.join()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import pandas as pd
 from datetime import datetime
+from backend.domain import fx_logic
 
 def create_account_map(raw_data):
     """
@@ -16,9 +17,10 @@ def create_account_map(raw_data):
             
     return id_name_map
 
-def transform_to_dataframe(raw_data, show_archived):
+def transform_to_dataframe(raw_data, show_archived, default_currency="EUR"):
     """
     Transforms data into a flat DataFrame for the UI.
+    Accounts without a 'currency' are assumed to be in default_currency.
     """
     rows = []
     for acc_id, details in raw_data.items():
@@ -27,10 +29,14 @@ def transform_to_dataframe(raw_data, show_archived):
         rows.append(row)
     
     if not rows:
-        return pd.DataFrame(columns=["account_name", "bank", "balance", "last_updated", "account_id"])
+        return pd.DataFrame(columns=["account_name", "bank", "currency", "balance", "last_updated", "account_id"])
         
     df = pd.DataFrame(rows)
 
+    if "currency" not in df.columns:
+        df["currency"] = default_currency
+    df["currency"] = df["currency"].fillna(default_currency)
+
     # Filter out archived accounts unless specified
     if not show_archived:
         df = df[df["active"] == True]
@@ -53,10 +59,18 @@ def set_account_balance(data, acc_id, new_balance):
     return False
 
 def calculate_total_balance(df):
-    """Calculates total balance from the dataframe."""
+    """
+    Calculates total balance from the dataframe.
+    Uses the base-currency balances when they've been converted ('balance_base').
+    Returns (total, unconverted): accounts with no rate to the base currency are left out of
+    the total and listed in `unconverted` (rows of df), rather than silently counted as 0.
+    """
     if df.empty:
-        return 0.0
-    return df['balance'].sum()
+        return 0.0, df
+    if 'balance_base' in df.columns:
+        unconverted = df[df['balance_base'].isna() & df['balance'].notna()]
+        return float(df['balance_base'].sum()), unconverted
+    return float(df['balance'].sum()), df.iloc[0:0]
 
 def get_bank_from_account(account_data, account_id):
     """Retrieves the bank name for a given account."""
@@ -66,4 +80,25 @@ def get_bank_from_account(account_data, account_id):
 def get_account_name(account_data, account_id):
     """Retrieves the account name for a given account."""
     name = account_data.get(account_id, {}).get("account_name", None)
-    return name
\ No newline at end of file
+    return name
+
+def convert_net_worth_history(wide_df, account_currencies, rates_df, base_currency):
+    """
+    Converts a daily per-account history (indexed by date, plus 'net_worth') to the base
+    currency, using each day's rate rather than the rate of the snapshot.
+    account_currencies: {account_id: currency}. Recomputes 'net_worth' from the converted columns.
+    """
+    accounts = [c for c in wide_df.columns if c != "net_worth"]
+    if wide_df.empty or not accounts:
+        return wide_df
+
+    long = wide_df[accounts].rename_axis("date").reset_index().melt(
+        id_vars="date", var_name="account_id", value_name="balance"
+    )
+    long["currency"] = long["account_id"].map(account_currencies).fillna(base_currency)
+    long = fx_logic.convert_to_base(long, ["balance"], rates_df, base_currency)
+
+    converted = long.pivot(index="date", columns="account_id", values="balance_base")[accounts]
+    converted.columns.name = None
+    converted["net_worth"] = converted.sum(axis=1)
+    return converted
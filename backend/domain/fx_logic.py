@@ -0,0 +1,43 @@
+import pandas as pd
+
+def fx_ticker(currency, base_currency):
+    """Provider symbol for the rate quoted as base units per one unit of currency (e.g. USDEUR=X)."""
+    return f"{currency.upper()}{base_currency.upper()}=X"
+
+def convert_to_base(df, amount_cols, rates_df, base_currency, date_col="date", currency_col="currency"):
+    """
+    Converts amount columns to the base currency with an as-of join on the rates:
+    each row uses the latest rate published on or before its date, per currency.
+    Rows already in the base currency use a rate of 1. Rows dated before a currency's first
+    known rate use that first rate; currencies with no rates at all get NaN.
+    Adds '<col>_base' columns and an 'fx_rate' column. Returns a new DataFrame in the original row order.
+
+    rates_df: columns date, currency, rate (base units per one unit of currency).
+    """
+    out = df.copy()
+    out["_row"] = range(len(out))
+    out["_date"] = pd.to_datetime(out[date_col]).astype("datetime64[ns]")
+
+    if rates_df is not None and not rates_df.empty:
+        rates = rates_df[["date", "currency", "rate"]].rename(columns={"date": "_date", "currency": currency_col})
+        rates["_date"] = pd.to_datetime(rates["_date"]).astype("datetime64[ns]")
+        rates = rates.sort_values("_date")
+
+        merged = pd.merge_asof(
+            out.sort_values("_date"), rates,
+            on="_date", by=currency_col, direction="backward"
+        )
+        # merge_asof needs non-null keys: rows dated before the first rate fall back to it
+        missing = merged["rate"].isna()
+        if missing.any():
+            first_rates = rates.groupby(currency_col)["rate"].first()
+            merged.loc[missing, "rate"] = merged.loc[missing, currency_col].map(first_rates)
+        out = merged.sort_values("_row")
+    else:
+        out["rate"] = float("nan")
+
+    out["fx_rate"] = out["rate"].where(out[currency_col] != base_currency, 1.0)
+    for col in amount_cols:
+        out[f"{col}_base"] = out[col] * out["fx_rate"]
+
+    return out.drop(columns=["_row", "_date", "rate"]).set_index(df.index)
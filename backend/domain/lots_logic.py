@@ -0,0 +1,232 @@
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+
+class LotLedger:
+    """
+    Tax lots for vested shares.
+
+    Lots live in parallel numpy arrays (grown by doubling) and the open lots are queued
+    in a deque of lot indices, so FIFO consumption only touches the head of the queue.
+    Realized gains are accumulated as sales are applied; unrealized gains are one
+    vectorized dot product over the open quantities.
+
+    Lots are identified by a stable key, the vest date ("2024-03-25"), not by their
+    position: sales that name lots keep pointing at the same shares when the ledger is
+    rebuilt. Every method holds the ledger's lock, so one instance can be shared by sessions.
+    """
+    def __init__(self, capacity=64):
+        self._lock = threading.RLock()
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self._n = 0
+        self._keys = []
+        self._index = {}
+        self._dates = np.empty(capacity, dtype="datetime64[D]")
+        self._qty = np.zeros(capacity)
+        self._open = np.zeros(capacity)
+        self._basis = np.zeros(capacity)
+        self._fifo = deque()
+        self._realized = []
+        self.realized_gain = 0.0
+        self._applied_events = []
+
+    # --- Appending events ---
+    def add_vest(self, date, qty, price, key=None):
+        """
+        Creates a lot of qty shares with a cost basis of the vest-date price.
+        Returns its key: `key`, by default the vest date (with "#2", "#3"... for more lots that day).
+        """
+        with self._lock:
+            if self._n == len(self._qty):
+                self._grow()
+
+            base_key = key or pd.Timestamp(date).strftime("%Y-%m-%d")
+            key, n = base_key, 1
+            while key in self._index:
+                n += 1
+                key = f"{base_key}#{n}"
+
+            lot_id = self._n
+            self._dates[lot_id] = np.datetime64(pd.Timestamp(date).date(), "D")
+            self._qty[lot_id] = qty
+            self._open[lot_id] = qty
+            self._basis[lot_id] = price
+            self._fifo.append(lot_id)
+            self._keys.append(key)
+            self._index[key] = lot_id
+            self._n += 1
+            return key
+
+    def _resolve(self, lot_key):
+        """Position of a lot key, or None. Plain integers are positions (sales recorded before keys)."""
+        if isinstance(lot_key, (int, np.integer)) and not isinstance(lot_key, bool):
+            return int(lot_key) if 0 <= lot_key < self._n else None
+        return self._index.get(str(lot_key))
+
+    def add_sale(self, date, qty, price, lot_ids=None):
+        """
+        Sells qty shares at price. Lots are consumed FIFO, or in the given order when lot keys
+        are passed (specific identification). Returns the realized gain of this sale.
+        """
+        with self._lock:
+            return self._add_sale(date, qty, price, lot_ids)
+
+    def _add_sale(self, date, qty, price, lot_ids):
+        # Validate before touching any lot, so a rejected sale leaves the ledger unchanged
+        if qty > self.open_units + 1e-9:
+            raise ValueError(f"Cannot sell {qty} shares: only {self.open_units} are held.")
+        if lot_ids:
+            lot_ids = [i for i in (self._resolve(key) for key in dict.fromkeys(lot_ids)) if i is not None]
+            available = float(self._open[lot_ids].sum()) if lot_ids else 0.0
+            if qty > available + 1e-9:
+                raise ValueError(f"Selected lots only hold {available} of the {qty} shares to sell.")
+
+        remaining = qty
+        gain = 0.0
+        candidates = lot_ids if lot_ids else self._fifo
+
+        # The queue isn't mutated while iterating; exhausted lots are popped afterwards
+        for lot_id in candidates:
+            if remaining <= 1e-9:
+                break
+            if lot_id >= self._n or self._open[lot_id] <= 0:
+                continue
+
+            take = min(remaining, self._open[lot_id])
+            self._open[lot_id] -= take
+            remaining -= take
+
+            lot_gain = take * (price - self._basis[lot_id])
+            gain += lot_gain
+            self._realized.append((pd.Timestamp(date), self._keys[lot_id], take, take * price, take * self._basis[lot_id], lot_gain))
+
+        # Drop exhausted lots from the head of the FIFO queue
+        while self._fifo and self._open[self._fifo[0]] <= 1e-9:
+            self._fifo.popleft()
+
+        self.realized_gain += float(gain)
+        return float(gain)
+
+    def sync(self, events):
+        """
+        Brings the ledger in line with a chronological event list.
+        Events are tuples: ("vest", date, qty, price, None) or ("sale", date, qty, price, lot_ids).
+        If the already-applied events are an unchanged prefix, only the new tail is applied;
+        otherwise (a past event was edited or inserted) the ledger is rebuilt.
+        Returns True if the ledger had to be rebuilt.
+        """
+        with self._lock:
+            return self._sync(events)
+
+    def _sync(self, events):
+        n_applied = len(self._applied_events)
+        rebuilt = events[:n_applied] != self._applied_events
+        if rebuilt:
+            self._reset(max(64, len(self._qty)))
+            n_applied = 0
+
+        for kind, date, qty, price, lot_ids in events[n_applied:]:
+            if kind == "vest":
+                self.add_vest(date, qty, price)
+            else:
+                self.add_sale(date, qty, price, lot_ids)
+            self._applied_events.append((kind, date, qty, price, lot_ids))
+
+        return rebuilt
+
+    # --- Reading ---
+    @property
+    def open_units(self):
+        with self._lock:
+            return float(self._open[:self._n].sum())
+
+    def unrealized_gain(self, price):
+        """Gain if all open lots were sold at price."""
+        with self._lock:
+            n = self._n
+            return float(np.dot(self._open[:n], price - self._basis[:n]))
+
+    def summary(self, price):
+        with self._lock:
+            return self._summary(price)
+
+    def _summary(self, price):
+        n = self._n
+        return {
+            "open_units": self.open_units,
+            "cost_basis": float(np.dot(self._open[:n], self._basis[:n])),
+            "market_value": self.open_units * price,
+            "unrealized_gain": self.unrealized_gain(price),
+            "realized_gain": self.realized_gain
+        }
+
+    def lots_frame(self, price=None):
+        """All lots with their open quantity (and unrealized gain if a price is given)."""
+        with self._lock:
+            return self._lots_frame(price)
+
+    def _lots_frame(self, price):
+        n = self._n
+        df = pd.DataFrame({
+            "lot_id": self._keys[:n],
+            "vest_date": pd.to_datetime(self._dates[:n]),
+            "units": self._qty[:n],
+            "open_units": self._open[:n],
+            "cost_basis": self._basis[:n]
+        })
+        if price is not None:
+            df["unrealized_gain"] = df["open_units"] * (price - df["cost_basis"])
+        return df
+
+    def realized_frame(self):
+        """One row per (sale, lot) match."""
+        with self._lock:
+            realized = list(self._realized)
+        return pd.DataFrame(
+            realized,
+            columns=["sale_date", "lot_id", "units", "proceeds", "cost", "gain"]
+        )
+
+    def _grow(self):
+        capacity = len(self._qty) * 2
+        self._dates = np.resize(self._dates, capacity)
+        for name in ("_qty", "_open", "_basis"):
+            grown = np.zeros(capacity)
+            grown[:self._n] = getattr(self, name)[:self._n]
+            setattr(self, name, grown)
+
+def build_ledger_events(schedule_df, prices_df, sales, withholding_rate=0.0, as_of=None):
+    """
+    Turns the vest schedule and recorded sales into the chronological event list for LotLedger.sync.
+    Each past vest becomes a lot of the shares left after sell-to-cover, priced at the
+    vest-date close (as-of join, so weekend vests take the previous close).
+    Vests sort before sales on the same day.
+    """
+    as_of = pd.Timestamp(as_of or pd.Timestamp("today")).normalize()
+    events = []
+
+    if schedule_df is not None and not schedule_df.empty and prices_df is not None and not prices_df.empty:
+        vests = schedule_df[["Date", "GSUs"]].copy()
+        vests["Date"] = pd.to_datetime(vests["Date"]).astype("datetime64[ns]")
+        vests = vests[(vests["Date"] <= as_of) & (vests["GSUs"] > 0)].sort_values("Date")
+
+        prices = prices_df[["Close"]].rename_axis("Date").reset_index() if "Date" not in prices_df.columns else prices_df[["Date", "Close"]]
+        prices = prices.assign(Date=pd.to_datetime(prices["Date"]).astype("datetime64[ns]")).sort_values("Date")
+
+        vests = pd.merge_asof(vests, prices, on="Date", direction="backward").dropna(subset=["Close"])
+        withheld = np.ceil(vests["GSUs"] * withholding_rate - 1e-9)
+        vests["net_units"] = vests["GSUs"] - withheld
+
+        for date, units, price in zip(vests["Date"], vests["net_units"], vests["Close"]):
+            if units > 0:
+                events.append(("vest", pd.Timestamp(date), float(units), float(price), None))
+
+    for sale in sales or []:
+        lot_ids = tuple(sale["lot_ids"]) if sale.get("lot_ids") else None
+        events.append(("sale", pd.Timestamp(sale["date"]), float(sale["units"]), float(sale["price"]), lot_ids))
+
+    events.sort(key=lambda ev: (ev[1], 0 if ev[0] == "vest" else 1))
+    return events
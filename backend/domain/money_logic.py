@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Transaction amounts are carried as integer cents (int64) from the parsers through the dedup
+# logic, so equality joins and running balances are exact. They're converted back to
+# euros (float) only at the edges: the UI and the FLOAT64 columns of the warehouse.
+MONEY_COLUMNS = ["debit", "credit", "balance", "original_debit"]
+
+def to_cents(values):
+    """
+    Converts amounts in euros (scalar, Series or array) to integer cents,
+    rounding half away from zero. Missing values stay missing (nullable Int64 for Series).
+    """
+    if isinstance(values, pd.Series):
+        numeric = pd.to_numeric(values, errors="coerce").astype(float)
+        cents = np.sign(numeric) * np.floor(np.abs(numeric) * 100 + 0.5)
+        if cents.isna().any():
+            return cents.astype("Int64")
+        return cents.astype("int64")
+
+    if values is None or (np.isscalar(values) and pd.isna(values)):
+        return None
+    if np.isscalar(values):
+        value = float(values)
+        return int(np.sign(value) * np.floor(abs(value) * 100 + 0.5))
+
+    numeric = np.asarray(values, dtype=float)
+    return (np.sign(numeric) * np.floor(np.abs(numeric) * 100 + 0.5)).astype(np.int64)
+
+def from_cents(cents):
+    """Converts integer cents (scalar, Series or array) back to euros as floats."""
+    if isinstance(cents, pd.Series):
+        return cents.astype("Float64").astype(float) / 100
+    if cents is None or (np.isscalar(cents) and pd.isna(cents)):
+        return None
+    if np.isscalar(cents):
+        return int(cents) / 100
+    return np.asarray(cents, dtype=float) / 100
+
+def format_cents(cents):
+    """Exact decimal string for cents (e.g. -1234 -> '-12.34'), for SQL literals."""
+    cents = int(cents)
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+def frame_to_cents(df, columns=MONEY_COLUMNS):
+    """Returns a copy of df with its money columns (those present) in integer cents."""
+    df = df.copy()
+    for col in columns:
+        if col in df.columns:
+            df[col] = to_cents(df[col])
+    return df
+
+def frame_from_cents(df, columns=MONEY_COLUMNS):
+    """Returns a copy of df with its money columns (those present) back in euros."""
+    df = df.copy()
+    for col in columns:
+        if col in df.columns:
+            df[col] = from_cents(df[col])
+    return df
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 
 def _prepare_event_list(events_df):
     """Helper to clean and sort events for processing."""
@@ -140,4 +141,253 @@ def calculate_snapshot_metrics(sim_df, events_df, default_payment):
             "cumulative_principal": snapshot['cumulative_principal'],
             "monthly_overpayment": current_overpayment
         }
-    return None
\ No newline at end of file
+    return None
+
+SCHEDULE_COLUMNS = [
+    "month", "balance", "monthly_total_paid", "monthly_principal",
+    "monthly_interest", "cumulative_principal", "cumulative_interest"
+]
+
+def flatten_mortgage_events(terms_df):
+    """
+    Unnests the per-mortgage 'events' arrays into one long DataFrame
+    keyed by mortgage_name.
+    """
+    columns = ["mortgage_name", "date", "event_type", "value"]
+    if terms_df is None or terms_df.empty or "events" not in terms_df.columns:
+        return pd.DataFrame(columns=columns)
+
+    rows = []
+    for name, raw_events in zip(terms_df["mortgage_name"], terms_df["events"]):
+        if raw_events is None or len(raw_events) == 0:
+            continue
+        for ev in raw_events:
+            rows.append({"mortgage_name": name, **dict(ev)})
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows)[columns]
+
+def _payment_dates(starts, n_months):
+    """
+    (n_loans, n_months) grid of monthly payment dates from each start date, built with
+    array arithmetic. Matches the iterative DateOffset of the single-loan engine, where a
+    clamped day sticks (Jan 31 -> Feb 28 -> Mar 28): the day is the running minimum of the
+    start day and the lengths of the months passed.
+    """
+    starts = pd.DatetimeIndex(starts)
+    first_month = starts.to_numpy().astype("datetime64[M]")
+    months = first_month[:, None] + np.arange(n_months)
+    days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(int)
+    day = np.minimum.accumulate(np.minimum(starts.day.to_numpy()[:, None], days_in_month), axis=1)
+    time_of_day = (starts.to_numpy() - starts.normalize().to_numpy())[:, None]
+    return (months.astype("datetime64[D]") + (day - 1)).astype("datetime64[ns]") + time_of_day
+
+def _estimated_term(balance, monthly_rate, payment):
+    """Months to pay off each loan at its current payment, ignoring events (annuity formula)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        term = np.where(
+            monthly_rate > 0,
+            -np.log1p(-balance * monthly_rate / payment) / np.log1p(monthly_rate),
+            balance / payment
+        )
+    return np.nan_to_num(term, nan=0.0, posinf=0.0)
+
+def _event_steps(events, month_grid):
+    """
+    {step: (loan indices, values, event types)}: every event mapped to the step at which
+    the engine applies it, the first payment date on or after the event date.
+    """
+    horizon = month_grid.shape[1]
+    steps = np.array([
+        np.searchsorted(month_grid[i], d, side="left") for i, d in zip(events["loan_idx"], events["date"])
+    ], dtype=int)
+    by_step = {}
+    for step in np.unique(steps[steps < horizon]):
+        at = steps == step
+        by_step[int(step)] = (events["loan_idx"][at], events["value"][at], events["event_type"][at])
+    return by_step
+
+def calculate_amortization_schedules(loans_df, events_df=None, max_months=1200):
+    """
+    Batch version of calculate_amortization_schedule.
+    Simulates every loan in loans_df at once: the month loop runs a single time and
+    each step is a vectorized update across all loans, instead of one Python loop per loan.
+    Payment dates are generated only as far as the longest term needs (extended if
+    events lengthen a loan), and the rows are assembled into one DataFrame at the end.
+
+    loans_df needs: mortgage_name, principal, annual_rate_pct, monthly_payment, start_date
+    (and optionally monthly_extra_payment).
+    events_df needs: mortgage_name, date, event_type, value.
+    Returns a long DataFrame with a 'mortgage_name' column plus the usual schedule columns.
+    """
+    if loans_df is None or loans_df.empty:
+        return pd.DataFrame(columns=["mortgage_name"] + SCHEDULE_COLUMNS)
+
+    loans = loans_df.reset_index(drop=True)
+    names = loans["mortgage_name"].to_numpy()
+    n_loans = len(loans)
+
+    # copy=True: these are updated in place, and under copy-on-write to_numpy()
+    # can return a read-only view of the frame's buffer
+    balance = pd.to_numeric(loans["principal"], errors="coerce").fillna(0).to_numpy(dtype=float, copy=True)
+    monthly_rate = pd.to_numeric(loans["annual_rate_pct"], errors="coerce").fillna(0).to_numpy(dtype=float) / 100 / 12
+    payment = pd.to_numeric(loans["monthly_payment"], errors="coerce").fillna(0).to_numpy(dtype=float, copy=True)
+    if "monthly_extra_payment" in loans.columns:
+        extra = pd.to_numeric(loans["monthly_extra_payment"], errors="coerce").fillna(0).to_numpy(dtype=float, copy=True)
+    else:
+        extra = np.zeros(n_loans)
+
+    # Same guards as the single-loan engine: invalid inputs or payments that
+    # never cover the interest produce an empty schedule for that loan.
+    active = (balance > 0) & (payment > 0) & (balance * monthly_rate < payment + extra)
+    if not active.any():
+        return pd.DataFrame(columns=["mortgage_name"] + SCHEDULE_COLUMNS)
+
+    starts = pd.to_datetime(loans["start_date"])
+    events = None
+    last_event_step = 0
+    if events_df is not None and not events_df.empty:
+        ev = events_df.dropna(subset=["mortgage_name", "date", "event_type", "value"]).copy()
+        ev["date"] = pd.to_datetime(ev["date"])
+        ev = ev.sort_values("date", kind="stable")
+        ev["loan_idx"] = ev["mortgage_name"].map({name: i for i, name in enumerate(names)})
+        ev = ev.dropna(subset=["loan_idx"])
+        if not ev.empty:
+            events = {
+                "loan_idx": ev["loan_idx"].to_numpy(dtype=int),
+                "date": ev["date"].to_numpy(dtype="datetime64[ns]"),
+                "value": ev["value"].to_numpy(dtype=float),
+                "event_type": ev["event_type"].to_numpy(),
+            }
+            months_to_event = (
+                (ev["date"].dt.year - starts.iloc[events["loan_idx"]].dt.year.to_numpy()) * 12
+                + ev["date"].dt.month - starts.iloc[events["loan_idx"]].dt.month.to_numpy()
+            )
+            last_event_step = int(months_to_event.max()) + 1
+
+    # Dates only as far as the longest loan (or the last event) reaches, plus a margin
+    term = _estimated_term(balance[active], monthly_rate[active], payment[active] + extra[active])
+    horizon = int(min(max_months, max(np.ceil(term.max()), last_event_step) + 12))
+    month_grid = _payment_dates(starts, horizon)
+    steps_events = _event_steps(events, month_grid) if events is not None else {}
+
+    cumulative_interest = np.zeros(n_loans)
+    cumulative_principal = np.zeros(n_loans)
+    parts = {col: [] for col in ["loan_idx", "step"] + SCHEDULE_COLUMNS[1:]}
+
+    for step in range(max_months):
+        if step == horizon:
+            # Events lengthened a loan past the estimate: extend the dates
+            horizon = min(max_months, horizon * 2)
+            month_grid = _payment_dates(starts, horizon)
+            steps_events = _event_steps(events, month_grid) if events is not None else {}
+
+        group = steps_events.get(step)
+        if group is not None:
+            idx, vals, etype = group
+            # Events only touch loans that are still running
+            running = active[idx]
+            idx, vals, etype = idx[running], vals[running], etype[running]
+
+            lump = etype == "Lump Sum Payment"
+            np.subtract.at(balance, idx[lump], vals[lump])
+            np.add.at(cumulative_principal, idx[lump], vals[lump])
+            # Events are sorted by date, so on assignment the latest one wins
+            new_payment = etype == "New Monthly Payment"
+            payment[idx[new_payment]] = vals[new_payment]
+            new_rate = etype == "New Interest Rate"
+            monthly_rate[idx[new_rate]] = vals[new_rate] / 100 / 12
+
+        active &= balance > 0.01
+        if not active.any():
+            break
+
+        rows = np.flatnonzero(active)
+        interest_payment = balance[rows] * monthly_rate[rows]
+        principal_payment = (payment[rows] + extra[rows]) - interest_payment
+
+        # Handle final payment (don't overpay)
+        final = balance[rows] < principal_payment
+        principal_payment = np.where(final, balance[rows], principal_payment)
+        payment[rows] = np.where(final, principal_payment + interest_payment, payment[rows])
+
+        balance[rows] -= principal_payment
+        cumulative_interest[rows] += interest_payment
+        cumulative_principal[rows] += principal_payment
+
+        parts["loan_idx"].append(rows)
+        parts["step"].append(np.full(len(rows), step))
+        parts["balance"].append(balance[rows])
+        parts["monthly_total_paid"].append(payment[rows] + extra[rows])
+        parts["monthly_principal"].append(principal_payment)
+        parts["monthly_interest"].append(interest_payment)
+        parts["cumulative_principal"].append(cumulative_principal[rows])
+        parts["cumulative_interest"].append(cumulative_interest[rows])
+
+    if not parts["loan_idx"]:
+        return pd.DataFrame(columns=["mortgage_name"] + SCHEDULE_COLUMNS)
+
+    columns = {col: np.concatenate(arrays) for col, arrays in parts.items()}
+    loan_idx, step = columns.pop("loan_idx"), columns.pop("step")
+    columns["month"] = month_grid[loan_idx, step]
+    schedules = pd.DataFrame({"mortgage_name": names[loan_idx], **{col: columns[col] for col in SCHEDULE_COLUMNS}})
+    return schedules.sort_values(["mortgage_name", "month"], kind="stable").reset_index(drop=True)
+
+def aggregate_liability_schedule(schedules_df):
+    """
+    Rolls the per-mortgage schedules up into one monthly liability schedule.
+    Loans are aligned on calendar month; cumulative figures of loans that are
+    already paid off are carried forward so the totals never drop.
+    """
+    if schedules_df is None or schedules_df.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+    df = schedules_df.copy()
+    df["month"] = pd.to_datetime(df["month"]).dt.to_period("M").dt.to_timestamp()
+
+    flow_cols = ["balance", "monthly_total_paid", "monthly_principal", "monthly_interest"]
+    cumulative_cols = ["cumulative_principal", "cumulative_interest"]
+
+    wide = df.pivot_table(
+        index="month", columns="mortgage_name",
+        values=flow_cols + cumulative_cols, aggfunc="sum"
+    ).sort_index()
+
+    result = pd.DataFrame(index=wide.index)
+    for col in flow_cols:
+        result[col] = wide[col].fillna(0).sum(axis=1)
+    for col in cumulative_cols:
+        result[col] = wide[col].ffill().fillna(0).sum(axis=1)
+
+    return result.reset_index()[SCHEDULE_COLUMNS]
+
+def compare_schedules(local_df, reference_df, tolerance=0.01):
+    """
+    Cross-checks a locally computed schedule against a reference one (e.g. the warehouse view).
+    Rows are aligned on calendar month (and mortgage_name when both sides have it).
+    Returns a DataFrame of the aligned balances with an 'abs_diff' and 'matches' column.
+    """
+    local = local_df.copy()
+    reference = reference_df.copy()
+
+    for df in (local, reference):
+        df["month"] = pd.to_datetime(df["month"]).dt.to_period("M").dt.to_timestamp()
+        df["balance"] = pd.to_numeric(df["balance"], errors="coerce").abs()
+
+    keys = ["month"]
+    if "mortgage_name" in local.columns and "mortgage_name" in reference.columns:
+        keys = ["mortgage_name", "month"]
+
+    merged = pd.merge(
+        local[keys + ["balance"]],
+        reference[keys + ["balance"]],
+        on=keys,
+        how="outer",
+        suffixes=("_local", "_reference")
+    ).sort_values(keys).reset_index(drop=True)
+
+    merged["abs_diff"] = (merged["balance_local"] - merged["balance_reference"]).abs()
+    # A month missing on either side counts as a mismatch
+    merged["matches"] = merged["abs_diff"] <= tolerance
+    return merged
@@ -0,0 +1,136 @@
+import pandas as pd
+
+def series_id(kind, name):
+    """Series key in the net worth tables: accounts use their id, the rest '<kind>:<name>'."""
+    return name if kind == "account" else f"{kind}:{name}"
+
+def daily_closing_balances(transactions_df):
+    """
+    Running balances of imported transactions reduced to one closing balance per day
+    (the last valid row of each date). Returns a DataFrame with date, value.
+    """
+    if transactions_df is None or transactions_df.empty or "balance" not in transactions_df.columns:
+        return pd.DataFrame(columns=["date", "value"])
+
+    df = transactions_df
+    if "transaction_type" in df.columns:
+        df = df[df["transaction_type"] != "Info"]
+    df = pd.DataFrame({
+        "date": pd.to_datetime(df["date"]).dt.normalize(),
+        "value": pd.to_numeric(df["balance"], errors="coerce")
+    }).dropna()
+
+    # Rows are in chronological order, so the last one of each day is its closing balance
+    return df.drop_duplicates(subset="date", keep="last").sort_values("date").reset_index(drop=True)
+
+def mortgage_points(schedules_df, loans_df):
+    """
+    Outstanding balance of each mortgage as a (negative) liability:
+    the principal on its start date, then the balance after each monthly payment.
+    Returns {mortgage_name: DataFrame(date, value)}.
+    """
+    points = {}
+    if loans_df is None or loans_df.empty:
+        return points
+
+    for loan in loans_df.itertuples(index=False):
+        start = pd.DataFrame({
+            "date": [pd.Timestamp(loan.start_date).normalize()],
+            "value": [-float(loan.principal)]
+        })
+        rows = pd.DataFrame(columns=["date", "value"])
+        if schedules_df is not None and not schedules_df.empty:
+            schedule = schedules_df[schedules_df["mortgage_name"] == loan.mortgage_name]
+            rows = pd.DataFrame({
+                "date": pd.to_datetime(schedule["month"]).dt.normalize(),
+                "value": -schedule["balance"].astype(float)
+            })
+        points[loan.mortgage_name] = (
+            pd.concat([start, rows], ignore_index=True)
+            .drop_duplicates(subset="date", keep="last")
+            .sort_values("date")
+            .reset_index(drop=True)
+        )
+    return points
+
+def held_value_points(events, prices_df):
+    """
+    Market value of the shares held per trading day. events are LotLedger events: vests add
+    the shares left after sell-to-cover, sales remove the shares sold. The running holding is
+    as-of joined onto the daily closes from the first event. Returns a DataFrame with date, value.
+    """
+    if not events or prices_df is None or prices_df.empty:
+        return pd.DataFrame(columns=["date", "value"])
+
+    changes = pd.DataFrame({
+        "date": [pd.Timestamp(date).normalize() for _, date, _, _, _ in events],
+        "units": [qty if kind == "vest" else -qty for kind, _, qty, _, _ in events],
+    }).astype({"date": "datetime64[ns]", "units": float})
+    held = changes.groupby("date", as_index=False)["units"].sum()
+    held["units"] = held["units"].cumsum()
+
+    prices = prices_df[["Close"]].rename_axis("date").reset_index() if "Date" not in prices_df.columns else prices_df[["Date", "Close"]].rename(columns={"Date": "date"})
+    prices = prices.assign(date=pd.to_datetime(prices["date"]).dt.normalize().astype("datetime64[ns]")).sort_values("date")
+    prices = prices[prices["date"] >= held["date"].iloc[0]]
+
+    df = pd.merge_asof(prices, held, on="date", direction="backward")
+    return pd.DataFrame({
+        "date": df["date"],
+        "value": (df["units"].clip(lower=0) * df["Close"]).astype(float)
+    }).reset_index(drop=True)
+
+def fingerprint(points_df):
+    """Content hash of a point set, used to skip rewriting derived series that haven't changed."""
+    if points_df.empty:
+        return "empty"
+    return str(int(pd.util.hash_pandas_object(points_df[["date", "value"]], index=False).sum()))
+
+def refresh_start(last_computed, dirty_from):
+    """
+    First day that needs (re)computing: the earliest changed point, or the day after the
+    last computed one when only time has moved on. None means the whole series.
+    """
+    if last_computed is None or pd.isna(last_computed):
+        return None
+    next_day = pd.Timestamp(last_computed) + pd.Timedelta(days=1)
+    if dirty_from is None or pd.isna(dirty_from):
+        return next_day
+    return min(pd.Timestamp(dirty_from), next_day)
+
+def build_daily_series(points_df, start, end):
+    """
+    Forward-fills points (date, value) onto every day in [start, end].
+    points_df should include the last point before start, which seeds the carried value.
+    Days before a series' first point are left out. start=None starts at the first point.
+    Returns a Series indexed by date.
+    """
+    end = pd.Timestamp(end).normalize()
+    if points_df.empty:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([], name="date"))
+
+    values = (
+        points_df.assign(date=pd.to_datetime(points_df["date"]).dt.normalize())
+        .drop_duplicates(subset="date", keep="last")
+        .set_index("date")["value"]
+        .sort_index()
+    )
+    start = values.index.min() if start is None else pd.Timestamp(start).normalize()
+    if start > end:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([], name="date"))
+
+    days = pd.date_range(start, end, freq="D", name="date")
+    daily = values.reindex(values.index.union(days)).ffill().reindex(days)
+    return daily.dropna()
+
+def pivot_net_worth(daily_df):
+    """
+    Long daily values (series_id, date, value) to a DataFrame indexed by date with one
+    column per series plus 'net_worth'. Series that haven't started yet count as 0.
+    """
+    if daily_df.empty:
+        return pd.DataFrame(columns=["net_worth"], index=pd.DatetimeIndex([], name="date"))
+
+    wide = daily_df.pivot(index="date", columns="series_id", values="value").fillna(0.0)
+    wide.columns.name = None
+    wide["net_worth"] = wide.sum(axis=1)
+    return wide
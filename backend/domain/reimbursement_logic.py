@@ -1,16 +1,19 @@
+from backend.domain import money_logic
+
 def calculate_reimbursement_impact(reimb_row, expense_row):
     """
     Pure Logic: Takes two rows, parses the complex nested struct, 
     and returns clean numbers for the UI to display.
+    The math runs on integer cents, so the net debit is exact; results are in euros.
     """
     # --- 4. Calculate Math & Peek into Nested Data ---
-    new_reimb_amt = float(reimb_row['credit'])
-    current_net_debit = float(expense_row['debit'])
-    final_net_debit = current_net_debit - new_reimb_amt
+    new_reimb_cents = money_logic.to_cents(reimb_row['credit'])
+    current_net_cents = money_logic.to_cents(expense_row['debit'])
+    final_net_cents = current_net_cents - new_reimb_cents
 
     # Logic to read the Nested Struct + Array
     existing_count = 0
-    existing_sum = 0.0
+    existing_sum_cents = 0
     
     reimb_struct = expense_row.get('reimbursement')
     
@@ -18,12 +21,12 @@ def calculate_reimbursement_impact(reimb_row, expense_row):
         r_list = reimb_struct.get('reimbursement_list')
         if isinstance(r_list, list) and len(r_list) > 0:
             existing_count = len(r_list)
-            existing_sum = sum(float(item.get('amount', 0)) for item in r_list)
+            existing_sum_cents = sum(money_logic.to_cents(item.get('amount') or 0) for item in r_list)
     
     return {
-        "new_amt": new_reimb_amt,
-        "current_net": current_net_debit,
-        "final_net": final_net_debit,
+        "new_amt": money_logic.from_cents(new_reimb_cents),
+        "current_net": money_logic.from_cents(current_net_cents),
+        "final_net": money_logic.from_cents(final_net_cents),
         "existing_count": existing_count,
-        "existing_sum": existing_sum
+        "existing_sum": money_logic.from_cents(existing_sum_cents)
     }
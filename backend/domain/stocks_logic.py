@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 
 def calculate_stock_metrics(df):
     """
@@ -53,4 +54,196 @@ def calculate_stock_metrics(df):
         "total_potential_val": total_potential_val,
         "next_vest_msg": next_vest_msg,
         "next_vest_help": next_vest_help
-    }
\ No newline at end of file
+    }
+
+def calculate_vest_valuation(schedule_df, prices_df, withholding_rate=0.0, fx_rate=1.0, start_date=None):
+    """
+    Builds a daily valuation time series of the vesting schedule.
+    The schedule (Date, GSUs) is as-of joined onto the daily closes, so every trading day
+    carries the number of units vested so far.
+
+    withholding_rate: share of each vest withheld for tax (sell-to-cover).
+    fx_rate: multiplier from the price currency to the reporting currency.
+    Returns a DataFrame with Date, Close, vested/unvested units and gross/after-tax values.
+    """
+    columns = [
+        "Date", "Close", "vested_units", "unvested_units",
+        "vested_value", "unvested_value", "vested_value_after_tax", "unvested_value_after_tax"
+    ]
+    if schedule_df is None or schedule_df.empty or prices_df is None or prices_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Collapse the schedule to one row per vest date with the running total of units
+    vests = (
+        schedule_df[["Date", "GSUs"]]
+        .assign(Date=lambda d: pd.to_datetime(d["Date"]).astype("datetime64[ns]"),
+                GSUs=lambda d: pd.to_numeric(d["GSUs"], errors="coerce").fillna(0))
+        .groupby("Date", as_index=False)["GSUs"].sum()
+        .sort_values("Date")
+    )
+    vests["vested_units"] = vests["GSUs"].cumsum()
+    total_units = vests["GSUs"].sum()
+
+    prices = prices_df[["Close"]].copy()
+    if "Date" not in prices.columns:
+        prices = prices.rename_axis("Date").reset_index()
+    prices["Date"] = pd.to_datetime(prices["Date"]).astype("datetime64[ns]")
+    prices = prices.sort_values("Date")
+
+    if start_date is None:
+        start_date = vests["Date"].iloc[0]
+    prices = prices[prices["Date"] >= pd.to_datetime(start_date)]
+    if prices.empty:
+        return pd.DataFrame(columns=columns)
+
+    # As-of join: each day picks up the last vest on or before it
+    df = pd.merge_asof(prices, vests[["Date", "vested_units"]], on="Date", direction="backward")
+    df["vested_units"] = df["vested_units"].fillna(0)
+    df["unvested_units"] = total_units - df["vested_units"]
+
+    price = df["Close"] * fx_rate
+    net_share = 1 - withholding_rate
+    df["vested_value"] = df["vested_units"] * price
+    df["unvested_value"] = df["unvested_units"] * price
+    df["vested_value_after_tax"] = df["vested_value"] * net_share
+    df["unvested_value_after_tax"] = df["unvested_value"] * net_share
+
+    return df[columns].reset_index(drop=True)
+
+GRANT_COLUMNS = ["grant_id", "grant_date", "units", "vesting_months", "cliff_months", "cadence_months", "yearly_weights"]
+
+def grants_to_dataframe(grants_data):
+    """
+    Flattens the grants document ({grant_id: {...}}) into a DataFrame for the editor.
+    yearly_weights lists become comma-separated strings (e.g. "33,33,22,12").
+    """
+    rows = []
+    for grant_id, details in grants_data.items():
+        row = {"grant_id": grant_id, **details}
+        weights = row.get("yearly_weights")
+        row["yearly_weights"] = ",".join(str(w) for w in weights) if weights else ""
+        rows.append(row)
+
+    if not rows:
+        return pd.DataFrame(columns=GRANT_COLUMNS)
+
+    df = pd.DataFrame(rows)
+    for col in GRANT_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df["grant_date"] = pd.to_datetime(df["grant_date"], errors="coerce")
+    return df[GRANT_COLUMNS]
+
+def _parse_weights(value):
+    """Accepts a list of yearly weights or a comma-separated string. Returns a list (empty if none)."""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [float(w) for w in value]
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    return [float(w) for w in str(value).replace(" ", "").split(",") if w]
+
+def dataframe_to_grants(df):
+    """Converts the editor DataFrame back into the grants storage format."""
+    grants = {}
+    for row in df.dropna(subset=["grant_id", "grant_date", "units"]).to_dict("records"):
+        grants[str(row["grant_id"])] = {
+            "grant_date": pd.to_datetime(row["grant_date"]).strftime("%Y-%m-%d"),
+            "units": int(row["units"]),
+            "vesting_months": int(row.get("vesting_months") or 48),
+            "cliff_months": int(row.get("cliff_months") or 0),
+            "cadence_months": int(row.get("cadence_months") or 1),
+            "yearly_weights": _parse_weights(row.get("yearly_weights")) or None
+        }
+    return grants
+
+def _add_months(dates, months):
+    """Vectorized date + n months, clamping to the end of shorter months (Jan 31 + 1 -> Feb 28/29)."""
+    day = dates.day.to_numpy() - 1
+    month_start = dates.to_numpy().astype("datetime64[M]") + months
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(int)
+    return pd.DatetimeIndex(month_start.astype("datetime64[D]") + np.minimum(day, days_in_month - 1))
+
+def generate_vest_schedule(grants_df, price=None, withholding_rate=0.0):
+    """
+    Expands grant definitions into vest events, vectorized across all grants.
+
+    Each grant vests every cadence_months over vesting_months. yearly_weights front-loads
+    the vesting (e.g. 33/33/22/12 % per year, spread evenly within each year); without
+    weights it vests linearly. Nothing vests before cliff_months, the cliff event catches
+    up everything accrued so far. Units are whole shares: the cumulative total is floored,
+    so rounding never drifts and the last event completes the grant exactly.
+
+    Returns one row per vest date with the same columns as the warehouse stocks table.
+    Value columns are priced at `price` (NaN if no price is given).
+    """
+    columns = [
+        "Date", "GSUs", "Vested_GSUs", "Total_Vested_GSUs", "Total_unvested_GSU",
+        "Total_Vested_before_tax", "Total_Vested_after_tax"
+    ]
+    if grants_df is None or grants_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    grants = grants_df.reset_index(drop=True)
+    units = grants["units"].to_numpy(dtype=float)
+    vesting_months = grants["vesting_months"].fillna(48).to_numpy(dtype=int)
+    cadence = np.maximum(grants["cadence_months"].fillna(1).to_numpy(dtype=int), 1)
+    cliff = grants["cliff_months"].fillna(0).to_numpy(dtype=int)
+
+    # One row per (grant, vest event)
+    # Rounded up, with the last event clamped to vesting_months, so a vesting length
+    # that isn't a multiple of the cadence still completes the grant on time
+    n_events = np.maximum(-(-vesting_months // cadence), 1)
+    grant_idx = np.repeat(np.arange(len(grants)), n_events)
+    event_no = np.arange(n_events.sum()) - np.repeat(np.cumsum(n_events) - n_events, n_events) + 1
+    months = np.minimum(event_no * cadence[grant_idx], vesting_months[grant_idx])
+
+    # Cumulative fraction vested after `months`, from padded per-grant yearly weights
+    weight_lists = []
+    for raw_weights, total in zip(grants["yearly_weights"], vesting_months):
+        weights = _parse_weights(raw_weights)
+        if not weights:
+            # Linear vesting expressed as equal weights per year (partial final year allowed)
+            years = int(np.ceil(total / 12))
+            weights = [min(12, total - 12 * y) for y in range(years)]
+        w = np.asarray(weights, dtype=float)
+        weight_lists.append(w / w.sum())
+
+    max_years = max(len(w) for w in weight_lists)
+    year_weights = np.zeros((len(grants), max_years + 1))
+    for i, w in enumerate(weight_lists):
+        year_weights[i, :len(w)] = w
+    year_start_frac = np.hstack([np.zeros((len(grants), 1)), np.cumsum(year_weights, axis=1)])
+
+    full_years = np.minimum(months // 12, max_years)
+    within_year = (months - 12 * full_years) / 12
+    cum_frac = year_start_frac[grant_idx, full_years] + year_weights[grant_idx, full_years] * within_year
+    cum_frac = np.where(months >= vesting_months[grant_idx], 1.0, np.minimum(cum_frac, 1.0))
+    cum_frac = np.where(months >= cliff[grant_idx], cum_frac, 0.0)
+
+    cum_units = np.floor(units[grant_idx] * cum_frac + 1e-9)
+    prev_units = np.where(event_no == 1, 0.0, np.roll(cum_units, 1))
+
+    events = pd.DataFrame({
+        "Date": _add_months(pd.DatetimeIndex(pd.to_datetime(grants["grant_date"]))[grant_idx], months),
+        "GSUs": cum_units - prev_units
+    })
+    events = events[events["GSUs"] > 0]
+
+    schedule = events.groupby("Date", as_index=False)["GSUs"].sum().sort_values("Date")
+    net_share = 1 - withholding_rate
+
+    schedule["Vested_GSUs"] = schedule["GSUs"] * net_share
+    schedule["Total_Vested_GSUs"] = schedule["GSUs"].cumsum()
+    schedule["Total_unvested_GSU"] = units.sum() - schedule["Total_Vested_GSUs"]
+
+    return price_vest_schedule(schedule, price, withholding_rate)[columns].reset_index(drop=True)
+
+def price_vest_schedule(schedule_df, price=None, withholding_rate=0.0):
+    """
+    (Re)computes the value columns of a vest schedule at `price` (NaN if no price is given).
+    The units don't depend on the price, so a schedule can be generated once and repriced.
+    """
+    price = np.nan if price is None else float(price)
+    schedule_df["Total_Vested_before_tax"] = schedule_df["Total_Vested_GSUs"] * price
+    schedule_df["Total_Vested_after_tax"] = schedule_df["Total_Vested_before_tax"] * (1 - withholding_rate)
+    return schedule_df
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+def downsample_lttb(series, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a time-indexed Series.
+    Keeps the first and last points and, per bucket, the point forming the largest
+    triangle with its neighbours, which preserves the visual shape of the line.
+    Returns the series unchanged if it already has n_out points or fewer.
+    """
+    n = len(series)
+    if n_out >= n or n_out < 3:
+        return series
+
+    x = series.index.asi8.astype(np.float64) if isinstance(series.index, pd.DatetimeIndex) \
+        else np.arange(n, dtype=np.float64)
+    y = series.to_numpy(dtype=np.float64)
+
+    # Bucket edges for the n - 2 middle points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        # Average point of the next bucket (the last bucket looks at the final point)
+        next_start, next_end = end, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[b + 1] = prev
+
+    return series.iloc[selected]
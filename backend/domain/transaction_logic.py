@@ -1,8 +1,11 @@
 import pandas as pd
+from backend.domain import money_logic, transaction_schema
 
 def get_new_transactions(latest_bq_tx, df):
     """
     Return new transactions from uploaded df that are after the latest_bq_tx.
+    df amounts are integer cents (parser output); the BigQuery row's euro amounts are
+    converted to cents so the handshake is an exact integer comparison.
     """
     # Define values for latest transaction in BigQuery
     bq_description = latest_bq_tx["description"]
@@ -13,12 +16,12 @@ def get_new_transactions(latest_bq_tx, df):
     if (isinstance(reimb_info, dict) and 
         reimb_info.get("has_reimbursement") and 
         latest_bq_tx.get("original_debit") is not None):
-        bq_debit = float(latest_bq_tx["original_debit"])
+        bq_debit = money_logic.to_cents(latest_bq_tx["original_debit"])
     else:
-        bq_debit = float(latest_bq_tx.get("debit", 0))
+        bq_debit = money_logic.to_cents(latest_bq_tx.get("debit") or 0)
 
-    bq_credit = float(latest_bq_tx.get("credit", 0))
-    bq_balance = float(latest_bq_tx.get("balance") or 0.0) # default to 0.0 if None
+    bq_credit = money_logic.to_cents(latest_bq_tx.get("credit") or 0)
+    bq_balance = money_logic.to_cents(latest_bq_tx.get("balance") or 0) # default to 0 if None
     latest_bq_date = pd.to_datetime(latest_bq_tx["date"])
 
     # df should already be sorted chronologically (Oldest -> Newest) at this point.    
@@ -34,26 +37,50 @@ def get_new_transactions(latest_bq_tx, df):
 
     # If the CSV has a balance column, use it as the ultimate tie-breaker
     if "balance" in df.columns:
-        financial_mask &= (df["balance"] == bq_balance)
+        financial_mask &= (df["balance"] == bq_balance).fillna(False)
 
     # 2. Try to find an exact match including description first
     description_mask = (df["description"] == bq_description)
     exact_match_mask = financial_mask & description_mask
 
-    if exact_match_mask.any():
+    # Statement formats (OFX, CAMT.053) carry the bank's own transaction id:
+    # when both sides have one, it identifies the marker row exactly
+    bq_tx_id = latest_bq_tx.get("bank_tx_id")
+    id_mask = None
+    if pd.notna(bq_tx_id) and bq_tx_id != "" and "bank_tx_id" in df.columns:
+        id_mask = (df["bank_tx_id"] == bq_tx_id).fillna(False)
+
+    if id_mask is not None and id_mask.any():
+        mask = id_mask
+    elif exact_match_mask.any():
         mask = exact_match_mask
     else:
         # Fallback: If no exact match, trust the financial handshake
         mask = financial_mask
 
+    warning_message = None
     if mask.any():
         marker_index = df[mask].index.max()  # last matching row
-        new_transactions = df.loc[marker_index+1:].copy()
+        first_new = marker_index + 1
+    else:
+        # The marker row is gone or was edited (descriptions, dates and amounts all get
+        # revised by banks): anchor on the balance chain instead
+        first_new = None
+        if latest_bq_tx.get("balance") is not None:
+            first_new = _chain_anchor(df, bq_balance, latest_bq_date)
+        if first_new is not None:
+            warning_message = (
+                "⚠️ Could not find the last BQ transaction in the CSV. "
+                "New rows start where the running balance continues from it."
+            )
+
+    if first_new is not None:
+        new_transactions = df.loc[first_new:].copy()
         # Keep only the required columns
 
         # If account has no balance in CSV → calculate balance
         if not "balance" in new_transactions.columns:
-            start_balance = bq_balance if bq_balance is not None else 0.0
+            start_balance = bq_balance if bq_balance is not None else 0
             new_transactions["balance"] = start_balance + (
                 new_transactions["credit"] - new_transactions["debit"]
             ).cumsum()
@@ -64,10 +91,10 @@ def get_new_transactions(latest_bq_tx, df):
             "credit",
             "description",
             "balance"
-        ]]
+        ] + (["bank_tx_id"] if "bank_tx_id" in new_transactions.columns else [])]
 
-        # Return new transactions and no warning message
-        return new_transactions, None, latest_bq_date
+        # Return new transactions and no warning message (unless anchored on the chain)
+        return new_transactions, warning_message, latest_bq_date
     else:
         # If not found, assume all CSV rows are new
         # Return all rows and a warning message
@@ -75,9 +102,75 @@ def get_new_transactions(latest_bq_tx, df):
             "⚠️ Could not find the last BQ transaction in the CSV. "
             "Keeping all rows."
         )
+        # A file that starts well after the last imported day leaves those days uncovered
+        if not df.empty and df["date"].min() - latest_bq_date > pd.Timedelta(days=1):
+            warning_message += (
+                f" The CSV starts on {df['date'].min().date()}, after the last BQ transaction "
+                f"({latest_bq_date.date()}): transactions in between may be missing."
+            )
 
         return df, warning_message, latest_bq_date
 
+def _chain_anchor(df, bq_balance, latest_bq_date):
+    """
+    Index of the first row on or after the marker's day whose opening balance
+    (balance - credit + debit) is the marker's balance, i.e. the row right after it.
+    None when the CSV has no balances or nothing continues the chain.
+    """
+    if "balance" not in df.columns:
+        return None
+    opening = df["balance"] - df["credit"] + df["debit"]
+    chain_mask = ((opening == bq_balance) & (df["date"] >= latest_bq_date)).fillna(False)
+    return chain_mask.idxmax() if chain_mask.any() else None
+
+# --- Balance chain reconciliation ---
+def reconcile_balance_chain(df, opening_balance=None):
+    """
+    Checks previous balance + credit - debit == balance down a chronologically sorted
+    cents frame in one vectorized pass. opening_balance (cents) is the balance before the
+    first row; without it the first row isn't checked. Rows without a balance are skipped.
+    Returns the rows where the chain breaks, with 'gap' = balance - expected balance.
+    """
+    if df.empty or "balance" not in df.columns:
+        return df.iloc[0:0].assign(gap=pd.Series(dtype="Int64"))
+
+    balance = df["balance"].astype("Int64")
+    step = balance.diff()
+    if opening_balance is not None:
+        step.iloc[0] = balance.iloc[0] - opening_balance
+    gap = step - (df["credit"] - df["debit"]).astype("Int64")
+    breaks = (gap != 0).fillna(False)
+    return df[breaks].assign(gap=gap[breaks])
+
+def check_balance_chain(new_transactions, latest_bq_tx=None, limit=3):
+    """
+    Reconciles deduplicated rows, starting from the warehouse's latest balance when the
+    rows follow it. Returns a warning listing the first breaks, or None if the chain holds.
+    A break at the first row means rows are missing between the warehouse and the file;
+    elsewhere, rows missing from or duplicated in the file.
+    """
+    opening_balance = None
+    if (latest_bq_tx and latest_bq_tx.get("balance") is not None and not new_transactions.empty
+            and new_transactions["date"].iloc[0] >= pd.to_datetime(latest_bq_tx["date"])):
+        opening_balance = money_logic.to_cents(latest_bq_tx["balance"])
+
+    breaks = reconcile_balance_chain(new_transactions, opening_balance)
+    if breaks.empty:
+        return None
+
+    details = [
+        f"{row.date.date()} {row.description} (off by €{money_logic.format_cents(row.gap)})"
+        for row in breaks.head(limit).itertuples()
+    ]
+    more = f" and {len(breaks) - limit} more" if len(breaks) > limit else ""
+    where = ""
+    if opening_balance is not None and breaks.index[0] == new_transactions.index[0]:
+        where = " Rows are missing between the last BQ transaction and the CSV."
+    return (
+        f"⚠️ The running balance doesn't add up at {len(breaks)} row(s), so transactions may be "
+        f"missing or duplicated: {'; '.join(details)}{more}.{where}"
+    )
+
 # --- 4. Helper for diffing rows ---
 def get_changed_rows(original_df, edited_df, data_cols):
     """
@@ -91,9 +184,10 @@ def get_changed_rows(original_df, edited_df, data_cols):
     cols_to_check = id_cols + data_cols
 
     # 2. Create a clean "original" subset
-    original_subset = original_df[cols_to_check].copy()
+    # (categoricals back to strings: their categories differ between the two frames)
+    original_subset = transaction_schema.to_plain_dtypes(original_df[cols_to_check])
     # 3. Create a clean "new" subset from the editor
-    new_subset = edited_df[cols_to_check].copy()
+    new_subset = transaction_schema.to_plain_dtypes(edited_df[cols_to_check])
     
     # Handle NaNs in both DataFrames for accurate comparison
     for col in data_cols:
@@ -0,0 +1,63 @@
+import pandas as pd
+import pyarrow as pa
+
+# Shared dtype plan for transaction frames. Most text columns repeat a handful of values
+# (accounts, categories, months), so they're categoricals; free text uses the Arrow-backed
+# string dtype; transaction numbers fit in int32. Applied where frames enter the app:
+# parser output, query results and editor input.
+TRANSACTION_DTYPES = {
+    "transaction_number": "int32",
+    "description": "string",
+    "category": "category",
+    "label": "category",
+    "account_id": "category",
+    "account": "category",
+    "month": "category",
+    "transaction_type": "category",
+    "to_transaction_id": "string",
+    "bank_tx_id": "string",
+}
+
+# Calendar dates without a time part: 4 bytes a row instead of 8 for datetime64
+DATE32 = pd.ArrowDtype(pa.date32())
+DATE_COLUMNS = ["date"]
+
+def apply_dtype_plan(df, date32=False, editable=()):
+    """
+    Returns df with the transaction dtype plan applied to the columns it has.
+
+    date32: store 'date' as Arrow date32. Meant for query results; parser output keeps
+        datetime64 because the dedup handshake compares it with timestamps.
+    editable: columns the user types into in a data editor. These get the string dtype
+        instead of categorical, since a categorical rejects values outside its categories.
+    """
+    df = df.copy()
+    for col, dtype in TRANSACTION_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if col in editable and dtype == "category":
+            dtype = "string"
+        if dtype == "int32" and df[col].isna().any():
+            dtype = "Int32"
+        df[col] = df[col].astype(dtype)
+
+    if date32:
+        for col in DATE_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col]).dt.normalize().astype("datetime64[ms]").astype(DATE32)
+    return df
+
+def to_plain_dtypes(df, columns=None):
+    """
+    Undoes the categoricals (back to strings) for code that compares or merges
+    columns across frames whose categories may differ.
+    """
+    df = df.copy()
+    for col in columns if columns is not None else df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("string")
+    return df
+
+def memory_footprint(df):
+    """Deep memory usage of a frame in bytes (object strings included)."""
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,58 @@
+import threading
+import time
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+class CircuitBreaker:
+    """
+    Stops calling a flaky dependency after repeated failures.
+
+    closed    -> calls go through; consecutive failures are counted.
+    open      -> calls fail fast with CircuitOpenError until reset_timeout has passed.
+    half-open -> one trial call goes through; success closes the circuit, failure re-opens it.
+    """
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def call(self, func, *args, **kwargs):
+        """Runs func through the breaker. Raises CircuitOpenError instead of calling when open."""
+        with self._lock:
+            state = self._state()
+            if state == "open" or (state == "half-open" and self._trial_in_flight):
+                raise CircuitOpenError("Circuit open: provider calls are paused after repeated failures.")
+            if state == "half-open":
+                self._trial_in_flight = True
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._trial_in_flight = False
+                self._failures += 1
+                if self._failures >= self.failure_threshold or self._opened_at is not None:
+                    self._opened_at = time.monotonic()
+            raise
+
+        with self._lock:
+            self._trial_in_flight = False
+            self._failures = 0
+            self._opened_at = None
+        return result
@@ -1,11 +1,30 @@
+import importlib
 import streamlit as st
-from google.oauth2 import service_account
-from google.cloud import bigquery
 import pandas as pd
 from datetime import datetime, timezone
 import backend.infrastructure.queries as queries
+from backend.infrastructure import frame_cache, replay_client, tracing
+from backend.domain import money_logic
 import config
 
+class _LazyModule:
+    """
+    Stands in for a module and imports it on first attribute access.
+    The BigQuery client libraries take a large share of startup time, and pages that
+    never query the warehouse shouldn't pay for them.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+bigquery = _LazyModule("google.cloud.bigquery")
+service_account = _LazyModule("google.oauth2.service_account")
+
 # Define the scopes required
 SCOPES = [
     "https://www.googleapis.com/auth/bigquery",
@@ -17,14 +36,22 @@ def get_client():
     """
     Creates and caches the BigQuery API client. 
     Using cache_resource ensures we don't reconnect on every rerun.
+    In record/replay mode (config.BQ_CLIENT_MODE) calls go through a cassette.
     """
+    if config.BQ_CLIENT_MODE == "replay":
+        return replay_client.ReplayClient(config.BQ_CASSETTE_DIR, config.BQ_REPLAY_LATENCY_MS)
+
     credentials = service_account.Credentials.from_service_account_info(
         st.secrets["gcp_service_account"],
         scopes=SCOPES
     )
-    return bigquery.Client(credentials=credentials)
+    client = bigquery.Client(credentials=credentials)
+    if config.BQ_CLIENT_MODE == "record":
+        return replay_client.RecordingClient(client, config.BQ_CASSETTE_DIR)
+    return client
 
 # @st.cache_data(ttl=1)
+@tracing.traced("bq.run_query")
 def run_query(query):
     """
     Runs a query and returns a list of dicts.
@@ -35,6 +62,7 @@ def run_query(query):
     rows = [dict(row) for row in rows_raw]
     return rows
 
+@tracing.traced("bq.run_update_logic")
 def run_update_logic(edited_df, table_id):
     """
     Updates BQ table using a MERGE statement.
@@ -67,6 +95,8 @@ def run_update_logic(edited_df, table_id):
         merge_job = client.query(merge_query)
         merge_job.result()
         row_count = merge_job.num_dml_affected_rows
+        for account_id in df_to_merge['account_id'].unique():
+            frame_cache.bump_watermark(table_id, account_id)
 
         st.session_state.status_message = f"🎉 Successfully updated {row_count} rows!"
 
@@ -89,6 +119,7 @@ def run_update_logic(edited_df, table_id):
         
         st.rerun()
 
+@tracing.traced("bq.link_reimbursement_struct_array")
 def link_reimbursement_struct_array(table_id, reimb_row, expense_row):
     """
     Links a credit to a debit using the nested 'reimbursement' struct schema.
@@ -98,7 +129,7 @@ def link_reimbursement_struct_array(table_id, reimb_row, expense_row):
     try:
         r_id = reimb_row['transaction_number'] 
         r_acc = reimb_row['account_id']            
-        r_amt = float(reimb_row['credit'])      
+        r_cents = money_logic.to_cents(reimb_row['credit'])
 
         e_id = expense_row['transaction_number']
         e_acc = expense_row['account_id']
@@ -106,25 +137,45 @@ def link_reimbursement_struct_array(table_id, reimb_row, expense_row):
         e_composite_id = f"{e_acc}:{e_id}"
 
         query = queries.link_reimbursement_struct_array(
-            table_id, e_composite_id, r_id, r_acc, r_amt, r_composite_id, e_id, e_acc
+            table_id, e_composite_id, r_id, r_acc, r_cents, r_composite_id, e_id, e_acc
         )
         
         job = client.query(query)
         job.result() 
+        frame_cache.bump_watermark(table_id, r_acc)
+        frame_cache.bump_watermark(table_id, e_acc)
         
-        st.session_state.status_message = f"🎉 Linked! Added reimbursement of €{r_amt} to the list."
+        st.session_state.status_message = f"🎉 Linked! Added reimbursement of €{money_logic.format_cents(r_cents)} to the list."
         
     except Exception as e:
         st.session_state.status_message = f"Error linking transactions: {e}"
 
+@tracing.traced("bq.insert_transactions")
 def insert_transactions(table_id, df):
     client = get_client()
     # Add ingestion timestamp
     df["ingestion_timestamp"] = datetime.now(timezone.utc)
-    job_config = bigquery.LoadJobConfig(write_disposition="WRITE_APPEND")
+    # Rows from statement formats add bank_tx_id, which older tables don't have yet
+    job_config = bigquery.LoadJobConfig(
+        write_disposition="WRITE_APPEND",
+        schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+    )
+    job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
+    job.result()
+    for account_id in df["account_id"].unique():
+        frame_cache.bump_watermark(table_id, account_id)
+
+@tracing.traced("bq.replace_table_data")
+def replace_table_data(table_id, df):
+    """Overwrites a table with the contents of df (WRITE_TRUNCATE load job)."""
+    client = get_client()
+    job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
     job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
     job.result()
+    frame_cache.bump_watermark(table_id)
+    return job.output_rows
 
+@tracing.traced("bq.get_max_transaction_number")
 def get_max_transaction_number(table_id, account_id):
     """Fetches the max transaction number for an account."""
     client = get_client()
@@ -134,6 +185,7 @@ def get_max_transaction_number(table_id, account_id):
     current_max = row["max_num"] if row["max_num"] is not None else 0
     return current_max
 
+@tracing.traced("bq.execute_procedure")
 def execute_procedure(procedure_id):
     """
     Executes a stored procedure in BigQuery.
@@ -155,6 +207,7 @@ def update_net_worth_table():
     """
     return execute_procedure(config.NET_WORTH_PROCEDURE)
 
+@tracing.traced("bq.save_mortgage_updates")
 def save_mortgage_updates(table_id, edited_df):
     """
     Updates Mortgage Terms table using a MERGE statement.
@@ -197,6 +250,7 @@ def save_mortgage_updates(table_id, edited_df):
         merge_query = queries.get_mortgage_merge_query(table_id, temp_table_id)
         merge_job = client.query(merge_query)
         merge_job.result()
+        frame_cache.bump_watermark(table_id)
         
         return True, f"Successfully updated {merge_job.num_dml_affected_rows} rows."
 
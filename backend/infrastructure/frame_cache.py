@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+
+# Write counters per (table, account). A key that includes the current watermark can
+# never serve data from before a write made by this process.
+_watermarks = {}
+_watermark_lock = threading.Lock()
+_WHOLE_TABLE = "*"
+
+def _copy_on_write():
+    """True if pandas copy-on-write is on (always from pandas 3; opt-in before)."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+def _session_copy(frame):
+    """
+    A copy a session may modify without touching the cached frame: shallow (shared buffers)
+    under copy-on-write, deep otherwise.
+    """
+    return frame.copy(deep=not _copy_on_write())
+
+def get_watermark(table_id, account_id=None):
+    """
+    Watermark for reads of one account (or of the whole table with account_id=None):
+    changes with every write to that account and every table-wide write.
+    """
+    with _watermark_lock:
+        return (_watermarks.get((table_id, account_id), 0), _watermarks.get((table_id, _WHOLE_TABLE), 0))
+
+def bump_watermark(table_id, account_id=None):
+    """
+    Called after a write to table_id: of one account's rows, or of any rows (account_id=None).
+    Account writes also move the whole-table reads' watermark.
+    """
+    with _watermark_lock:
+        keys = {(table_id, account_id), (table_id, None)} if account_id is not None else {(table_id, _WHOLE_TABLE)}
+        for key in keys:
+            _watermarks[key] = _watermarks.get(key, 0) + 1
+
+class SharedFrameCache:
+    """
+    Process-wide cache of query results (DataFrames), shared by every browser session.
+
+    Entries are treated as immutable: get() hands out copies. Under pandas copy-on-write
+    they are shallow and share the cached buffers until a session modifies them, so holding
+    a result in session state costs almost nothing on top of the shared copy.
+    Evicts least recently used entries beyond max_bytes and entries older than ttl seconds.
+    """
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (frame, size, loaded_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}            # key -> [lock, threads holding or waiting on it]
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key, loader):
+        """
+        Returns the frame cached under key, calling loader() on a miss.
+        Concurrent misses on the same key wait for a single load. None results aren't cached.
+        """
+        frame = self._lookup(key)
+        if frame is not None:
+            return _session_copy(frame)
+
+        with self._key_lock(key):
+            # Another session may have loaded it while we waited
+            frame = self._lookup(key, count=False)
+            if frame is None:
+                frame = loader()
+                if frame is not None:
+                    self._store(key, frame)
+        return _session_copy(frame) if frame is not None else None
+
+    def invalidate(self, predicate=None):
+        """Drops every entry whose key matches predicate(key) (all entries without one)."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate is None or predicate(k)]:
+                self._drop(key)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key, count=True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] >= self.ttl:
+                self._drop(key)
+                self.stats["expirations"] += 1
+                entry = None
+            if count:
+                self.stats["hits" if entry is not None else "misses"] += 1
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _store(self, key, frame):
+        size = int(frame.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            # A single result larger than the whole budget is served but not kept
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (frame, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    @contextmanager
+    def _key_lock(self, key):
+        """
+        Holds the load lock of one key. A lock lives only while some thread holds or waits
+        on it, so the map stays as small as the number of loads in flight.
+        """
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
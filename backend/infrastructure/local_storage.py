@@ -1,16 +1,77 @@
+import os
 import json
 import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+# Locks this thread holds: absolute path -> depth, so file_lock is reentrant
+_held = threading.local()
+# Callbacks to run when a document changes: absolute path -> [callback(path)]
+_subscribers = {}
+
+def _key(file_path):
+    return os.path.abspath(file_path)
+
+@contextmanager
+def file_lock(file_path):
+    """
+    Exclusive advisory lock on a sidecar '<file>.lock', held across processes and threads.
+    Hold it around a whole load -> modify -> save_data cycle so concurrent updates aren't lost;
+    save_data inside it doesn't lock again.
+    """
+    key = _key(file_path)
+    depth = getattr(_held, "depths", {})
+    _held.depths = depth
+    if fcntl is None or depth.get(key):
+        depth[key] = depth.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            depth[key] -= 1
+        return
+
+    with open(f"{file_path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        depth[key] = 1
+        try:
+            yield
+        finally:
+            depth[key] = 0
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def subscribe(file_path, callback):
+    """Registers callback(path), called whenever the document at file_path changes."""
+    callbacks = _subscribers.setdefault(_key(file_path), [])
+    if callback not in callbacks:
+        callbacks.append(callback)
+
+def notify(file_path):
+    """Runs the callbacks subscribed to file_path (any document key works, not only file paths)."""
+    for callback in _subscribers.get(_key(file_path), []):
+        try:
+            callback(file_path)
+        except Exception as e:
+            logging.error(f"Change callback failed for {file_path}: {e}")
 
 def save_data(file_path, data):
     """
     Writes data back to the JSON file.
+    The file is written to a temp file in the same directory and renamed over the
+    original, so readers never see a half-written document.
     Args:
         file_path (str): Path to the file
         data (dict): Data to be saved
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        with file_lock(file_path):
+            _write_atomic(file_path, data)
+        notify(file_path)
         return True
     except Exception as e:
         # Log the error internally to debug it later
@@ -18,6 +79,20 @@ def save_data(file_path, data):
         # Re-raise the exception so the Service knows something went wrong
         raise e
 
+def _write_atomic(file_path, data):
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 def load_json_data(file_path):
     """
     Reads a JSON file and returns the data as a dictionary.
@@ -27,5 +102,4 @@ def load_json_data(file_path):
         dict: The data loaded from the JSON file
     """
     with open(file_path, "r", encoding='utf-8') as f:
-        data = json.load(f)
-    return data
\ No newline at end of file
+        return json.load(f)
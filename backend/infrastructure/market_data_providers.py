@@ -0,0 +1,122 @@
+import os
+import json
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# 1. The Contract (Abstract Base Class)
+class MarketDataProvider:
+    """Every market data source must follow this structure."""
+    def fetch_history(self, ticker, start=None):
+        """
+        Returns daily bars (DataFrame indexed by date, with Open/High/Low/Close/Volume columns)
+        from start (inclusive) to today. start=None means the full available history.
+        """
+        raise NotImplementedError
+
+    def fetch_info(self, ticker):
+        """Returns a dict of quote metadata (currentPrice, previousClose, currency, shortName...)."""
+        raise NotImplementedError
+
+    def fetch_quote(self, ticker):
+        """
+        Returns a normalized quote dict for one ticker, or None if no price is available.
+        Uses fetch_info and falls back to the last two daily closes when info is incomplete.
+        """
+        info = self.fetch_info(ticker) or {}
+
+        if 'currentPrice' in info and 'previousClose' in info:
+            price = info.get('currentPrice')
+            previous_close = info.get('previousClose')
+            day_high = info.get('dayHigh')
+            day_low = info.get('dayLow')
+        else:
+            recent = self.fetch_history(ticker, start=pd.Timestamp("today").normalize() - pd.Timedelta(days=10))
+            if recent is None or len(recent) < 2:
+                return None # Not enough data
+            price = recent['Close'].iloc[-1]
+            previous_close = recent['Close'].iloc[-2]
+            day_high = None
+            day_low = None
+
+        return {
+            "ticker": ticker,
+            "price": price,
+            "currency": info.get('currency', 'USD'),
+            "previous_close": previous_close,
+            "day_high": day_high,
+            "day_low": day_low,
+            "name": info.get('shortName', ticker)
+        }
+
+    def fetch_quotes(self, tickers, timeout=10):
+        """
+        Fetches quotes for several tickers concurrently.
+        Returns {ticker: quote or None}. Raises if every ticker failed, so callers can
+        count it as a provider failure.
+        """
+        if not tickers:
+            return {}
+
+        executor = ThreadPoolExecutor(max_workers=min(8, len(tickers)))
+        futures = {ticker: executor.submit(self.fetch_quote, ticker) for ticker in tickers}
+        wait(futures.values(), timeout=timeout)
+        # Don't block on stragglers; they finish in the background and are dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        quotes, errors = {}, []
+        for ticker, future in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                quotes[ticker] = future.result()
+            else:
+                quotes[ticker] = None
+                errors.append(ticker)
+
+        if len(errors) == len(tickers):
+            raise RuntimeError(f"No quotes could be fetched for: {', '.join(errors)}")
+        return quotes
+
+# 2. The Implementations
+class YFinanceProvider(MarketDataProvider):
+    def fetch_history(self, ticker, start=None):
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        if start is None:
+            return stock.history(period="max")
+        return stock.history(start=pd.Timestamp(start).strftime("%Y-%m-%d"))
+
+    def fetch_info(self, ticker):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).info or {}
+
+class FileProvider(MarketDataProvider):
+    """
+    Offline stand-in: serves bars from '<data_dir>/<TICKER>.csv' (with a Date column)
+    and quote metadata from an optional '<TICKER>.json'.
+    """
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def fetch_history(self, ticker, start=None):
+        path = os.path.join(self.data_dir, f"{ticker.upper()}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        df = pd.read_csv(path, parse_dates=["Date"]).set_index("Date").sort_index()
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df
+
+    def fetch_info(self, ticker):
+        path = os.path.join(self.data_dir, f"{ticker.upper()}.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+# 3. The Explicit Registry
+PROVIDER_REGISTRY = {
+    "yfinance": YFinanceProvider,
+    "file": FileProvider,
+}
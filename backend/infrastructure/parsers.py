@@ -1,14 +1,67 @@
+import codecs
+import csv
+import html
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Tuple
 import pandas as pd
 import numpy as np  
-from backend.domain import transaction_logic
+from backend.domain import transaction_logic, money_logic, transaction_schema
+
+# How much of a file sniffing reads, and how many of its lines can hold the header
+SNIFF_BYTES = 8192
+SNIFF_MAX_LINES = 15
+# Excel workbooks: xlsx (zip) and legacy xls (OLE2)
+_EXCEL_MAGIC = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")
+
+@dataclass(frozen=True)
+class HeaderSignature:
+    """What a bank's text export looks like: its header columns and delimiter."""
+    columns: Tuple[str, ...]
+    delimiter: str = ","
+    # Excel exports can't be sniffed from text; the strategy accepts workbooks
+    excel: bool = False
+
+class SniffResult(NamedTuple):
+    bank: Optional[str]         # PARSER_REGISTRY key, None if nothing matched well enough
+    strategy: Optional[type]
+    confidence: float           # 0..1 (Jaccard similarity of the header columns)
+    scores: dict                # every bank's score
 
 # 1. The Contract (Abstract Base Class)
 class BankStrategy:
     """Every bank implementation must follow this structure."""
+    SIGNATURE: Optional[HeaderSignature] = None
+
+    @classmethod
+    def sniff(cls, header_lines, is_excel=False):
+        """
+        How well the start of a file matches this bank's signature (0..1).
+        header_lines are the first decoded lines; the best-matching line is the header.
+        """
+        signature = cls.SIGNATURE
+        if signature is None:
+            return 0.0
+        if is_excel:
+            return 0.9 if signature.excel else 0.0
+
+        expected = {c.lower() for c in signature.columns}
+        best = 0.0
+        for fields in csv.reader(header_lines, delimiter=signature.delimiter):
+            found = {f.strip().lower() for f in fields if f.strip()}
+            if found:
+                best = max(best, len(expected & found) / len(expected | found))
+        return best
+
     def parse(self, file_path):
-        """Orchestrates reading and normalizing."""
+        """
+        Orchestrates reading and normalizing.
+        Amounts (debit, credit, balance) come out as integer cents,
+        text columns with the shared transaction dtype plan.
+        """
         df = self._read_file(file_path)
-        return self._normalize(df)
+        return transaction_schema.apply_dtype_plan(money_logic.frame_to_cents(self._normalize(df)))
 
     def _read_file(self, file_path):
         raise NotImplementedError
@@ -18,6 +71,10 @@ class BankStrategy:
 
 # 2. The Implementations (Strategies)
 class PTSBStrategy(BankStrategy):
+    SIGNATURE = HeaderSignature(
+        ("Date", "Description", "Money In (€)", "Money Out (€)", "Balance (€)"), excel=True
+    )
+
     def _read_file(self, file_path):
         # Check file extension to decide how to read
         # file_path is actually a Streamlit UploadedFile object
@@ -69,7 +126,11 @@ class PTSBStrategy(BankStrategy):
         # Date parsing
         # Excel: DD/MM/YYYY
         # CSV: DD Mon YYYY (e.g. 16 Feb 2026)
-        df["date"] = pd.to_datetime(df["date_raw"], dayfirst=True, errors="coerce")
+        # Explicit formats: inferring from the first row breaks when it's in May
+        # ("May" fits both %b and %B, and the rest of the year then fails to parse)
+        df["date"] = pd.to_datetime(df["date_raw"], format="%d/%m/%Y", errors="coerce").fillna(
+            pd.to_datetime(df["date_raw"], format="%d %b %Y", errors="coerce")
+        )
         
         df["description"] = pd.Series(df["description_raw"], dtype="string").str.strip()
 
@@ -80,6 +141,11 @@ class PTSBStrategy(BankStrategy):
 
 
 class RevolutStrategy(BankStrategy):
+    SIGNATURE = HeaderSignature((
+        "Type", "Product", "Started Date", "Completed Date", "Description",
+        "Amount", "Fee", "Currency", "State", "Balance",
+    ))
+
     def _read_file(self, file_path):
         return pd.read_csv(file_path, sep=",", decimal=".", header=0)
 
@@ -122,6 +188,8 @@ class RevolutStrategy(BankStrategy):
         return df[["date", "debit", "credit", "description", "balance"]]
     
 class CMBStrategy(BankStrategy):
+    SIGNATURE = HeaderSignature(("Date operation", "Date valeur", "Libelle", "Debit", "Credit"), delimiter=";")
+
     def _read_file(self, file_path):
         return pd.read_csv(file_path, sep=";", decimal=",")
 
@@ -137,6 +205,8 @@ class CMBStrategy(BankStrategy):
         return df[["date", "debit", "credit", "description"]]
 
 class USbankStrategy(BankStrategy):
+    SIGNATURE = HeaderSignature(("Date", "Description", "Money In (€)", "Money Out (€)"))
+
     def _read_file(self, file_path):
         return pd.read_csv(file_path, sep=",", decimal=".", header=0)
 
@@ -151,6 +221,306 @@ class USbankStrategy(BankStrategy):
 
         return df[["date", "debit", "credit", "description"]]
 
+# --- Standard statement formats (OFX, QIF, ISO 20022 CAMT.053) ---
+# These files can cover years, so they're read incrementally: a chunk, a line or an XML
+# element at a time, appending plain values to column lists. Only the result frame grows.
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def _open_binary(file_path):
+    """A binary stream over a path or an uploaded file, rewound to the start."""
+    if isinstance(file_path, str):
+        return open(file_path, "rb")
+    file_path.seek(0)
+    return file_path
+
+class StatementStrategy(BankStrategy):
+    """
+    Base for the bank-independent statement formats. _read_file streams the file into
+    columns date, amount (signed euros), description and bank_tx_id (the bank's own
+    transaction id), and fills self.balance_anchors with {statement: (kind, amount)}
+    where kind is "opening" or "closing"; running balances are derived from those.
+    """
+    # Text that identifies the format near the start of a file (case-insensitive)
+    MARKERS: Tuple[str, ...] = ()
+
+    def __init__(self):
+        self.balance_anchors = {}
+
+    @classmethod
+    def sniff(cls, header_lines, is_excel=False):
+        head = "\n".join(header_lines).lower()
+        return 1.0 if not is_excel and any(m.lower() in head for m in cls.MARKERS) else 0.0
+
+    def _normalize(self, df):
+        df = df.dropna(subset=["date", "amount"])
+        df["debit"] = (-df["amount"]).clip(lower=0)
+        df["credit"] = df["amount"].clip(lower=0)
+        df["description"] = pd.Series(df["description"], dtype="string").str.strip()
+        if "statement" not in df.columns:
+            df["statement"] = 0
+
+        # Formats don't fix the order; a file whose first row is its newest is reversed
+        reverse = len(df) > 1 and df["date"].iloc[0] > df["date"].iloc[-1]
+        df = transaction_logic.sort_transactions_chronologically(df, source_is_reverse_chronological=reverse)
+
+        columns = ["date", "debit", "credit", "description"]
+        if self.balance_anchors:
+            df["balance"] = self._running_balance(df)
+            columns.append("balance")
+        return df[columns + ["bank_tx_id"]]
+
+    def _running_balance(self, df):
+        """Balance after each row, from each statement's opening or closing balance."""
+        running = df.groupby("statement")["amount"].cumsum()
+        totals = df.groupby("statement")["amount"].transform("sum")
+        kind = df["statement"].map(lambda s: self.balance_anchors.get(s, (None, None))[0])
+        anchor = df["statement"].map(lambda s: self.balance_anchors.get(s, (None, np.nan))[1])
+        return np.where(kind == "opening", anchor + running, anchor - (totals - running))
+
+class OFXStrategy(StatementStrategy):
+    """Open Financial Exchange, both SGML (1.x, unclosed leaf tags) and XML (2.x)."""
+    MARKERS = ("OFXHEADER", "<OFX>")
+    _TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+    _CDATA = re.compile(r"<!\[CDATA\[(.*?)\]\]>", re.DOTALL)
+    # One statement per account: bank (STMTRS) and credit card (CCSTMTRS) responses
+    _STATEMENTS = ("STMTRS", "CCSTMTRS")
+
+    def _tokens(self, stream):
+        """(is_closing, TAG, text) for every tag, read in chunks. Text is unescaped."""
+        first = stream.read(STREAM_CHUNK_BYTES)
+        encoding = "cp1252" if b"CHARSET:1252" in first.upper() else "utf-8"
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        buffer, chunk = "", first
+        while True:
+            final = not chunk
+            buffer += decoder.decode(chunk, final=final)
+            # CDATA (OFX 2.x) becomes escaped text, so its content can't be taken for tags
+            buffer = self._CDATA.sub(lambda m: html.escape(m.group(1), quote=False), buffer)
+            # The last tag may continue in the next chunk: keep it for the next round. So
+            # does the tag before a CDATA section that may not be complete yet, whose text
+            # the section is
+            cut = len(buffer)
+            if not final:
+                open_cdata = buffer.find("<![CDATA[")
+                cut = buffer.rfind("<") if open_cdata < 0 else open_cdata
+                if "<![CDATA[".startswith(buffer[cut:cut + 9]):
+                    cut = buffer.rfind("<", 0, cut)
+                cut = max(cut, 0)
+            for match in self._TAG.finditer(buffer, 0, cut):
+                yield match.group(1) == "/", match.group(2).upper(), html.unescape(match.group(3)).strip()
+            buffer = buffer[cut:]
+            if final:
+                return
+            chunk = stream.read(STREAM_CHUNK_BYTES)
+
+    def _read_file(self, file_path):
+        columns = {"date": [], "amount": [], "description": [], "bank_tx_id": [], "statement": []}
+        current, in_ledger = None, False
+        # Transactions and balances belong to the account statement they're in
+        statement = -1
+        stream = _open_binary(file_path)
+        try:
+            for closing, tag, text in self._tokens(stream):
+                if tag == "STMTTRN":
+                    if closing and current is not None:
+                        columns["date"].append(current.get("DTPOSTED", "")[:8])
+                        columns["amount"].append(current.get("TRNAMT", "").replace(",", "."))
+                        columns["description"].append(current.get("NAME") or current.get("MEMO"))
+                        columns["bank_tx_id"].append(current.get("FITID"))
+                        columns["statement"].append(max(statement, 0))
+                    current = None if closing else {}
+                elif tag in self._STATEMENTS:
+                    if not closing:
+                        statement += 1
+                elif tag == "LEDGERBAL":
+                    in_ledger = not closing
+                elif not closing and text:
+                    if current is not None:
+                        current[tag] = text
+                    elif in_ledger and tag == "BALAMT":
+                        self.balance_anchors[max(statement, 0)] = ("closing", float(text.replace(",", ".")))
+        finally:
+            if isinstance(file_path, str):
+                stream.close()
+
+        df = pd.DataFrame(columns)
+        df["date"] = pd.to_datetime(df["date"], format="%Y%m%d", errors="coerce")
+        df["amount"] = pd.to_numeric(df["amount"], errors="coerce")
+        return df
+
+_QIF_AMOUNT = re.compile(r"[+-]?[\d.,]*\d")
+
+def _decimal_separator(amount):
+    """
+    "," or "." when the amount shows which one is its decimal separator (the last
+    separator, followed by one or two digits), "" when it has none, None if it can't
+    tell: "1,234" or "1.234" may be thousands or a three-decimal amount.
+    """
+    last = max(amount.rfind(","), amount.rfind("."))
+    if last == -1:
+        return ""
+    separator, decimals = amount[last], len(amount) - last - 1
+    if decimals in (1, 2):
+        return separator
+    if amount.count(separator) > 1:
+        # "1,234,567": a repeated separator can only group thousands
+        return "," if separator == "." else "."
+    return None
+
+def _parse_qif_amount(amount, decimal):
+    """Float of a QIF amount given the file's decimal separator, NaN if it isn't a number."""
+    if not _QIF_AMOUNT.fullmatch(amount):
+        return np.nan
+    thousands = "." if decimal == "," else ","
+    return float(amount.replace(thousands, "").replace(decimal, "."))
+
+class QIFStrategy(StatementStrategy):
+    """Quicken Interchange Format. Has no transaction ids and no balances."""
+    MARKERS = ("!Type:",)
+    # QIF dates follow the exporting software's locale; day-first here
+    DATE_FORMATS = ("%d/%m/%Y", "%d/%m/%y", "%Y-%m-%d")
+    # Amounts follow it too: "," or "." as the decimal separator, None to detect it per file
+    DECIMAL: Optional[str] = None
+
+    def _amounts(self, raw_amounts):
+        """
+        Parses the amounts with the file's decimal separator: DECIMAL, or the one its
+        amounts agree on. Raises ValueError when the file doesn't settle it for an amount
+        like "1,234", rather than import it 1000x off.
+        """
+        amounts = [a.replace(" ", "").replace("\u00a0", "") for a in raw_amounts]
+        decimal = self.DECIMAL
+        if decimal is None:
+            seen = {_decimal_separator(a) for a in amounts} - {""}
+            if len(seen - {None}) > 1:
+                raise ValueError("QIF amounts mix ',' and '.' as the decimal separator.")
+            if None in seen and not seen - {None}:
+                example = next(a for a in amounts if _decimal_separator(a) is None)
+                raise ValueError(
+                    f"Ambiguous QIF amount '{example}': it could be thousands or decimals. "
+                    "Set QIFStrategy.DECIMAL for this file's locale."
+                )
+            decimal = next(iter(seen - {None}), ".")
+        return [_parse_qif_amount(a, decimal) for a in amounts]
+
+    def _read_file(self, file_path):
+        columns = {"date": [], "amount": [], "description": [], "bank_tx_id": []}
+        record, in_transactions = {}, False
+        stream = _open_binary(file_path)
+        try:
+            for raw in stream:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                if line.startswith("!"):
+                    # Account lists and options use the same record syntax; skip them
+                    in_transactions = line.lower().startswith("!type:") and "invst" not in line.lower()
+                    record = {}
+                elif line == "^":
+                    if in_transactions and record:
+                        columns["date"].append(record.get("D", ""))
+                        columns["amount"].append(record.get("T", record.get("U", "")))
+                        columns["description"].append(record.get("P") or record.get("M"))
+                        columns["bank_tx_id"].append(None)
+                    record = {}
+                elif in_transactions:
+                    record.setdefault(line[0], line[1:].strip())
+        finally:
+            if isinstance(file_path, str):
+                stream.close()
+
+        df = pd.DataFrame(columns)
+        dates = df["date"].str.replace("'", "/").str.replace(" ", "")
+        df["date"] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+        for date_format in self.DATE_FORMATS:
+            df["date"] = df["date"].fillna(pd.to_datetime(dates, format=date_format, errors="coerce"))
+        df["amount"] = pd.Series(self._amounts(df["amount"]), index=df.index, dtype=float)
+        return df
+
+def _local(tag):
+    """Element tag without its XML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+def _first(fields, *paths):
+    """Value of the first path present in a flattened record."""
+    for path in paths:
+        if fields.get(path):
+            return fields[path]
+    return None
+
+def _flatten(elem):
+    """An element's descendants as {"BookgDt/Dt": "2024-01-05", ...} (first value per path)."""
+    fields = {}
+    def walk(node, prefix):
+        for child in node:
+            path = prefix + _local(child.tag)
+            if child.text and child.text.strip():
+                fields.setdefault(path, child.text.strip())
+            if len(child):
+                walk(child, path + "/")
+    walk(elem, "")
+    return fields
+
+class CAMT053Strategy(StatementStrategy):
+    """ISO 20022 bank-to-customer statement (camt.053, any version). Only booked entries."""
+    MARKERS = ("camt.053",)
+
+    def _read_file(self, file_path):
+        columns = {"date": [], "amount": [], "description": [], "bank_tx_id": [], "statement": []}
+        # Entries and balances belong to the statement after the last one that ended
+        statement = 0
+        stream = _open_binary(file_path)
+        try:
+            for _, elem in ET.iterparse(stream, events=("end",)):
+                tag = _local(elem.tag)
+                if tag == "Ntry":
+                    self._read_entry(_flatten(elem), statement, columns)
+                elif tag == "Bal":
+                    self._read_balance(_flatten(elem), statement)
+                elif tag == "Stmt":
+                    statement += 1
+                else:
+                    continue
+                # Processed: drop its subtree (a statement also drops its emptied entries)
+                elem.clear()
+        finally:
+            if isinstance(file_path, str):
+                stream.close()
+
+        df = pd.DataFrame(columns)
+        df["date"] = pd.to_datetime(df["date"].str[:10], format="%Y-%m-%d", errors="coerce")
+        return df
+
+    @staticmethod
+    def _signed_amount(fields):
+        amount = float(fields.get("Amt") or "nan")
+        return -amount if fields.get("CdtDbtInd") == "DBIT" else amount
+
+    def _read_balance(self, fields, statement):
+        code = fields.get("Tp/CdOrPrtry/Cd")
+        if code in ("OPBD", "PRCD"):
+            self.balance_anchors[statement] = ("opening", self._signed_amount(fields))
+        elif code == "CLBD":
+            self.balance_anchors.setdefault(statement, ("closing", self._signed_amount(fields)))
+
+    def _read_entry(self, fields, statement, columns):
+        if _first(fields, "Sts", "Sts/Cd") not in ("BOOK", None):
+            return
+
+        amount = self._signed_amount(fields)
+        # The counterparty is the creditor on a debit and the debtor on a credit
+        party = "Cdtr" if amount < 0 else "Dbtr"
+        name = _first(
+            fields, f"NtryDtls/TxDtls/RltdPties/{party}/Nm", f"NtryDtls/TxDtls/RltdPties/{party}/Pty/Nm"
+        )
+        remittance = _first(fields, "NtryDtls/TxDtls/RmtInf/Ustrd", "AddtlNtryInf")
+
+        columns["date"].append(_first(fields, "BookgDt/Dt", "BookgDt/DtTm", "ValDt/Dt") or "")
+        columns["amount"].append(amount)
+        columns["description"].append(" ".join(part for part in (name, remittance) if part) or None)
+        columns["bank_tx_id"].append(_first(fields, "AcctSvcrRef", "NtryDtls/TxDtls/Refs/AcctSvcrRef", "NtryRef"))
+        columns["statement"].append(statement)
+
 # 3. The Explicit Registry
 # Map the string in your JSON ("bank": "revolut") to the Class
 PARSER_REGISTRY = {
@@ -158,4 +528,52 @@ PARSER_REGISTRY = {
     "revolut": RevolutStrategy,
     "cmb": CMBStrategy,
     "usbank": USbankStrategy, 
-}
\ No newline at end of file
+    "ofx": OFXStrategy,
+    "qif": QIFStrategy,
+    "camt053": CAMT053Strategy,
+}
+
+def parse_file(bank, path):
+    """
+    Parses an export on disk with the bank's strategy.
+    A plain module-level function, so worker processes can run it.
+    """
+    strategy_class = PARSER_REGISTRY.get(bank)
+    if not strategy_class:
+        raise ValueError(f"No parser configured for bank type: '{bank}'")
+    # An open file has the .name the strategies use to pick a reader, like an upload
+    with open(path, "rb") as f:
+        return strategy_class().parse(f)
+
+def _read_head(file):
+    """First SNIFF_BYTES of a path or file-like object (left at its current position)."""
+    if isinstance(file, (str, bytes)) or hasattr(file, "__fspath__"):
+        with open(file, "rb") as f:
+            return f.read(SNIFF_BYTES)
+    position = file.tell()
+    file.seek(0)
+    head = file.read(SNIFF_BYTES)
+    file.seek(position)
+    return head.encode() if isinstance(head, str) else head
+
+def sniff_bank_format(file, min_confidence=0.6):
+    """
+    Identifies which bank exported a file from its first few KB (no full parse).
+    Returns the best SniffResult; bank is None when no signature scores min_confidence.
+    """
+    head = _read_head(file)
+    is_excel = head.startswith(_EXCEL_MAGIC)
+    lines = []
+    if not is_excel:
+        # The read may stop mid-line: drop the partial last line unless it's the only one
+        text = head.decode("utf-8-sig", errors="replace")
+        lines = text.splitlines()
+        if len(head) == SNIFF_BYTES and len(lines) > 1:
+            lines = lines[:-1]
+        lines = lines[:SNIFF_MAX_LINES]
+
+    scores = {bank: strategy_class.sniff(lines, is_excel) for bank, strategy_class in PARSER_REGISTRY.items()}
+    bank = max(scores, key=scores.get)
+    if scores[bank] < min_confidence:
+        return SniffResult(None, None, scores[bank], scores)
+    return SniffResult(bank, PARSER_REGISTRY[bank], scores[bank], scores)
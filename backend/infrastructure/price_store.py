@@ -0,0 +1,113 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+# One uncompressed Arrow IPC file per ticker. Uncompressed IPC can be
+# memory-mapped, so reading a slice doesn't load the whole history into RAM.
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+def get_store_path(store_dir, ticker):
+    """Returns the file path holding the price history for a ticker."""
+    safe_ticker = ticker.upper().replace("/", "_").replace("^", "_")
+    return os.path.join(store_dir, f"{safe_ticker}.arrow")
+
+def _read_table(path):
+    """Opens the Arrow file through a memory map (zero-copy)."""
+    source = pa.memory_map(path, "r")
+    return ipc.open_file(source).read_all()
+
+def store_version(store_dir, ticker):
+    """
+    Changes whenever the ticker's file is rewritten (appended bars or a history replaced
+    after a corporate action), or None if nothing is stored yet. For cache keys.
+    """
+    path = get_store_path(store_dir, ticker)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def last_stored_date(store_dir, ticker):
+    """
+    Returns the latest bar date in the store, or None if nothing is stored yet.
+    Only the Date column is touched.
+    """
+    path = get_store_path(store_dir, ticker)
+    if not os.path.exists(path):
+        return None
+
+    dates = _read_table(path).column("Date")
+    if len(dates) == 0:
+        return None
+    return pd.Timestamp(pc.max(dates).as_py())
+
+def read_history(store_dir, ticker, start=None, end=None):
+    """
+    Reads the stored daily bars for a ticker, optionally sliced to [start, end].
+    Returns a DataFrame indexed by Date (empty if nothing is stored).
+    """
+    path = get_store_path(store_dir, ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+
+    table = _read_table(path)
+
+    # Filter on the mapped table so only the slice gets converted to pandas
+    if start is not None:
+        table = table.filter(pc.greater_equal(table["Date"], pa.scalar(pd.Timestamp(start), table["Date"].type)))
+    if end is not None:
+        table = table.filter(pc.less_equal(table["Date"], pa.scalar(pd.Timestamp(end), table["Date"].type)))
+
+    return table.to_pandas().set_index("Date")
+
+def merge_history(store_dir, ticker, new_bars, replace=False):
+    """
+    Merges freshly fetched bars into the store. Bars for dates already stored are
+    overwritten (today's bar is provisional until the close).
+    If replace is True, the stored history is discarded and new_bars becomes the history.
+    Returns the number of rows in the store after the merge.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    path = get_store_path(store_dir, ticker)
+
+    new_df = _normalize_bars(new_bars)
+
+    if not replace and os.path.exists(path):
+        stored_df = _read_table(path).to_pandas()
+        merged = pd.concat([stored_df, new_df], ignore_index=True)
+        merged = merged.drop_duplicates(subset="Date", keep="last")
+    else:
+        merged = new_df
+
+    merged = merged.sort_values("Date").reset_index(drop=True)
+    table = pa.Table.from_pandas(merged, preserve_index=False)
+
+    # Write to a temp file and swap it in, so readers never see a half-written file
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    return len(merged)
+
+def _normalize_bars(bars):
+    """Brings provider output to the stored layout: a naive daily 'Date' column plus price columns."""
+    df = bars.copy()
+    if "Date" not in df.columns:
+        df = df.rename_axis("Date").reset_index()
+
+    dates = pd.to_datetime(df["Date"])
+    if dates.dt.tz is not None:
+        # Keep the exchange-local calendar date, then drop the timezone
+        dates = dates.dt.tz_localize(None)
+    df["Date"] = dates.dt.normalize().astype("datetime64[ns]")
+
+    for col in PRICE_COLUMNS:
+        if col not in df.columns:
+            df[col] = 0.0
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    return df[["Date"] + PRICE_COLUMNS]
@@ -1,3 +1,5 @@
+from backend.domain import money_logic
+
 def get_merge_update_query(table_id, temp_table_id):
     """Returns SQL to merge temp table updates into main table."""
     return f"""
@@ -79,7 +81,12 @@ def get_all_expenses_query(table_id, account_id_all):
         LIMIT 1000
     """
 
-def link_reimbursement_struct_array(table_id, e_composite_id, r_id, r_acc, r_amt, r_composite_id, e_id, e_acc):
+def link_reimbursement_struct_array(table_id, e_composite_id, r_id, r_acc, r_cents, r_composite_id, e_id, e_acc):
+    """
+    r_cents is the reimbursement in integer cents. The new debit is computed in cents
+    (exact integer subtraction) and only then scaled back to the FLOAT64 column.
+    """
+    r_amt = money_logic.format_cents(r_cents)
     return f"""
         BEGIN TRANSACTION;
 
@@ -102,7 +109,7 @@ def link_reimbursement_struct_array(table_id, e_composite_id, r_id, r_acc, r_amt
         SET 
             -- Audit Trail: If original_debit is NULL, grab the current debit. If set, keep it.
             original_debit = COALESCE(original_debit, debit),
-            debit = ROUND(debit - {r_amt}, 2),
+            debit = (CAST(ROUND(debit * 100) AS INT64) - {int(r_cents)}) / 100,
             reimbursement = STRUCT(
                 FALSE AS is_reimbursement,
                 TRUE AS has_reimbursement,
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from types import SimpleNamespace
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# A cassette is a directory with manifest.json (one entry per recorded call, in order)
+# and one zstd-compressed Arrow file per query result. Calls are keyed by their
+# normalized SQL (or load target), and repeated calls with the same key replay their
+# recordings in order, so a flow that reads, writes and reads again replays faithfully.
+
+MANIFEST = "manifest.json"
+# Temp tables are named after the load's timestamp (temp_updates_1718000000)
+_TEMP_TABLE = re.compile(r"\b(temp_[a-z_]+?)_\d{9,}\b")
+_WHITESPACE = re.compile(r"\s+")
+
+class ReplayMissError(KeyError):
+    """Raised in replay when a call was never recorded."""
+
+def normalize_sql(sql):
+    """Collapses whitespace and masks per-run temp table names."""
+    return _TEMP_TABLE.sub(r"\1_<ts>", _WHITESPACE.sub(" ", sql).strip())
+
+def interaction_key(kind, target):
+    """Stable key of a call: kind ('query'/'load') plus its normalized SQL or table."""
+    target = normalize_sql(target)
+    return hashlib.sha1(f"{kind}\n{target}".encode()).hexdigest()[:16]
+
+class _Result(list):
+    """Rows of a query result: dicts, so dict(row) and row["col"] work as on BigQuery rows."""
+
+class _Job:
+    def __init__(self, rows=None, num_dml_affected_rows=None, output_rows=None, error=None):
+        self._rows = rows or []
+        self.num_dml_affected_rows = num_dml_affected_rows
+        self.output_rows = output_rows
+        self._error = error
+
+    def result(self):
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        return _Result(self._rows)
+
+def _table_ref(table_id):
+    project, dataset, table = table_id.replace("`", "").split(".")
+    return SimpleNamespace(project=project, dataset_id=dataset, table_id=table)
+
+class _Cassette:
+    """Manifest and Arrow files of one cassette directory."""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        manifest_path = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                self.entries = json.load(f)["interactions"]
+        else:
+            self.entries = []
+
+    def append(self, entry, rows=None):
+        with self._lock:
+            key = entry["key"]
+            entry["seq"] = sum(1 for e in self.entries if e["key"] == key)
+            if rows is not None:
+                entry["file"] = f"{key}.{entry['seq']}.arrow"
+                self._write_rows(entry["file"], rows)
+            self.entries.append(entry)
+            self._save_manifest()
+
+    def read_rows(self, filename):
+        with pa.memory_map(os.path.join(self.path, filename), "r") as source:
+            return ipc.open_file(source).read_all().to_pylist()
+
+    def _write_rows(self, filename, rows):
+        os.makedirs(self.path, exist_ok=True)
+        table = pa.Table.from_pylist(rows)
+        options = ipc.IpcWriteOptions(compression="zstd")
+        with ipc.new_file(os.path.join(self.path, filename), table.schema, options=options) as writer:
+            writer.write_table(table)
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        manifest_path = os.path.join(self.path, MANIFEST)
+        tmp = f"{manifest_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"interactions": self.entries}, f, indent=1, default=str)
+        os.replace(tmp, manifest_path)
+
+class RecordingClient:
+    """
+    Wraps a live bigquery.Client and records every query and load job into a cassette.
+    Only the calls db_client makes are supported.
+    """
+    def __init__(self, client, cassette_dir):
+        self._client = client
+        self._cassette = _Cassette(cassette_dir)
+
+    def query(self, sql):
+        start = time.perf_counter()
+        entry = {"key": interaction_key("query", sql), "kind": "query", "sql": normalize_sql(sql)}
+        try:
+            job = self._client.query(sql)
+            rows = [dict(row) for row in job.result()]
+        except Exception as e:
+            entry.update(error=str(e), duration_ms=(time.perf_counter() - start) * 1000)
+            self._cassette.append(entry)
+            raise
+
+        entry.update(
+            rows=len(rows),
+            num_dml_affected_rows=job.num_dml_affected_rows,
+            duration_ms=(time.perf_counter() - start) * 1000,
+        )
+        self._cassette.append(entry, rows)
+        return _Job(rows, job.num_dml_affected_rows)
+
+    def load_table_from_dataframe(self, df, table_id, job_config=None):
+        start = time.perf_counter()
+        job = self._client.load_table_from_dataframe(df, table_id, job_config=job_config)
+        job.result()
+        self._cassette.append({
+            "key": interaction_key("load", table_id),
+            "kind": "load",
+            "table": normalize_sql(table_id),
+            "columns": [str(c) for c in df.columns],
+            "rows": len(df),
+            "duration_ms": (time.perf_counter() - start) * 1000,
+        })
+        return _Job(output_rows=job.output_rows)
+
+    def get_table(self, table_id):
+        return self._client.get_table(table_id)
+
+    def delete_table(self, table_id, not_found_ok=False):
+        return self._client.delete_table(table_id, not_found_ok=not_found_ok)
+
+class ReplayClient:
+    """
+    Serves recorded calls with no network. latency_ms adds a fixed delay per call;
+    None replays each call's recorded duration instead (0 for none at all).
+    """
+    def __init__(self, cassette_dir, latency_ms=None):
+        self._cassette = _Cassette(cassette_dir)
+        self.latency_ms = latency_ms
+        self._recordings = {}
+        for entry in self._cassette.entries:
+            self._recordings.setdefault(entry["key"], []).append(entry)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def query(self, sql):
+        entry = self._next("query", sql)
+        self._wait(entry)
+        if "error" in entry:
+            return _Job(error=entry["error"])
+        rows = self._cassette.read_rows(entry["file"]) if entry.get("file") else []
+        return _Job(rows, entry.get("num_dml_affected_rows"))
+
+    def load_table_from_dataframe(self, df, table_id, job_config=None):
+        # Loads are checked against the recording but always succeed with the given rows
+        entry = self._next("load", table_id)
+        self._wait(entry)
+        return _Job(output_rows=len(df))
+
+    def get_table(self, table_id):
+        return _table_ref(table_id)
+
+    def delete_table(self, table_id, not_found_ok=False):
+        return None
+
+    def reset(self):
+        """Starts every key's recordings from the first one again."""
+        with self._lock:
+            self._calls.clear()
+
+    def _next(self, kind, target):
+        key = interaction_key(kind, target)
+        recordings = self._recordings.get(key)
+        if not recordings:
+            raise ReplayMissError(f"No recorded {kind} for: {normalize_sql(target)[:200]}")
+        with self._lock:
+            n = self._calls.get(key, 0)
+            self._calls[key] = n + 1
+        # Calls beyond the recorded ones get the last recording again
+        return recordings[min(n, len(recordings) - 1)]
+
+    def _wait(self, entry):
+        delay_ms = entry.get("duration_ms", 0) if self.latency_ms is None else self.latency_ms
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
@@ -0,0 +1,515 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from backend.infrastructure import local_storage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id   TEXT PRIMARY KEY,
+    account_name TEXT,
+    bank         TEXT,
+    balance      REAL,
+    last_updated TEXT,
+    active       INTEGER NOT NULL DEFAULT 1,
+    extra        TEXT  -- JSON with any other account attributes
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    category TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rules (
+    category TEXT NOT NULL REFERENCES categories(category) ON DELETE CASCADE,
+    keyword  TEXT NOT NULL,
+    label    TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (category, keyword)
+);
+
+-- Append-only: every balance ever set, never overwritten
+CREATE TABLE IF NOT EXISTS balance_history (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_id  TEXT NOT NULL,
+    balance     REAL NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_balance_history_account_time
+    ON balance_history (account_id, recorded_at);
+
+-- Daily FX rates: base-currency units per one unit of currency
+CREATE TABLE IF NOT EXISTS fx_rates (
+    date     TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    rate     REAL NOT NULL,
+    PRIMARY KEY (currency, date)
+);
+
+-- Net worth engine: one series per account / mortgage / stock holding.
+-- Points are the known values (snapshots, daily closing balances, schedule rows);
+-- net_worth_daily is the forward-filled daily series derived from them.
+CREATE TABLE IF NOT EXISTS net_worth_series (
+    series_id     TEXT PRIMARY KEY,
+    kind          TEXT NOT NULL,       -- account | mortgage | stocks
+    currency      TEXT,                -- NULL: the account's own currency
+    fingerprint   TEXT,                -- of the last replaced point set, to skip no-op writes
+    last_computed TEXT,                -- last day present in net_worth_daily
+    dirty_from    TEXT                 -- earliest day whose points changed since then
+);
+
+CREATE TABLE IF NOT EXISTS net_worth_points (
+    series_id TEXT NOT NULL,
+    date      TEXT NOT NULL,
+    value     REAL NOT NULL,
+    PRIMARY KEY (series_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS net_worth_daily (
+    series_id TEXT NOT NULL,
+    date      TEXT NOT NULL,
+    value     REAL NOT NULL,
+    PRIMARY KEY (series_id, date)
+);
+
+-- Files picked up from the import inbox, by content hash, so none is imported twice
+CREATE TABLE IF NOT EXISTS inbox_files (
+    fingerprint  TEXT PRIMARY KEY,     -- sha256 of the file contents
+    filename     TEXT NOT NULL,
+    account_id   TEXT,
+    status       TEXT NOT NULL,        -- imported | failed
+    rows         INTEGER,
+    message      TEXT,
+    processed_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+ACCOUNT_COLUMNS = ["account_name", "bank", "balance", "last_updated", "active"]
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+def change_key(db_path, table):
+    """Key passed to local_storage subscribers when a table changes."""
+    return f"{db_path}::{table}"
+
+@contextmanager
+def connect(db_path):
+    """
+    Opens a connection with the schema in place and runs the block as one transaction
+    (commit on success, rollback on error).
+    """
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        with _init_lock:
+            if db_path not in _initialized:
+                # WAL lets readers keep going while another session writes
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                _initialized.add(db_path)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def seed_once(db_path, name, seed):
+    """
+    Runs seed() (e.g. an import from the legacy JSON documents) the first time only.
+    Tracked in the meta table, so emptying a table later doesn't re-import it.
+    """
+    with connect(db_path) as conn:
+        done = conn.execute("SELECT 1 FROM meta WHERE key = ?", (f"seeded:{name}",)).fetchone()
+    if done:
+        return False
+
+    seed()
+    with connect(db_path) as conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"seeded:{name}", pd.Timestamp.now().isoformat()))
+    return True
+
+def sync_document(db_path, name, path, apply):
+    """
+    Runs apply() whenever the JSON document at path changed since the last run (by mtime),
+    e.g. to pick up accounts added to the legacy file. Returns True if it ran.
+    """
+    if not os.path.exists(path):
+        return False
+    mtime = str(os.path.getmtime(path))
+    with connect(db_path) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"synced:{name}",)).fetchone()
+    if row and row[0] == mtime:
+        return False
+
+    apply()
+    with connect(db_path) as conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"synced:{name}", mtime))
+    return True
+
+# --- Accounts ---
+def load_accounts(db_path):
+    """Returns accounts in the same {account_id: {...}} shape as the accounts JSON document."""
+    with connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT account_id, account_name, bank, balance, last_updated, active, extra FROM accounts ORDER BY rowid"
+        ).fetchall()
+
+    accounts = {}
+    for account_id, name, bank, balance, last_updated, active, extra in rows:
+        details = json.loads(extra) if extra else {}
+        details.update({
+            "account_name": name,
+            "bank": bank,
+            "balance": balance,
+            "last_updated": last_updated,
+            "active": bool(active)
+        })
+        accounts[account_id] = details
+    return accounts
+
+def import_accounts(db_path, accounts_data):
+    """
+    Merges accounts from a {account_id: {...}} document without overwriting the store:
+    new accounts are added with their balance recorded in the history, existing ones only
+    gain the fields they don't have yet (e.g. a currency). Returns the number of accounts changed.
+    """
+    changed = 0
+    with connect(db_path) as conn:
+        stored = {
+            account_id: (json.loads(extra) if extra else {}, name, bank)
+            for account_id, extra, name, bank in conn.execute("SELECT account_id, extra, account_name, bank FROM accounts")
+        }
+        for account_id, details in accounts_data.items():
+            extra = {k: v for k, v in details.items() if k not in ACCOUNT_COLUMNS}
+            if account_id in stored:
+                stored_extra, name, bank = stored[account_id]
+                missing = {k: v for k, v in extra.items() if k not in stored_extra}
+                if missing or (name is None and details.get("account_name")) or (bank is None and details.get("bank")):
+                    conn.execute(
+                        "UPDATE accounts SET extra = ?, account_name = COALESCE(account_name, ?), bank = COALESCE(bank, ?) "
+                        "WHERE account_id = ?",
+                        (json.dumps({**stored_extra, **missing}), details.get("account_name"), details.get("bank"), account_id)
+                    )
+                    changed += 1
+                continue
+
+            conn.execute(
+                """
+                INSERT INTO accounts (account_id, account_name, bank, balance, last_updated, active, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (account_id, details.get("account_name"), details.get("bank"), details.get("balance"),
+                 details.get("last_updated"), int(bool(details.get("active", True))), json.dumps(extra))
+            )
+            if details.get("balance") is not None and details.get("last_updated"):
+                conn.execute(
+                    "INSERT INTO balance_history (account_id, balance, recorded_at) VALUES (?, ?, ?)",
+                    (account_id, float(details["balance"]), details["last_updated"])
+                )
+                _upsert_points(conn, account_id, "account", None, [(_day(details["last_updated"]), float(details["balance"]))])
+            changed += 1
+    if changed:
+        local_storage.notify(change_key(db_path, "accounts"))
+    return changed
+
+def set_account_balance(db_path, account_id, balance, recorded_at):
+    """
+    Updates one account's balance and appends it to the balance history, in a single transaction.
+    Returns False if the account doesn't exist.
+    """
+    with connect(db_path) as conn:
+        cursor = conn.execute(
+            "UPDATE accounts SET balance = ?, last_updated = ? WHERE account_id = ?",
+            (float(balance), recorded_at, account_id)
+        )
+        if cursor.rowcount == 0:
+            return False
+        conn.execute(
+            "INSERT INTO balance_history (account_id, balance, recorded_at) VALUES (?, ?, ?)",
+            (account_id, float(balance), recorded_at)
+        )
+        _upsert_points(conn, account_id, "account", None, [(_day(recorded_at), float(balance))])
+    local_storage.notify(change_key(db_path, "accounts"))
+    return True
+
+# --- Categories & rules ---
+def load_categories(db_path):
+    """Returns the rules in the categories JSON shape: {category: [{"keyword", "label"}, ...]}."""
+    with connect(db_path) as conn:
+        categories = conn.execute("SELECT category FROM categories ORDER BY position").fetchall()
+        rules = conn.execute("SELECT category, keyword, label FROM rules ORDER BY category, position").fetchall()
+
+    data = {category: [] for (category,) in categories}
+    for category, keyword, label in rules:
+        data.setdefault(category, []).append({"keyword": keyword, "label": label})
+    return data
+
+def save_categories(db_path, categories_data):
+    """
+    Applies a full categories document as row-level changes: only categories and rules that
+    were added, removed, moved or relabelled are written, in one transaction.
+    Returns the number of rows written.
+    """
+    new_categories = {category: pos for pos, category in enumerate(categories_data)}
+    new_rules = {}
+    for category, items in categories_data.items():
+        for pos, item in enumerate(items):
+            # Later duplicates of a keyword win, like the last write to the JSON list would
+            new_rules[(category, item["keyword"])] = (item.get("label"), pos)
+
+    changed = 0
+    with connect(db_path) as conn:
+        old_categories = dict(conn.execute("SELECT category, position FROM categories").fetchall())
+        old_rules = {
+            (category, keyword): (label, pos)
+            for category, keyword, label, pos in conn.execute("SELECT category, keyword, label, position FROM rules")
+        }
+
+        for category in old_categories.keys() - new_categories.keys():
+            conn.execute("DELETE FROM categories WHERE category = ?", (category,))
+            changed += 1
+        for category, pos in new_categories.items():
+            if old_categories.get(category) != pos:
+                conn.execute(
+                    "INSERT INTO categories (category, position) VALUES (?, ?) "
+                    "ON CONFLICT(category) DO UPDATE SET position = excluded.position",
+                    (category, pos)
+                )
+                changed += 1
+
+        for key in old_rules.keys() - new_rules.keys():
+            if key[0] in new_categories:  # rules of deleted categories went with the cascade
+                conn.execute("DELETE FROM rules WHERE category = ? AND keyword = ?", key)
+                changed += 1
+        for (category, keyword), (label, pos) in new_rules.items():
+            if old_rules.get((category, keyword)) != (label, pos):
+                conn.execute(
+                    "INSERT INTO rules (category, keyword, label, position) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(category, keyword) DO UPDATE SET label = excluded.label, position = excluded.position",
+                    (category, keyword, label, pos)
+                )
+                changed += 1
+
+    if changed:
+        local_storage.notify(change_key(db_path, "rules"))
+    return changed
+
+# --- FX rates ---
+def get_last_fx_date(db_path, currency):
+    """Latest stored rate date for a currency, or None."""
+    with connect(db_path) as conn:
+        row = conn.execute("SELECT MAX(date) FROM fx_rates WHERE currency = ?", (currency,)).fetchone()
+    return pd.Timestamp(row[0]) if row and row[0] else None
+
+def upsert_fx_rates(db_path, currency, rates):
+    """Stores (date -> rate) pairs for a currency; existing dates are overwritten. Returns rows written."""
+    rows = [(pd.Timestamp(date).strftime("%Y-%m-%d"), currency, float(rate)) for date, rate in rates.items() if pd.notna(rate)]
+    if not rows:
+        return 0
+    with connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO fx_rates (date, currency, rate) VALUES (?, ?, ?) "
+            "ON CONFLICT(currency, date) DO UPDATE SET rate = excluded.rate",
+            rows
+        )
+    local_storage.notify(change_key(db_path, "fx_rates"))
+    return len(rows)
+
+def load_fx_rates(db_path, currencies=None):
+    """Returns stored rates as a DataFrame (date, currency, rate), optionally limited to some currencies."""
+    query = "SELECT date, currency, rate FROM fx_rates"
+    params = ()
+    if currencies:
+        query += f" WHERE currency IN ({', '.join('?' for _ in currencies)})"
+        params = tuple(currencies)
+    with connect(db_path) as conn:
+        df = pd.read_sql_query(query + " ORDER BY date", conn, params=params)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+# --- Net worth series ---
+def _day(value):
+    """Normalizes a date/timestamp to the 'YYYY-MM-DD' key used by the net worth tables."""
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+def _upsert_points(conn, series_id, kind, currency, points):
+    """
+    Writes (date, value) points inside an open transaction and moves the series'
+    dirty_from back to the earliest date written.
+    """
+    if not points:
+        return
+    conn.executemany(
+        "INSERT INTO net_worth_points (series_id, date, value) VALUES (?, ?, ?) "
+        "ON CONFLICT(series_id, date) DO UPDATE SET value = excluded.value",
+        [(series_id, date, value) for date, value in points]
+    )
+    earliest = min(date for date, _ in points)
+    conn.execute(
+        """
+        INSERT INTO net_worth_series (series_id, kind, currency, dirty_from) VALUES (?, ?, ?, ?)
+        ON CONFLICT(series_id) DO UPDATE SET
+            kind = excluded.kind,
+            currency = excluded.currency,
+            dirty_from = MIN(COALESCE(net_worth_series.dirty_from, excluded.dirty_from), excluded.dirty_from)
+        """,
+        (series_id, kind, currency, earliest)
+    )
+
+def record_net_worth_points(db_path, series_id, kind, points_df, currency=None):
+    """
+    Adds or overwrites points (DataFrame with date, value) of a series.
+    Only days from the earliest written point onwards need recomputing.
+    """
+    points = [(_day(date), float(value)) for date, value in zip(points_df["date"], points_df["value"]) if pd.notna(value)]
+    with connect(db_path) as conn:
+        _upsert_points(conn, series_id, kind, currency, points)
+    local_storage.notify(change_key(db_path, "net_worth"))
+    return len(points)
+
+def replace_net_worth_points(db_path, series_id, kind, points_df, fingerprint, currency=None):
+    """
+    Replaces all points of a derived series (e.g. a mortgage schedule).
+    A no-op returning False when the fingerprint matches the stored one.
+    """
+    points = [(_day(date), float(value)) for date, value in zip(points_df["date"], points_df["value"]) if pd.notna(value)]
+    with connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT fingerprint, currency FROM net_worth_series WHERE series_id = ?", (series_id,)
+        ).fetchone()
+        if row and row[0] == fingerprint and row[1] == currency:
+            return False
+
+        # Removed points invalidate the series from the first of the old or new ones
+        old_first = conn.execute(
+            "SELECT MIN(date) FROM net_worth_points WHERE series_id = ?", (series_id,)
+        ).fetchone()[0]
+        firsts = [d for d in (old_first, min((date for date, _ in points), default=None)) if d]
+        dirty = min(firsts) if firsts else None
+
+        conn.execute("DELETE FROM net_worth_points WHERE series_id = ?", (series_id,))
+        conn.executemany(
+            "INSERT INTO net_worth_points (series_id, date, value) VALUES (?, ?, ?)",
+            [(series_id, date, value) for date, value in points]
+        )
+        conn.execute(
+            """
+            INSERT INTO net_worth_series (series_id, kind, currency, fingerprint, dirty_from) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(series_id) DO UPDATE SET
+                kind = excluded.kind,
+                currency = excluded.currency,
+                fingerprint = excluded.fingerprint,
+                dirty_from = MIN(COALESCE(net_worth_series.dirty_from, excluded.dirty_from),
+                                 COALESCE(excluded.dirty_from, net_worth_series.dirty_from))
+            """,
+            (series_id, kind, currency, fingerprint, dirty)
+        )
+    local_storage.notify(change_key(db_path, "net_worth"))
+    return True
+
+def get_net_worth_series(db_path):
+    """Returns the series table (series_id, kind, currency, last_computed, dirty_from) as a DataFrame."""
+    with connect(db_path) as conn:
+        return pd.read_sql_query(
+            "SELECT series_id, kind, currency, last_computed, dirty_from FROM net_worth_series ORDER BY series_id", conn
+        )
+
+def load_net_worth_points(db_path, series_id, since=None):
+    """
+    Points (date, value) of a series from since onwards, plus the last point before since
+    so the daily series has a value to carry forward.
+    """
+    since = _day(since) if since is not None else ""
+    query = """
+        SELECT date, value FROM net_worth_points WHERE series_id = ? AND date >= ?
+        UNION ALL
+        SELECT date, value FROM net_worth_points
+        WHERE series_id = ? AND date = (
+            SELECT MAX(date) FROM net_worth_points WHERE series_id = ? AND date < ?
+        )
+        ORDER BY date
+    """
+    with connect(db_path) as conn:
+        df = pd.read_sql_query(query, conn, params=(series_id, since, series_id, series_id, since))
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+def write_net_worth_daily(db_path, series_id, start, daily, computed_through):
+    """
+    Replaces the daily values of a series from start onwards (daily: Series indexed by date)
+    and marks it computed through computed_through. start=None rewrites the whole series.
+    """
+    rows = [(series_id, _day(date), float(value)) for date, value in daily.items()]
+    with connect(db_path) as conn:
+        conn.execute(
+            "DELETE FROM net_worth_daily WHERE series_id = ? AND date >= ?",
+            (series_id, _day(start) if start is not None else "")
+        )
+        conn.executemany("INSERT INTO net_worth_daily (series_id, date, value) VALUES (?, ?, ?)", rows)
+        conn.execute(
+            "UPDATE net_worth_series SET last_computed = ?, dirty_from = NULL WHERE series_id = ?",
+            (_day(computed_through), series_id)
+        )
+
+def load_net_worth_daily(db_path, start=None, end=None):
+    """Returns the computed daily values (series_id, date, value) in [start, end]."""
+    params = (_day(start) if start is not None else "", _day(end) if end is not None else "9999")
+    with connect(db_path) as conn:
+        df = pd.read_sql_query(
+            "SELECT series_id, date, value FROM net_worth_daily WHERE date >= ? AND date <= ? ORDER BY date",
+            conn, params=params
+        )
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+def seed_net_worth_from_balance_history(db_path):
+    """Turns the recorded balance snapshots into account points (last snapshot of each day)."""
+    with connect(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT h.account_id, date(h.recorded_at), h.balance FROM balance_history h
+            JOIN (
+                SELECT account_id, date(recorded_at) AS day, MAX(recorded_at) AS recorded_at
+                FROM balance_history GROUP BY account_id, date(recorded_at)
+            ) last ON last.account_id = h.account_id AND last.recorded_at = h.recorded_at
+            """
+        ).fetchall()
+        by_account = {}
+        for account_id, day, balance in rows:
+            by_account.setdefault(account_id, []).append((day, balance))
+        for account_id, points in by_account.items():
+            _upsert_points(conn, account_id, "account", None, points)
+
+# --- Import inbox ---
+def is_inbox_file_imported(db_path, fingerprint):
+    """True if a file with these contents was already imported (failures don't count)."""
+    with connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT 1 FROM inbox_files WHERE fingerprint = ? AND status = 'imported'", (fingerprint,)
+        ).fetchone()
+    return row is not None
+
+def record_inbox_file(db_path, fingerprint, filename, account_id, status, rows=None, message=None):
+    """Records the outcome for a file; a later attempt on the same contents overwrites it."""
+    with connect(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO inbox_files "
+            "(fingerprint, filename, account_id, status, rows, message, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, filename, account_id, status, rows, message, pd.Timestamp.now().isoformat())
+        )
+    local_storage.notify(change_key(db_path, "inbox_files"))
+
+def load_inbox_files(db_path, limit=50):
+    """Most recent inbox outcomes first, as a DataFrame."""
+    with connect(db_path) as conn:
+        return pd.read_sql_query(
+            "SELECT filename, account_id, status, rows, message, processed_at FROM inbox_files "
+            "ORDER BY processed_at DESC LIMIT ?", conn, params=(limit,), parse_dates=["processed_at"]
+        )
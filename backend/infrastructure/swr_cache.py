@@ -0,0 +1,92 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class StaleWhileRevalidateCache:
+    """
+    Per-key cache that answers immediately from memory, even when the entry is stale,
+    and refreshes stale entries on a background thread.
+
+    loader(keys) -> {key: value} is called with a batch of keys. Only keys that have
+    never been loaded are fetched in the foreground.
+    """
+    def __init__(self, loader, ttl, max_workers=1):
+        self.loader = loader
+        self.ttl = ttl
+        self._entries = {}      # key -> (value, loaded_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swr-refresh")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refresh_errors": 0}
+
+    def get_many(self, keys):
+        """
+        Returns {key: value} for the requested keys. Missing keys are loaded synchronously;
+        if that load fails their value is None. Stale keys trigger a background refresh.
+        """
+        now = time.monotonic()
+        result, missing, stale = {}, [], []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    missing.append(key)
+                    self.stats["misses"] += 1
+                    continue
+
+                value, loaded_at = entry
+                result[key] = value
+                if now - loaded_at >= self.ttl:
+                    self.stats["stale_hits"] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        stale.append(key)
+                else:
+                    self.stats["hits"] += 1
+
+        if stale:
+            self._executor.submit(self._refresh, stale)
+
+        if missing:
+            try:
+                loaded = self._store(self.loader(missing))
+            except Exception as e:
+                print(f"Cache load failed for {missing}: {e}")
+                loaded = {}
+            for key in missing:
+                result[key] = loaded.get(key)
+
+        return result
+
+    def get(self, key):
+        return self.get_many([key])[key]
+
+    def invalidate(self, key=None):
+        """Drops one entry (or everything) so the next read reloads it."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _refresh(self, keys):
+        try:
+            self._store(self.loader(keys))
+        except Exception as e:
+            # Keep serving the stale values; the next read will try again
+            with self._lock:
+                self.stats["refresh_errors"] += 1
+            print(f"Background refresh failed for {keys}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(keys)
+
+    def _store(self, values):
+        loaded_at = time.monotonic()
+        with self._lock:
+            for key, value in values.items():
+                # A failed (None) fetch never replaces a cached value
+                if value is not None:
+                    self._entries[key] = (value, loaded_at)
+        return values
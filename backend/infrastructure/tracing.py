@@ -0,0 +1,171 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Spans are cheap enough to leave on: a perf_counter_ns pair, a thread-local stack push/pop
+# and a deque append per span. Row/byte counts are taken from what the traced call returns
+# (len and shallow memory_usage), never by scanning data.
+
+_local = threading.local()
+_finished = deque(maxlen=5000)
+_ids = iter(range(1, 2**63))
+_id_lock = threading.Lock()
+_enabled = True
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start_ns", "end_ns", "thread_id", "attrs")
+
+    def __init__(self, name, parent_id, attrs):
+        with _id_lock:
+            self.span_id = next(_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.thread_id = threading.get_ident()
+        self.attrs = attrs
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+
+    def set(self, **attrs):
+        """Attaches attributes (rows=..., bytes=..., or anything JSON-serializable)."""
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self):
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+def configure(enabled=True, buffer_size=5000):
+    """Turns tracing on/off and sets how many finished spans are kept in memory."""
+    global _enabled, _finished
+    _enabled = enabled
+    if buffer_size != _finished.maxlen:
+        _finished = deque(_finished, maxlen=buffer_size)
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Times the block as a span nested under the current one (per thread).
+    Yields the Span (or None when tracing is off) so the block can call .set(rows=...).
+    """
+    if not _enabled:
+        yield None
+        return
+
+    stack = _stack()
+    current = Span(name, stack[-1].span_id if stack else None, attrs)
+    stack.append(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        stack.pop()
+        _finished.append(current)
+
+def measure(result):
+    """Row and byte counts of a result: DataFrames, lists, or a tuple led by one of those."""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if hasattr(result, "memory_usage") and hasattr(result, "columns"):
+        # Shallow: object strings aren't walked, so this stays O(columns)
+        return {"rows": len(result), "bytes": int(result.memory_usage(index=False, deep=False).sum())}
+    if isinstance(result, (list, dict)):
+        return {"rows": len(result)}
+    return {}
+
+def traced(name=None):
+    """Decorator form of span(); records rows/bytes of the return value."""
+    def decorator(fn):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with span(span_name) as current:
+                result = fn(*args, **kwargs)
+                current.attrs.update(measure(result))
+                return result
+        return wrapper
+    return decorator
+
+def get_spans(limit=None):
+    """Finished spans, oldest first (the last `limit` of them)."""
+    spans = list(_finished)
+    return spans[-limit:] if limit else spans
+
+def clear():
+    _finished.clear()
+
+def to_chrome_trace(spans=None):
+    """
+    Spans as a Chrome trace (chrome://tracing, Perfetto): complete ('X') events
+    in microseconds, one track per thread.
+    """
+    spans = get_spans() if spans is None else spans
+    pid = os.getpid()
+    events = [
+        {
+            "name": s.name,
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": (s.end_ns - s.start_ns) / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": {**s.attrs, "span_id": s.span_id, "parent_id": s.parent_id},
+        }
+        for s in spans if s.end_ns is not None
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def export_chrome_trace(path, spans=None):
+    """Writes the spans to path as Chrome-trace JSON (atomically). Returns the number of events."""
+    trace = to_chrome_trace(spans)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(trace, f, default=str)
+    os.replace(tmp, path)
+    return len(trace["traceEvents"])
+
+def summarize(spans=None):
+    """
+    Flat table rows for the most recent root spans and their children, depth-first:
+    (depth, name, duration_ms, rows, bytes, error).
+    """
+    spans = get_spans() if spans is None else spans
+    children = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+    known = {s.span_id for s in spans}
+
+    rows = []
+    def walk(s, depth):
+        rows.append({
+            "depth": depth,
+            "span": "  " * depth + s.name,
+            "ms": round(s.duration_ms, 2),
+            "rows": s.attrs.get("rows"),
+            "bytes": s.attrs.get("bytes"),
+            "error": s.attrs.get("error"),
+        })
+        for child in sorted(children.get(s.span_id, []), key=lambda c: c.start_ns):
+            walk(child, depth + 1)
+
+    # Roots: spans whose parent isn't in the buffer (evicted or top-level), newest first
+    roots = [s for s in spans if s.parent_id is None or s.parent_id not in known]
+    for root in sorted(roots, key=lambda r: r.start_ns, reverse=True):
+        walk(root, 0)
+    return rows
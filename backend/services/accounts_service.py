@@ -1,57 +1,98 @@
-from backend.infrastructure import local_storage
+import pandas as pd
+from backend.infrastructure import local_storage, sqlite_store, tracing
 from backend.domain import account_logic
+from backend.services import fx_service
 import config
 
+def get_db_path():
+    """
+    Returns the local store path. Whenever accounts.json changed, accounts added to it
+    (or fields an account doesn't have yet) are merged into the store; nothing stored is overwritten.
+    """
+    config.ensure_data_files_exist()
+    sqlite_store.sync_document(
+        config.LOCAL_DB_PATH, "accounts", config.ACCOUNTS_PATH,
+        lambda: sqlite_store.import_accounts(config.LOCAL_DB_PATH, local_storage.load_json_data(config.ACCOUNTS_PATH))
+    )
+    return config.LOCAL_DB_PATH
+
 def load_account_map():
     """
     Service Capability: Load accounts and transform them into the required map.
     """
-    # 1. Infrastructure: Get raw data (list of dicts from JSON)
-    raw_data = local_storage.load_json_data(config.ACCOUNTS_PATH)
+    # 1. Infrastructure: Get raw data (dict of accounts from the local store)
+    raw_data = sqlite_store.load_accounts(get_db_path())
     
     # 2. Domain: Apply business logic to transform it (e.g., map Name -> Bank)
     account_map = account_logic.create_account_map(raw_data) 
     
     return account_map
 
+def load_account_data():
+    """Service Capability: Raw account details ({account_id: {...}})."""
+    return sqlite_store.load_accounts(get_db_path())
+
+@tracing.traced("accounts.get_accounts_dataframe")
 def get_accounts_dataframe(show_archived=False):
     """
     Service Capability: Get accounts as a DataFrame for the UI.
     """
     # 1. Infrastructure: Load raw accounts data
-    raw_data = local_storage.load_json_data(config.ACCOUNTS_PATH)
+    raw_data = sqlite_store.load_accounts(get_db_path())
     
     # 2. Domain: Transform to DataFrame
-    df = account_logic.transform_to_dataframe(raw_data, show_archived)
+    df = account_logic.transform_to_dataframe(raw_data, show_archived, config.BASE_CURRENCY)
+
+    # 3. Convert balances to the base currency at today's rate
+    df["fx_date"] = pd.Timestamp("today").normalize()
+    df = fx_service.convert_to_base(df, ["balance"], date_col="fx_date").drop(columns=["fx_date"])
     
     return df
 
 def calculate_total_balance(df):
     """
     Acts as a bridge. The View doesn't need to know 'accounts_logic' exists.
+    Returns (total, accounts left out for lack of an FX rate).
     """
     return account_logic.calculate_total_balance(df)
 
+def convert_transactions_to_base(df, account_id, amount_cols=("debit", "credit")):
+    """
+    Adds '<col>_base' columns to an account's transactions, converted from the account's
+    currency at each transaction's date. Returns a new DataFrame.
+    """
+    if df is None:
+        return None
+    currency = load_account_data().get(account_id, {}).get("currency") or config.BASE_CURRENCY
+    converted = fx_service.convert_to_base(df.assign(currency=currency), list(amount_cols))
+    return converted.drop(columns=["currency", "fx_rate"], errors="ignore")
+
+@tracing.traced("accounts.update_account_balance")
 def update_account_balance(acc_id, new_balance):
     """
-    Updates the balance, saves to disk.
+    Updates the balance and appends it to the balance history.
     Returns True if successful, False otherwise.
     """
     try:
-        # 1. Load fresh data from infrastructure
-        data = local_storage.load_json_data(config.ACCOUNTS_PATH)
-        
-        # 2. Apply business logic (Find ID and update value)
-        balance_set = account_logic.set_account_balance(data, acc_id, new_balance)
-
-        if balance_set:
-            # 3. Save to disk
-            local_storage.save_data(config.ACCOUNTS_PATH, data)
-            
-            return True
-        
-        return False
+        db_path = get_db_path()
+
+        # 1. Apply business logic (Find ID and stamp the new value)
+        data = sqlite_store.load_accounts(db_path)
+        if not account_logic.set_account_balance(data, acc_id, new_balance):
+            return False
+
+        # 2. Row-level update + history append in one transaction
+        if not sqlite_store.set_account_balance(
+            db_path, acc_id, data[acc_id]['balance'], data[acc_id]['last_updated']
+        ):
+            return False
+
+        # 3. Carry the new balance into the net worth history.
+        # Imported here: the net worth service sits on top of this one
+        from backend.services import net_worth_service
+        net_worth_service.refresh()
+        return True
 
     except Exception as e:
         print(f"Service Error: Could not update balance for {acc_id}: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -1,7 +1,10 @@
 import streamlit as st
 from backend.services import rules_service, accounts_service
+from backend.infrastructure import local_storage, sqlite_store, frame_cache, tracing
 import config
 
+tracing.configure(enabled=config.TRACING_ENABLED, buffer_size=config.TRACE_BUFFER_SIZE)
+
 @st.cache_data
 def load_global_context():
     """
@@ -20,4 +23,38 @@ def load_global_context():
     # 3. Get Configs
     table_id = config.get_table_id()
 
-    return category_data, category_options, account_map, table_id
\ No newline at end of file
+    return category_data, category_options, account_map, table_id
+
+@st.cache_resource
+def get_frame_cache():
+    """One cache of query results per process, shared by every session."""
+    return frame_cache.SharedFrameCache(
+        max_bytes=config.SHARED_CACHE_MAX_MB * 1024 ** 2,
+        ttl=config.SHARED_CACHE_TTL_SECONDS
+    )
+
+def fetch_shared(name, table_id, account_id, loader):
+    """
+    Returns the result of loader() from the shared cache, keyed by
+    (name, table, account, watermark). Writes through db_client bump the watermark,
+    so a save is never followed by a stale read; entries for older watermarks are dropped.
+    """
+    cache = get_frame_cache()
+    watermark = frame_cache.get_watermark(table_id, account_id)
+    cache.invalidate(lambda key: key[:3] == (name, table_id, account_id) and key[3] != watermark)
+    return cache.get((name, table_id, account_id, watermark), loader)
+
+def _on_source_change(path):
+    """Drops the cached context as soon as one of its source documents changes."""
+    load_global_context.clear()
+
+local_storage.subscribe(sqlite_store.change_key(config.LOCAL_DB_PATH, "accounts"), _on_source_change)
+local_storage.subscribe(sqlite_store.change_key(config.RULES_DB_PATH, "rules"), _on_source_change)
+
+def get_trace_summary(limit=200):
+    """Recent spans as indented rows (newest request first) for the trace panel."""
+    return tracing.summarize(tracing.get_spans(limit))
+
+def export_trace():
+    """Writes the buffered spans as a Chrome trace to TRACE_EXPORT_PATH. Returns (path, event_count)."""
+    return config.TRACE_EXPORT_PATH, tracing.export_chrome_trace(config.TRACE_EXPORT_PATH)
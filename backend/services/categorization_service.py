@@ -1,22 +1,31 @@
-from backend.domain import transaction_logic
-from backend.infrastructure import db_client, queries
+from backend.domain import transaction_logic, transaction_schema
+from backend.infrastructure import db_client, queries, tracing
+from backend.services import app_service
 import pandas as pd
 
+@tracing.traced("categorization.fetch_uncategorized_transactions")
 def fetch_uncategorized_transactions(table_id, account_id):
     """
     Fetches uncategorized transactions and returns a DataFrame.
+    Served from the cross-session cache; the frame is this session's copy of the shared one.
     """
-    # 1. Get Query (Hidden from UI)
-    query = queries.get_uncategorized_transactions_query(table_id, account_id)
-    
-    # 2. Fetch Data (Model)
-    data = db_client.run_query(query)
-    
-    # 3. Return Logic
-    if data:
-        return pd.DataFrame(data)
-    return None
+    def load():
+        # 1. Get Query (Hidden from UI)
+        query = queries.get_uncategorized_transactions_query(table_id, account_id)
+        
+        # 2. Fetch Data (Model)
+        data = db_client.run_query(query)
+        
+        # 3. Return Logic (compact dtypes; category and label stay editable strings)
+        if data:
+            return transaction_schema.apply_dtype_plan(
+                pd.DataFrame(data), date32=True, editable=("category", "label")
+            )
+        return None
+
+    return app_service.fetch_shared("uncategorized", table_id, account_id, load)
 
+@tracing.traced("categorization.save_categorization_updates")
 def save_categorization_updates(original_df, edited_df, table_id):
     """
     Calculates changes and pushes updates to DB.
@@ -0,0 +1,73 @@
+import streamlit as st
+import pandas as pd
+from backend.domain import fx_logic
+from backend.infrastructure import sqlite_store
+import config
+
+def sync_fx_rates(currencies):
+    """
+    Fetches daily rates for the given currencies into the local FX table.
+    Only days from the last stored date onwards are requested. Returns rows written.
+    """
+    # Deferred: converting with already stored rates shouldn't load the market data stack
+    from backend.services import market_data_service
+
+    provider = market_data_service.get_provider()
+    breaker = market_data_service.get_circuit_breaker()
+    written = 0
+
+    for currency in currencies:
+        if currency == config.BASE_CURRENCY:
+            continue
+        last_date = sqlite_store.get_last_fx_date(config.LOCAL_DB_PATH, currency)
+        bars = breaker.call(provider.fetch_history, fx_logic.fx_ticker(currency, config.BASE_CURRENCY), last_date)
+        if bars is None or bars.empty:
+            continue
+
+        closes = bars["Close"]
+        if isinstance(closes.index, pd.DatetimeIndex) and closes.index.tz is not None:
+            closes.index = closes.index.tz_localize(None)
+        written += sqlite_store.upsert_fx_rates(config.LOCAL_DB_PATH, currency, closes)
+
+    return written
+
+@st.cache_data(ttl=6 * 3600)
+def _sync_once(currencies, day):
+    """At most one provider round trip per currency set and day (per TTL) per process."""
+    try:
+        return sync_fx_rates(currencies)
+    except Exception as e:
+        # Serve the rates already stored
+        print(f"Could not refresh FX rates for {currencies}: {e}")
+        return 0
+
+@st.cache_data
+def _load_rates(currencies, last_dates):
+    """Cached on the last stored date per currency, so renders don't re-read the table."""
+    return sqlite_store.load_fx_rates(config.LOCAL_DB_PATH, list(currencies))
+
+def get_fx_rates(currencies):
+    """Returns the daily rates (date, currency, rate) for the currencies, syncing them first if due."""
+    currencies = tuple(sorted(c for c in set(currencies) if c and c != config.BASE_CURRENCY))
+    if not currencies:
+        return pd.DataFrame(columns=["date", "currency", "rate"])
+
+    _sync_once(currencies, pd.Timestamp("today").strftime("%Y-%m-%d"))
+    last_dates = tuple(sqlite_store.get_last_fx_date(config.LOCAL_DB_PATH, c) for c in currencies)
+    return _load_rates(currencies, last_dates)
+
+def get_latest_rate(currency):
+    """Latest known rate from currency to the base currency (1.0 for the base currency, None if unknown)."""
+    if not currency or currency == config.BASE_CURRENCY:
+        return 1.0
+    rates = get_fx_rates([currency])
+    if rates.empty:
+        return None
+    return float(rates["rate"].iloc[-1])
+
+def convert_to_base(df, amount_cols, date_col="date", currency_col="currency"):
+    """Adds '<col>_base' columns with the amounts converted at each row's date (as-of join on daily rates)."""
+    if df.empty:
+        return df.assign(**{f"{col}_base": pd.Series(dtype=float) for col in amount_cols})
+    rates = get_fx_rates(df[currency_col].dropna().unique())
+    return fx_logic.convert_to_base(df, amount_cols, rates, config.BASE_CURRENCY, date_col, currency_col)
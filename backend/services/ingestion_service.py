@@ -1,13 +1,14 @@
-from backend.infrastructure import local_storage, parsers, db_client, queries
-from backend.domain import account_logic, categorization_logic, transaction_logic
-from backend.services import accounts_service
+from backend.infrastructure import parsers, db_client, queries, sqlite_store, tracing
+from backend.domain import account_logic, categorization_logic, transaction_logic, money_logic, transaction_schema
+from backend.services import accounts_service, net_worth_service
 import pandas as pd
 import config
 
+@tracing.traced("ingestion.process_transaction_upload")
 def process_transaction_upload(account_id, table_id, uploaded_file, category_data):
     """Facade 1: Handles the READ workflow (File -> DB Check -> New Data)."""
 
-    account_data = local_storage.load_json_data(config.ACCOUNTS_PATH)
+    account_data = accounts_service.load_account_data()
 
     bank = account_logic.get_bank_from_account(account_data, account_id)
 
@@ -17,12 +18,18 @@ def process_transaction_upload(account_id, table_id, uploaded_file, category_dat
     if not strategy_class:
         raise ValueError(f"No parser configured for bank type: '{bank}'")
 
+    # Catch a file from another bank before parsing it (reads only the first few KB)
+    check_file_format(bank, uploaded_file)
+
     # 4. Instantiate and Execute
     # We instantiate here (strategy_class()) so each parse is fresh
     parser = strategy_class()
 
     # Load the uploaded file into a DataFrame
-    df = parser.parse(uploaded_file)
+    with tracing.span("parse", bank=bank) as sp:
+        df = parser.parse(uploaded_file)
+        if sp:
+            sp.set(rows=len(df), bytes=getattr(uploaded_file, "size", None))
 
     print(f"Processed {len(df)} rows for {account_id}")
 
@@ -31,23 +38,88 @@ def process_transaction_upload(account_id, table_id, uploaded_file, category_dat
     
     latest_bq_tx = rows[0] if rows else None
 
-    if latest_bq_tx:
-        # Get new transactions after the latest BQ transaction
-        new_transactions, warning, latest_bq_date = transaction_logic.get_new_transactions(
-            latest_bq_tx, 
-            df
+    new_transactions, warnings, latest_bq_date = _dedup(df, latest_bq_tx)
+    warning = "\n\n".join(warnings) or None
+
+    return _prepare_for_editing(new_transactions, category_data), warning, latest_bq_date
+
+def check_file_format(bank, file):
+    """
+    Raises ValueError if the file is confidently recognized as another bank's export.
+    Files no signature recognizes are let through to the configured parser.
+    """
+    with tracing.span("sniff"):
+        detected = parsers.sniff_bank_format(file)
+    # Banks with near-identical exports can tie; only a strictly better match is a mismatch
+    if detected.bank is not None and detected.confidence > detected.scores.get(bank, 0.0):
+        raise ValueError(
+            f"This file looks like a '{detected.bank}' export ({detected.confidence:.0%} match), "
+            f"but the account is configured for '{bank}'."
         )
+
+def _dedup(df, latest_tx):
+    """
+    New rows of a parsed (cents) frame after latest_tx, the last row already stored,
+    with their balance chain reconciled. Returns (new rows, [warnings], latest date).
+    """
+    if latest_tx:
+        # Get new transactions after the latest BQ transaction
+        with tracing.span("dedup"):
+            new_transactions, warning, latest_date = transaction_logic.get_new_transactions(latest_tx, df)
     else:
-        new_transactions = df
-        warning = "No transactions found in BigQuery. Keeping all CSV rows."
-        latest_bq_date = None
-    
+        new_transactions, warning, latest_date = df, "No transactions found in BigQuery. Keeping all CSV rows.", None
+
+    with tracing.span("reconcile", rows=len(new_transactions)):
+        chain_warning = transaction_logic.check_balance_chain(new_transactions, latest_tx)
+    return new_transactions, [w for w in (warning, chain_warning) if w], latest_date
+
+def _prepare_for_editing(new_transactions, category_data):
+    """Categorizes deduplicated rows and converts them back to euros with editable dtypes."""
     if not new_transactions.empty:
         # Categorize the new transactions
-        categorization_logic.categorize_transactions(new_transactions, category_data)
-    
-    return new_transactions, warning, latest_bq_date
+        with tracing.span("categorize", rows=len(new_transactions)):
+            categorization_logic.categorize_transactions(new_transactions, category_data)
+
+    # Dedup ran on integer cents; the editor and the warehouse work in euros
+    new_transactions = money_logic.frame_from_cents(new_transactions)
+    # Every text column is editable in the import editor
+    return transaction_schema.apply_dtype_plan(
+        new_transactions, editable=("description", "category", "label")
+    )
 
+@tracing.traced("ingestion.process_account_stream")
+def process_account_stream(account_id, table_id, frames, category_data):
+    """
+    Batch counterpart of process_transaction_upload for several exports of one account.
+    frames is [(name, parsed cents frame)] in any order. Files are deduplicated oldest
+    first, each against the newest row accepted so far (BigQuery's latest to begin with),
+    so overlapping exports don't import a row twice.
+    Returns (new transactions, [warnings]).
+    """
+    rows = db_client.run_query(queries.get_latest_transaction_query(table_id, account_id))
+    marker = rows[0] if rows else None
+
+    accepted, warnings = [], []
+    for name, df in sorted(frames, key=lambda item: item[1]["date"].min()):
+        if df.empty:
+            continue
+        if marker is not None and df["date"].max() < pd.to_datetime(marker["date"]):
+            warnings.append(f"{name}: every row predates the last imported transaction, skipped.")
+            continue
+
+        new_transactions, file_warnings, _ = _dedup(df, marker)
+        warnings.extend(f"{name}: {warning}" for warning in file_warnings)
+        if not new_transactions.empty:
+            accepted.append(new_transactions)
+            # The next file continues from this file's last row (in euros, like a BQ row)
+            marker = money_logic.frame_from_cents(new_transactions.iloc[[-1]]).iloc[0].to_dict()
+
+    if not accepted:
+        return pd.DataFrame(), warnings
+    stream = pd.concat(accepted, ignore_index=True)
+    return _prepare_for_editing(stream, category_data), warnings
+
+@tracing.traced("ingestion.save_transactions_workflow")
 def save_transactions_workflow(table_id, account_id, edited_df):
     """
     Facade 2: Handles the WRITE workflow.
@@ -57,8 +129,56 @@ def save_transactions_workflow(table_id, account_id, edited_df):
     # TODO: Move logic to domain layer
     # TODO: Consider using repository pattern for DB interactions
 
-    account_data = local_storage.load_json_data(config.ACCOUNTS_PATH)
+    account_data = accounts_service.load_account_data()
+
+    # Get current max transaction_number for the account
+    start_num = db_client.get_max_transaction_number(table_id, account_id)
+    edited_df, closing_balance = _enrich_for_load(account_data, account_id, edited_df, start_num)
+
+    # Load into BigQuery
+    # TODO: Handle potential errors here
+    db_client.insert_transactions(table_id, edited_df)   
+
+    _record_balances(account_id, edited_df, closing_balance)
+
+    # Update the net worth series from the earliest imported day
+    update_success, error_msg = net_worth_service.refresh_after_import()
+
+    return len(edited_df), update_success, error_msg
+
+@tracing.traced("ingestion.save_batch")
+def save_batch(table_id, new_by_account):
+    """
+    Batch counterpart of save_transactions_workflow: enriches every account's new rows
+    and loads them all with a single load job, then updates balances and net worth once.
+    Returns ({account_id: rows saved}, update_success, error_msg).
+    """
+    account_data = accounts_service.load_account_data()
+
+    enriched = {}
+    for account_id, df in new_by_account.items():
+        if df.empty:
+            continue
+        start_num = db_client.get_max_transaction_number(table_id, account_id)
+        enriched[account_id] = _enrich_for_load(
+            account_data, account_id, transaction_schema.to_plain_dtypes(df), start_num
+        )
+    if not enriched:
+        return {}, True, None
+
+    db_client.insert_transactions(table_id, pd.concat([df for df, _ in enriched.values()], ignore_index=True))
 
+    for account_id, (df, closing_balance) in enriched.items():
+        _record_balances(account_id, df, closing_balance)
+
+    update_success, error_msg = net_worth_service.refresh_after_import()
+    return {account_id: len(df) for account_id, (df, _) in enriched.items()}, update_success, error_msg
+
+def _enrich_for_load(account_data, account_id, edited_df, start_num):
+    """
+    Adds the derived warehouse columns and transaction numbers after start_num.
+    Returns (enriched frame, closing balance or None).
+    """
     # Ensure date column is datetime.date
     edited_df["date"] = pd.to_datetime(edited_df["date"]).dt.date
     
@@ -72,9 +192,6 @@ def save_transactions_workflow(table_id, account_id, edited_df):
     # Ensure transactions are sorted chronologically
     edited_df = edited_df.sort_values(by="date", ascending=True).reset_index(drop=True)
 
-    # Get current max transaction_number for the account
-    start_num = db_client.get_max_transaction_number(table_id, account_id)
-    
     # Assign new transaction numbers sequentially
     edited_df["transaction_number"] = range(start_num + 1, start_num + 1 + len(edited_df))
 
@@ -92,18 +209,19 @@ def save_transactions_workflow(table_id, account_id, edited_df):
     else:
         closing_balance = None
 
-    # Load into BigQuery
-    # TODO: Handle potential errors here
-    db_client.insert_transactions(table_id, edited_df)   
+    return edited_df, closing_balance
 
-    # Update the net worth table
-    update_success, error_msg = db_client.update_net_worth_table() 
+def _record_balances(account_id, edited_df, closing_balance):
+    """Feeds the saved rows into the net worth series and sets the account's closing balance."""
+    # Feed the running balances into the account's net worth series
+    net_worth_service.record_transaction_balances(account_id, edited_df)
 
-    balance_update_success = False
     if closing_balance is not None:
         balance_update_success = accounts_service.update_account_balance(account_id, closing_balance)
         print(f"Set balance to {closing_balance} for {account_id}")
         if not balance_update_success:
             print(f"Warning: Transactions saved, but account balance update failed for {account_id}")
 
-    return len(edited_df), update_success, error_msg
\ No newline at end of file
+def get_inbox_history(limit=20):
+    """Latest outcomes of the import inbox (backend.cli.inbox), most recent first."""
+    return sqlite_store.load_inbox_files(accounts_service.get_db_path(), limit)
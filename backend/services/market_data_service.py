@@ -1,52 +1,155 @@
-import yfinance as yf
 import streamlit as st
 import pandas as pd
+from backend.infrastructure import price_store, tracing
+from backend.infrastructure.circuit_breaker import CircuitBreaker
+from backend.infrastructure.swr_cache import StaleWhileRevalidateCache
+from backend.infrastructure.market_data_providers import PROVIDER_REGISTRY
+from backend.domain import timeseries_logic
+import config
 
-@st.cache_data(ttl=3600) # Cache for 1 hour to avoid excessive API calls
+@st.cache_resource
+def get_provider():
+    """Creates the configured market data provider once per process."""
+    provider_class = PROVIDER_REGISTRY.get(config.MARKET_DATA_PROVIDER)
+
+    if not provider_class:
+        raise ValueError(f"No market data provider configured for: '{config.MARKET_DATA_PROVIDER}'")
+
+    if config.MARKET_DATA_PROVIDER == "file":
+        return provider_class(config.MARKET_DATA_FILE_DIR)
+    return provider_class()
+
+@st.cache_resource
+def get_circuit_breaker():
+    """One breaker per process, shared by every call to the provider."""
+    return CircuitBreaker(failure_threshold=3, reset_timeout=120)
+
+@st.cache_resource
+def _get_quote_cache():
+    """Process-wide quote cache: serves cached quotes and refreshes stale ones in the background."""
+    # Resolved here: the loader also runs on a background thread, outside the script run
+    provider, breaker = get_provider(), get_circuit_breaker()
+
+    def load_quotes(tickers):
+        return breaker.call(provider.fetch_quotes, tickers)
+
+    return StaleWhileRevalidateCache(load_quotes, ttl=config.QUOTE_TTL_SECONDS)
+
+@st.cache_resource
+def _get_history_cache():
+    """Tracks when each ticker's price store was last synced; stale tickers re-sync in the background."""
+    provider, breaker = get_provider(), get_circuit_breaker()
+
+    def sync_tickers(tickers):
+        return {ticker: breaker.call(sync_price_history, ticker, provider) for ticker in tickers}
+
+    return StaleWhileRevalidateCache(sync_tickers, ttl=config.PRICE_HISTORY_TTL_SECONDS)
+
+@tracing.traced("market_data.get_quotes")
+def get_quotes(tickers):
+    """
+    Returns {ticker: quote dict or None} for a list of tickers.
+    Cached quotes are returned immediately (even if stale); only never-seen tickers block on the provider.
+    """
+    if not tickers:
+        return {}
+    return _get_quote_cache().get_many(list(tickers))
+
+@tracing.traced("market_data.sync_price_history")
+def sync_price_history(ticker, provider=None):
+    """
+    Brings the local price store up to date for a ticker.
+    Only bars from the last stored date onwards are fetched; the first sync downloads the full history.
+    Returns the number of stored rows.
+    """
+    provider = provider or get_provider()
+    last_date = price_store.last_stored_date(config.PRICE_STORE_DIR, ticker)
+
+    # Refetch the last stored day too: it may have been a provisional intraday bar
+    new_bars = provider.fetch_history(ticker, start=last_date)
+    if new_bars is None or new_bars.empty:
+        return 0
+
+    # Prices come split/dividend-adjusted, so a new corporate action rewrites the
+    # whole history. In that case replace the store instead of appending to it.
+    # Only bars after the last stored one count: the refetched last day's action is already stored.
+    corporate_action = False
+    if last_date is not None:
+        dates = pd.DatetimeIndex(new_bars["Date"] if "Date" in new_bars.columns else new_bars.index)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        unseen = new_bars[dates.normalize() > last_date.normalize()]
+        for col in ["Dividends", "Stock Splits"]:
+            if col in unseen.columns and (unseen[col].fillna(0) != 0).any():
+                corporate_action = True
+
+    if corporate_action:
+        new_bars = provider.fetch_history(ticker, start=None)
+
+    stored = price_store.merge_history(config.PRICE_STORE_DIR, ticker, new_bars, replace=corporate_action)
+    if ticker == config.STOCK_TICKER:
+        # New closes revalue the shares held. Imported here: it sits on top of this service
+        from backend.services import net_worth_service
+        net_worth_service.sync_stocks()
+    return stored
+
+def get_price_history(ticker, start=None, end=None):
+    """Reads a slice of the stored daily bars (memory-mapped, no network)."""
+    return price_store.read_history(config.PRICE_STORE_DIR, ticker, start, end)
+
+@st.cache_data(max_entries=256)
+def _get_downsampled_closes(ticker, start, end, max_points, store_version):
+    """
+    Cached per (ticker, range, resolution); store_version invalidates it when the store is
+    rewritten, including a corporate action restating past closes without a new last date.
+    """
+    hist = get_price_history(ticker, start, end)
+    return timeseries_logic.downsample_lttb(hist["Close"], max_points)
+
+def get_chart_series(ticker, start=None, end=None, max_points=None):
+    """
+    Returns the close prices for [start, end], downsampled to at most max_points,
+    so the chart payload stays the same size however long the history is.
+    """
+    max_points = max_points or config.CHART_MAX_POINTS
+    store_version = price_store.store_version(config.PRICE_STORE_DIR, ticker)
+    return _get_downsampled_closes(ticker, start, end, max_points, store_version)
+
+@tracing.traced("market_data.get_stock_price")
 def get_stock_price(ticker):
     """
-    Fetches current price, info, and 1-year history for a stock ticker.
-    Returns a dictionary with price info and history DataFrame, or None if it fails.
+    Returns the current quote for a stock ticker plus its history from the local price store,
+    or None if no price is available.
     """
     if not ticker:
         return None
         
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        hist = stock.history(period="max")
+        # Syncs the store on first use; afterwards stale stores re-sync in the background
+        _get_history_cache().get(ticker)
+        hist = get_price_history(ticker)
 
         # If we can't get history, we can't draw the chart.
         if hist.empty:
             print(f"Could not fetch historical data for {ticker}")
             return None
-        
-        # yfinance can be flaky. Try to get price from .info, otherwise use history.
-        if not info or 'currentPrice' not in info or 'previousClose' not in info:
-            # Fallback to history if .info is incomplete
+
+        quote = get_quotes([ticker]).get(ticker)
+        if quote is None:
+            # Provider unavailable: fall back to the stored closes
             if len(hist) < 2:
                 return None # Not enough data
-            
-            price = hist['Close'].iloc[-1]
-            previous_close = hist['Close'].iloc[-2]
-            day_high = None
-            day_low = None
-        else:
-            price = info.get('currentPrice')
-            previous_close = info.get('previousClose')
-            day_high = info.get('dayHigh')
-            day_low = info.get('dayLow')
-
-        return {
-            "price": price,
-            "currency": info.get('currency', 'USD'),
-            "previous_close": previous_close,
-            "day_high": day_high,
-            "day_low": day_low,
-            "name": info.get('shortName', ticker),
-            "history": hist
-        }
+            quote = {
+                "price": hist['Close'].iloc[-1],
+                "currency": 'USD',
+                "previous_close": hist['Close'].iloc[-2],
+                "day_high": None,
+                "day_low": None,
+                "name": ticker
+            }
+
+        return {**quote, "history": hist}
     except Exception as e:
         # Don't crash the app, just log that it failed.
         print(f"Could not fetch stock data for {ticker}: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -1,7 +1,11 @@
 import pandas as pd
 import numpy as np
-from backend.infrastructure import db_client, queries
+import streamlit as st
+from backend.infrastructure import db_client, queries, tracing
+from backend.domain import mortgage_logic
+from backend.services import net_worth_service
 
+@tracing.traced("mortgage.get_mortgage_terms")
 def get_mortgage_terms(table_id):
     """Fetches mortgage terms and handles empty state."""
     query = queries.get_mortgage_terms_query(table_id)
@@ -15,27 +19,54 @@ def get_mortgage_terms(table_id):
         ])
     return df
 
-def save_mortgage_terms(table_id, terms_df, events_df=None):
-    """Wrapper to save mortgage updates."""
-    df_to_save = terms_df.copy()
-    
-    # Nest events into the dataframe if provided
-    if events_df is not None and not events_df.empty and not df_to_save.empty:
-        # Convert events DF to list of dicts and ensure date objects
-        events_data = events_df.copy()
-        events_data['date'] = pd.to_datetime(events_data['date']).dt.date
-        events_list = events_data.to_dict('records')
-        
-        # Assign to the first mortgage (assuming single mortgage context for now)
-        df_to_save['events'] = df_to_save['events'].astype('object')
-        df_to_save.at[0, 'events'] = events_list
-    elif 'events' not in df_to_save.columns:
-         df_to_save['events'] = None 
+@tracing.traced("mortgage.save_mortgage_terms")
+def save_mortgage_terms(table_id, terms_df, events_by_mortgage=None):
+    """
+    Wrapper to save mortgage updates.
+    events_by_mortgage: {mortgage_name: events_df}. Mortgages without an entry keep their saved events.
+    """
+    df_to_save = terms_df.copy().reset_index(drop=True)
+
+    if 'events' not in df_to_save.columns:
+        df_to_save['events'] = None
+    df_to_save['events'] = df_to_save['events'].astype('object')
+
+    # Nest each mortgage's events into its own row
+    for name, events_df in (events_by_mortgage or {}).items():
+        row_idx = df_to_save.index[df_to_save['mortgage_name'] == name]
+        if row_idx.empty:
+            continue
+
+        events_list = []
+        if events_df is not None and not events_df.empty:
+            # Convert events DF to list of dicts and ensure date objects
+            events_data = events_df[["date", "event_type", "value"]].dropna(subset=["date"]).copy()
+            events_data['date'] = pd.to_datetime(events_data['date']).dt.date
+            events_list = events_data.to_dict('records')
 
-    return db_client.save_mortgage_updates(table_id, df_to_save)
+        for idx in row_idx:
+            df_to_save.at[idx, 'events'] = events_list
+
+    result = db_client.save_mortgage_updates(table_id, df_to_save)
+    net_worth_service.sync_mortgages()
+    return result
+
+def get_saved_schedule(terms_df):
+    """
+    Returns the amortization schedule for the saved terms, computed locally with the
+    same engine as the simulator. A single mortgage gets its own schedule, several
+    mortgages get the aggregated liability schedule.
+    """
+    schedules, aggregated = get_portfolio_schedules(terms_df)
+    if schedules.empty:
+        return pd.DataFrame()
+
+    if schedules["mortgage_name"].nunique() > 1:
+        return aggregated
+    return schedules.drop(columns=["mortgage_name"])
 
 def get_mortgage_schedule(table_id):
-    """Fetches the amortization schedule."""
+    """Fetches the amortization schedule from the warehouse view."""
     query = queries.get_mortgage_schedule_query(table_id)
     rows = db_client.run_query(query)
     df = pd.DataFrame(rows) if rows else pd.DataFrame()
@@ -45,8 +76,17 @@ def get_mortgage_schedule(table_id):
 
     return df
 
-def get_simulation_defaults(df):
-    """Extracts default simulation values from the mortgage terms dataframe."""
+def get_mortgage_names(df):
+    """Returns the names of the mortgages defined in the terms dataframe."""
+    if df.empty or "mortgage_name" not in df.columns:
+        return []
+    return df["mortgage_name"].dropna().astype(str).unique().tolist()
+
+def get_simulation_defaults(df, mortgage_name=None):
+    """
+    Extracts default simulation values for one mortgage from the terms dataframe.
+    Falls back to the first mortgage if no name is given.
+    """
     defaults = {
         "balance": 300000.0,
         "rate": 4.0,
@@ -57,7 +97,8 @@ def get_simulation_defaults(df):
     events_df = pd.DataFrame(columns=["date", "event_type", "value"])
 
     if not df.empty:
-        row = df.iloc[0]
+        matches = df[df["mortgage_name"] == mortgage_name] if mortgage_name is not None else df
+        row = matches.iloc[0] if not matches.empty else df.iloc[0]
         defaults["balance"] = float(row.get("start_balance", defaults["balance"]))
         defaults["rate"] = float(row.get("interest_rate_pct", defaults["rate"]))
         defaults["payment"] = float(row.get("monthly_payment", defaults["payment"]))
@@ -69,4 +110,69 @@ def get_simulation_defaults(df):
             if raw_events is not None and len(raw_events) > 0:
                  events_df = pd.DataFrame(list(raw_events))
         
-    return defaults, events_df
\ No newline at end of file
+    return defaults, events_df
+
+def _split_terms(terms_df):
+    """
+    Splits the terms table into flat loan and event frames.
+    Flat frames (no nested arrays) hash cleanly, so they make good cache keys.
+    """
+    loans = terms_df.dropna(subset=["mortgage_name", "start_date"]).rename(columns={
+        "start_balance": "principal",
+        "interest_rate_pct": "annual_rate_pct"
+    })
+    loans = loans[["mortgage_name", "principal", "annual_rate_pct", "monthly_payment", "start_date"]].copy()
+    loans["start_date"] = pd.to_datetime(loans["start_date"])
+
+    events = mortgage_logic.flatten_mortgage_events(terms_df)
+    if not events.empty:
+        events["date"] = pd.to_datetime(events["date"])
+        events["value"] = pd.to_numeric(events["value"], errors="coerce")
+
+    return loans.reset_index(drop=True), events.reset_index(drop=True)
+
+@st.cache_data
+def _compute_portfolio_schedules(loans_df, events_df):
+    """Runs all loans through the batch engine. Cached on the flat terms."""
+    schedules = mortgage_logic.calculate_amortization_schedules(loans_df, events_df)
+    aggregated = mortgage_logic.aggregate_liability_schedule(schedules)
+    return schedules, aggregated
+
+@tracing.traced("mortgage.get_portfolio_schedules")
+def get_portfolio_schedules(terms_df):
+    """
+    Returns (per-mortgage schedules, aggregated liability schedule) for the saved terms.
+    Computed once per distinct set of terms and events.
+    """
+    if terms_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    loans_df, events_df = _split_terms(terms_df)
+    return _compute_portfolio_schedules(loans_df, events_df)
+
+def get_loans(terms_df):
+    """Flat loan terms (mortgage_name, principal, annual_rate_pct, monthly_payment, start_date)."""
+    return _split_terms(terms_df)[0]
+
+def cross_check_schedule(view_id, terms_df, tolerance=0.01):
+    """
+    On-demand check of the local schedule against the warehouse view.
+    Returns (all_match, comparison_df).
+    """
+    view_df = get_mortgage_schedule(view_id)
+    schedules, _ = get_portfolio_schedules(terms_df)
+
+    # An empty side is compared as such: every month of the other side is then a mismatch,
+    # and the comparison keeps its columns for the page either way
+    empty = pd.DataFrame(columns=["mortgage_name", "month", "balance"])
+    if view_df.empty:
+        view_df = empty
+    if schedules.empty:
+        schedules = empty
+
+    # Without a mortgage_name in the view we can only compare the totals
+    if "mortgage_name" not in view_df.columns and not schedules.empty:
+        schedules = mortgage_logic.aggregate_liability_schedule(schedules)
+
+    comparison = mortgage_logic.compare_schedules(schedules, view_df, tolerance)
+    return bool(comparison["matches"].all()), comparison
@@ -0,0 +1,130 @@
+import pandas as pd
+from backend.infrastructure import db_client, sqlite_store, tracing
+from backend.domain import account_logic, net_worth_logic
+from backend.services import accounts_service, fx_service
+import config
+
+def _get_db_path():
+    """Local store path, with the account points seeded from the balance history on first use."""
+    db_path = accounts_service.get_db_path()
+    sqlite_store.seed_once(db_path, "net_worth", lambda: sqlite_store.seed_net_worth_from_balance_history(db_path))
+    return db_path
+
+@tracing.traced("net_worth.refresh")
+def refresh(today=None):
+    """
+    Brings every series' daily values up to today. Each series is recomputed only from
+    its earliest changed point (or from the day after its last computed day), so an import
+    touches the days it affects rather than the whole history.
+    Only reads the local store: sources are fed in by sync_mortgages / sync_stocks when they change.
+    Returns the number of daily rows written.
+    """
+    db_path = _get_db_path()
+    today = pd.Timestamp(today if today is not None else "today").normalize()
+    written = 0
+
+    for series in sqlite_store.get_net_worth_series(db_path).itertuples(index=False):
+        start = net_worth_logic.refresh_start(series.last_computed, series.dirty_from)
+        if start is not None and start > today:
+            continue
+        points = sqlite_store.load_net_worth_points(db_path, series.series_id, since=start)
+        daily = net_worth_logic.build_daily_series(points, start, today)
+        sqlite_store.write_net_worth_daily(db_path, series.series_id, start, daily, today)
+        written += len(daily)
+
+    return written
+
+def sync_mortgages():
+    """
+    Re-reads the saved mortgage terms and brings the mortgage series in step with them.
+    Called after the terms are saved. Returns True on success; on failure the last points are kept.
+    """
+    # Imported here: the mortgage service sits on top of this one
+    from backend.services import mortgage_service
+    try:
+        terms_df = mortgage_service.get_mortgage_terms(config.MORTGAGE_TABLE_ID)
+        schedules, _ = mortgage_service.get_portfolio_schedules(terms_df)
+        record_mortgage_schedules(schedules, mortgage_service.get_loans(terms_df))
+        refresh()
+        return True
+    except Exception as e:
+        print(f"Net worth: mortgage series not updated: {e}")
+        return False
+
+def sync_stocks():
+    """
+    Values the shares actually held (the lot ledger's vests minus recorded sales) at the stored
+    closes and brings the stock series in step. Called after grants or sales are saved and when
+    new prices are stored. Returns True on success; on failure the last points are kept.
+    """
+    # Imported here: the stocks service sits on top of this one
+    from backend.services import stocks_service
+    try:
+        schedule_df = stocks_service.get_stocks_data(config.STOCKS_TABLE_ID)
+        events, prices_df = stocks_service.get_ledger_events(schedule_df, config.STOCK_TICKER)
+        record_stock_holdings(config.STOCK_TICKER, net_worth_logic.held_value_points(events, prices_df), config.STOCK_CURRENCY)
+        refresh()
+        return True
+    except Exception as e:
+        print(f"Net worth: stock series not updated: {e}")
+        return False
+
+def record_transaction_balances(account_id, transactions_df):
+    """Feeds the daily closing balances of imported transactions into the account's series."""
+    points = net_worth_logic.daily_closing_balances(transactions_df)
+    return sqlite_store.record_net_worth_points(_get_db_path(), account_id, "account", points)
+
+def record_mortgage_schedules(schedules_df, loans_df):
+    """Feeds each mortgage's outstanding balance into its liability series (skipped when unchanged)."""
+    db_path = _get_db_path()
+    for name, points in net_worth_logic.mortgage_points(schedules_df, loans_df).items():
+        sqlite_store.replace_net_worth_points(
+            db_path, net_worth_logic.series_id("mortgage", name), "mortgage",
+            points, net_worth_logic.fingerprint(points), config.BASE_CURRENCY
+        )
+
+def record_stock_holdings(ticker, points, currency):
+    """Feeds the value of the shares held into the ticker's series (skipped when unchanged)."""
+    sqlite_store.replace_net_worth_points(
+        _get_db_path(), net_worth_logic.series_id("stocks", ticker), "stocks",
+        points, net_worth_logic.fingerprint(points), currency
+    )
+
+def refresh_after_import():
+    """
+    Updates the net worth series after transactions were saved.
+    Also runs the warehouse procedure when NET_WORTH_WAREHOUSE_REFRESH is on.
+    Returns (success, error_message) like db_client.update_net_worth_table.
+    """
+    try:
+        refresh()
+    except Exception as e:
+        return False, f"Local net worth refresh failed: {e}"
+
+    if config.NET_WORTH_WAREHOUSE_REFRESH:
+        return db_client.update_net_worth_table()
+    return True, None
+
+@tracing.traced("net_worth.get_net_worth_history")
+def get_net_worth_history(start_date=None, end_date=None):
+    """
+    Daily net worth per series (accounts, mortgages, shares held), in the base currency.
+    Returns a DataFrame indexed by date with one column per series plus 'net_worth'.
+    Reads the stored daily values only: they are refreshed when imports, balances,
+    mortgage terms, grants, sales or prices change, never on a read.
+    """
+    db_path = _get_db_path()
+    wide_df = net_worth_logic.pivot_net_worth(sqlite_store.load_net_worth_daily(db_path, start_date, end_date))
+
+    accounts = sqlite_store.load_accounts(db_path)
+    series = sqlite_store.get_net_worth_series(db_path)
+    currencies = {
+        row.series_id: row.currency if pd.notna(row.currency)
+        else accounts.get(row.series_id, {}).get("currency", config.BASE_CURRENCY)
+        for row in series.itertuples(index=False)
+    }
+    if all(c == config.BASE_CURRENCY for c in currencies.values()):
+        return wide_df
+
+    rates_df = fx_service.get_fx_rates(currencies.values())
+    return account_logic.convert_net_worth_history(wide_df, currencies, rates_df, config.BASE_CURRENCY)
@@ -1,18 +1,29 @@
 import pandas as pd
-from backend.infrastructure import db_client, queries
+from backend.infrastructure import db_client, queries, tracing
+from backend.domain import transaction_schema
+from backend.services import app_service
 
+@tracing.traced("reimbursements.fetch_reimbursement_candidates")
 def fetch_reimbursement_candidates(table_id, account_id):
-    """Facade for fetching potential incoming reimbursements."""
-    query = queries.get_reimbursement_transactions_query(table_id, account_id)
-    data = db_client.run_query(query)
-    return pd.DataFrame(data) if data else None
+    """Facade for fetching potential incoming reimbursements (shared across sessions)."""
+    def load():
+        query = queries.get_reimbursement_transactions_query(table_id, account_id)
+        data = db_client.run_query(query)
+        return transaction_schema.apply_dtype_plan(pd.DataFrame(data), date32=True) if data else None
 
+    return app_service.fetch_shared("reimbursements", table_id, account_id, load)
+
+@tracing.traced("reimbursements.fetch_expense_candidates")
 def fetch_expense_candidates(table_id, account_id):
-    """Facade for fetching potential expenses."""
-    query = queries.get_all_expenses_query(table_id, account_id)
-    data = db_client.run_query(query)
-    return pd.DataFrame(data) if data else None
+    """Facade for fetching potential expenses (shared across sessions)."""
+    def load():
+        query = queries.get_all_expenses_query(table_id, account_id)
+        data = db_client.run_query(query)
+        return transaction_schema.apply_dtype_plan(pd.DataFrame(data), date32=True) if data else None
+
+    return app_service.fetch_shared("expenses", table_id, account_id, load)
 
+@tracing.traced("reimbursements.link_reimbursement_to_expense")
 def link_reimbursement_to_expense(table_id, reimb_row, expense_row):
     """Facade for the write operation."""
     db_client.link_reimbursement_struct_array(table_id, reimb_row, expense_row)
\ No newline at end of file
@@ -1,10 +1,24 @@
-from backend.infrastructure import local_storage
+from backend.infrastructure import local_storage, sqlite_store
 import config
 
+def _seed_rules():
+    """First rules of the shared store, from categories.json."""
+    return sqlite_store.save_categories(config.RULES_DB_PATH, local_storage.load_json_data(config.CATEGORIES_PATH))
+
+def _get_db_path():
+    """
+    Returns the rules store path, seeding it on first use. Rules are shared by dev and prod,
+    as categories.json was, so they live in their own store rather than the environment's.
+    """
+    config.ensure_data_files_exist()
+    sqlite_store.seed_once(config.RULES_DB_PATH, "rules", _seed_rules)
+    return config.RULES_DB_PATH
+
 def update_rules(new_data):
     try:
-        local_storage.save_data(config.CATEGORIES_PATH, new_data)
-        return True, "File saved successfully."
+        # Only the categories/keywords that changed are written
+        sqlite_store.save_categories(_get_db_path(), new_data)
+        return True, "Rules saved successfully."
     except Exception as e:
         # Return a clean error message to the UI
         return False, f"System Error: {str(e)}"
@@ -13,5 +27,5 @@ def get_all_categories():
     """
     Service Capability: Fetch the latest category tree.
     """
-    # Simply delegates to the infrastructure to read the JSON file
-    return local_storage.load_json_data(config.CATEGORIES_PATH)
+    # Simply delegates to the infrastructure to read the local store
+    return sqlite_store.load_categories(_get_db_path())
@@ -1,8 +1,86 @@
+import os
+import json
+import threading
 import pandas as pd
-from backend.infrastructure import db_client, queries
+import streamlit as st
+from backend.domain import stocks_logic, lots_logic
+from backend.infrastructure import db_client, queries, price_store, local_storage, tracing
+from backend.services import net_worth_service
+import config
 
-def get_stocks_data(table_id):
-    """Fetches stock vesting data."""
+def get_grants():
+    """Loads the grant definitions ({grant_id: {...}}) from the local grants file."""
+    if not os.path.exists(config.GRANTS_PATH):
+        return {}
+    return local_storage.load_json_data(config.GRANTS_PATH)
+
+def _get_latest_close(ticker):
+    """Last stored close for a ticker, or None if the price store is empty."""
+    last_date = price_store.last_stored_date(config.PRICE_STORE_DIR, ticker)
+    if last_date is None:
+        return None
+    return float(price_store.read_history(config.PRICE_STORE_DIR, ticker, start=last_date)["Close"].iloc[-1])
+
+@st.cache_data(max_entries=16)
+def _generate_schedule(grants_key, withholding_rate):
+    """
+    Cached on the serialized grants, so the schedule is only rebuilt when a grant changes.
+    Unpriced: the price moves every tick, and repricing is two column products.
+    """
+    grants_df = pd.DataFrame([
+        {"grant_id": grant_id, **details} for grant_id, details in json.loads(grants_key).items()
+    ])
+    return stocks_logic.generate_vest_schedule(grants_df, None, withholding_rate)
+
+def generate_local_schedule(grants, price=None):
+    """Vest schedule generated from the grant definitions, priced at `price` (default: last stored close)."""
+    if price is None:
+        price = _get_latest_close(config.STOCK_TICKER) or 0.0
+
+    grants_key = json.dumps(grants, sort_keys=True)
+    schedule = _generate_schedule(grants_key, config.STOCK_WITHHOLDING_RATE).copy()
+    return stocks_logic.price_vest_schedule(schedule, price, config.STOCK_WITHHOLDING_RATE)
+
+@tracing.traced("stocks.get_stocks_data")
+def get_stocks_data(table_id, price=None):
+    """
+    Returns the vesting schedule. Generated locally from the grants file when grants are defined,
+    otherwise read from the warehouse table.
+    """
+    grants = get_grants()
+    if grants:
+        return generate_local_schedule(grants, price)
+
+    return _fetch_warehouse_schedule(table_id)
+
+def save_grants(table_id, grants, price=None):
+    """
+    Saves the grant definitions and, only if they changed, refreshes the warehouse copy of the schedule.
+    The copy is priced at `price`, the one the page shows (default: last stored close, as there).
+    Returns (success, message).
+    """
+    try:
+        with local_storage.file_lock(config.GRANTS_PATH):
+            if grants == get_grants():
+                return True, "No grant changes to save."
+            local_storage.save_data(config.GRANTS_PATH, grants)
+
+        if not grants:
+            # Without grants the schedule comes from the warehouse again: leave it as is
+            net_worth_service.sync_stocks()
+            return True, "Cleared the local grants; the schedule is read from BigQuery."
+
+        df_to_load = generate_local_schedule(grants, price)
+        df_to_load["Date"] = df_to_load["Date"].dt.date
+        row_count = db_client.replace_table_data(table_id, df_to_load)
+        net_worth_service.sync_stocks()
+
+        return True, f"Saved {len(grants)} grants and refreshed {row_count} vest rows in BigQuery."
+    except Exception as e:
+        return False, str(e)
+
+def _fetch_warehouse_schedule(table_id):
+    """Fetches stock vesting data from the warehouse."""
     query = queries.get_stocks_data_query(table_id)
     rows = db_client.run_query(query)
     df = pd.DataFrame(rows)
@@ -21,4 +99,98 @@ def get_stocks_data(table_id):
         # Drop rows where key data is missing to prevent calculation errors
         df.dropna(subset=['Date', 'Total_Vested_after_tax'], inplace=True)
             
-    return df
\ No newline at end of file
+    return df
+
+def get_schedule_version(df):
+    """Content hash of the vest schedule (Date, GSUs). Changes whenever the schedule does."""
+    if df.empty:
+        return "empty"
+    return format(int(pd.util.hash_pandas_object(df[["Date", "GSUs"]], index=False).sum()), "x")
+
+@st.cache_data
+def _compute_vest_valuation(schedule_version, ticker, price_version, withholding_rate, fx_rate, _schedule_df):
+    """
+    Cached on (schedule version, price store version): a rerun with the same schedule and
+    an unchanged store returns the previous series without reading the prices.
+    """
+    prices_df = price_store.read_history(config.PRICE_STORE_DIR, ticker)
+    return stocks_logic.calculate_vest_valuation(_schedule_df, prices_df, withholding_rate, fx_rate)
+
+@tracing.traced("stocks.get_vest_valuation")
+def get_vest_valuation(df, ticker, withholding_rate=None, fx_rate=1.0):
+    """Daily vested/unvested value of the schedule, priced with the stored closes of ticker."""
+    if withholding_rate is None:
+        withholding_rate = config.STOCK_WITHHOLDING_RATE
+
+    price_version = price_store.store_version(config.PRICE_STORE_DIR, ticker)
+    if df.empty or price_version is None:
+        return pd.DataFrame()
+
+    return _compute_vest_valuation(
+        get_schedule_version(df), ticker, price_version, withholding_rate, fx_rate, df
+    )
+
+def get_sales():
+    """Loads the recorded share sales (list of {date, units, price, lot_ids}) from the local sales file."""
+    if not os.path.exists(config.STOCK_SALES_PATH):
+        return []
+    return local_storage.load_json_data(config.STOCK_SALES_PATH)
+
+# Syncing and recording a sale read the sales file and move the shared ledger:
+# one session at a time, so a sale can't be synced away before it is saved
+_ledger_lock = threading.Lock()
+
+@st.cache_resource
+def _get_ledger():
+    """One ledger per process; it's synced incrementally on every read."""
+    return lots_logic.LotLedger()
+
+def get_ledger_events(df, ticker, sales=None):
+    """
+    Ledger events (past vests net of sell-to-cover, then sales) for the schedule df and the
+    recorded sales (or the given list). Returns (events, prices_df).
+    """
+    prices_df = price_store.read_history(config.PRICE_STORE_DIR, ticker)
+    events = lots_logic.build_ledger_events(
+        df, prices_df, get_sales() if sales is None else sales, config.STOCK_WITHHOLDING_RATE
+    )
+    return events, prices_df
+
+@tracing.traced("stocks.get_lot_ledger")
+def get_lot_ledger(df, ticker):
+    """
+    Returns the lot ledger brought up to date with the schedule's past vests and the recorded sales.
+    Appended vests/sales are applied on top of the existing state; edits to the past trigger a rebuild.
+    """
+    ledger = _get_ledger()
+    with _ledger_lock:
+        ledger.sync(get_ledger_events(df, ticker)[0])
+    return ledger
+
+def record_sale(df, ticker, sale_date, units, price, lot_ids=None):
+    """
+    Validates a sale against the current lots, then appends it to the sales file.
+    Returns (success, message).
+    """
+    sale = {
+        "date": pd.Timestamp(sale_date).strftime("%Y-%m-%d"),
+        "units": float(units),
+        "price": float(price),
+        # Lot keys (vest dates), which stay valid when the ledger is rebuilt
+        "lot_ids": [str(i) for i in lot_ids] if lot_ids else None
+    }
+
+    try:
+        # Apply to the ledger first: a sale dated after the last event is just appended,
+        # and an invalid sale is rejected before it reaches the file.
+        # The file lock covers other processes; the ledger lock the sessions sharing the ledger
+        with _ledger_lock, local_storage.file_lock(config.STOCK_SALES_PATH):
+            sales = get_sales() + [sale]
+            events, _ = get_ledger_events(df, ticker, sales)
+            _get_ledger().sync(events)
+
+            local_storage.save_data(config.STOCK_SALES_PATH, sales)
+        net_worth_service.sync_stocks()
+        return True, f"🎉 Recorded sale of {units:g} shares."
+    except ValueError as e:
+        return False, str(e)
@@ -0,0 +1,97 @@
+"""
+Benchmark cases for the hot paths. Each case builds its inputs outside the timed region
+and returns the callable to time. `max_rows` caps the row-by-row (Python-level) paths
+so a 10M sweep finishes; pass --no-caps to the runner to lift them.
+"""
+import importlib.util
+from dataclasses import dataclass
+from typing import Callable, Optional
+import numpy as np
+from backend.domain import (
+    categorization_logic, money_logic, mortgage_logic, stocks_logic,
+    transaction_logic, transaction_schema,
+)
+from backend.infrastructure import parsers
+from benchmarks import generators
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable          # (rows, seed) -> zero-argument callable to time
+    max_rows: Optional[int] = None
+    requires: Optional[str] = None   # optional module the case needs
+
+    def available(self):
+        return self.requires is None or importlib.util.find_spec(self.requires) is not None
+
+def _parse_case(bank, variant):
+    def setup(rows, seed):
+        export = generators.BANK_EXPORTS[bank][variant](rows, seed)
+        data, name = export.getvalue(), export.name
+        strategy = parsers.PARSER_REGISTRY[bank]
+
+        def run():
+            return strategy().parse(generators.NamedBytesIO(data, name))
+        return run
+    return setup
+
+def _categorize(rows, seed):
+    df = parsers.RevolutStrategy().parse(generators.revolut_csv(rows, seed))
+    rules = generators.rule_set(seed=seed)
+    return lambda: categorization_logic.categorize_transactions(df.copy(), rules)
+
+def _new_transactions(rows, seed):
+    df = parsers.PTSBStrategy().parse(generators.ptsb_csv(rows, seed))
+    # The warehouse already has the first 90%: the marker sits near the end
+    marker = money_logic.frame_from_cents(df.iloc[[int(len(df) * 0.9)]]).iloc[0].to_dict()
+    return lambda: transaction_logic.get_new_transactions(marker, df)
+
+def _balance_chain(rows, seed):
+    df = parsers.PTSBStrategy().parse(generators.ptsb_csv(rows, seed))
+    return lambda: transaction_logic.reconcile_balance_chain(df, df["balance"].iloc[0])
+
+def _changed_rows(rows, seed):
+    original = transaction_schema.apply_dtype_plan(
+        generators.warehouse_rows(rows, seed), date32=True, editable=("category", "label")
+    )
+    edited = original.copy()
+    changed = np.random.default_rng(seed).random(rows) < 0.1
+    edited.loc[changed, "category"] = "Groceries"
+    return lambda: transaction_logic.get_changed_rows(original, edited, ["category", "label"])
+
+def _amortization_single(rows, seed):
+    # ~360 schedule rows per 30-year loan
+    loans = generators.mortgage_loans(max(rows // 360, 1), seed)
+
+    def run():
+        for loan in loans.itertuples(index=False):
+            mortgage_logic.calculate_amortization_schedule(
+                loan.principal, loan.annual_rate_pct, loan.monthly_payment, loan.start_date
+            )
+    return run
+
+def _amortization_batch(rows, seed):
+    loans = generators.mortgage_loans(max(rows // 360, 1), seed)
+    return lambda: mortgage_logic.calculate_amortization_schedules(loans)
+
+def _stock_metrics(rows, seed):
+    df = generators.vest_schedule(rows, seed)
+    return lambda: stocks_logic.calculate_stock_metrics(df)
+
+CASES = [
+    Case("parse_ptsb_csv", _parse_case("ptsb", "csv"), max_rows=1_000_000),
+    Case("parse_ptsb_excel", _parse_case("ptsb", "excel"), max_rows=100_000, requires="openpyxl"),
+    Case("parse_revolut", _parse_case("revolut", "csv")),
+    Case("parse_cmb", _parse_case("cmb", "csv")),
+    Case("parse_usbank", _parse_case("usbank", "csv")),
+    Case("parse_ofx", _parse_case("ofx", "ofx")),
+    Case("parse_qif", _parse_case("qif", "qif")),
+    Case("parse_camt053", _parse_case("camt053", "xml")),
+    Case("categorize_transactions", _categorize, max_rows=1_000_000),
+    Case("get_new_transactions", _new_transactions),
+    Case("reconcile_balance_chain", _balance_chain),
+    Case("get_changed_rows", _changed_rows),
+    Case("amortization_single", _amortization_single, max_rows=1_000_000),
+    Case("amortization_batch", _amortization_batch),
+    Case("calculate_stock_metrics", _stock_metrics),
+]
@@ -0,0 +1,240 @@
+"""
+Deterministic synthetic inputs for the benchmarks: bank exports in every PARSER_REGISTRY
+format, rule sets, warehouse-shaped frames, mortgage terms and vest schedules.
+The same (rows, seed) always produces byte-identical data.
+"""
+import io
+import numpy as np
+import pandas as pd
+
+MERCHANTS = [
+    "TESCO STORES", "LIDL", "ALDI", "DUBLIN BUS", "LUAS", "NETFLIX.COM", "SPOTIFY", "AMAZON EU",
+    "SPAR", "CENTRA", "ELECTRIC IRELAND", "BORD GAIS", "RYANAIR", "AER LINGUS", "DELIVEROO",
+    "JUST EAT", "BOOTS", "PENNEYS", "IKEA", "APPLE.COM/BILL",
+]
+START_DATE = pd.Timestamp("2015-01-01")
+
+class NamedBytesIO(io.BytesIO):
+    """In-memory file with a .name, like Streamlit's UploadedFile."""
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+def transactions(rows, seed=0):
+    """
+    Core synthetic ledger: date, signed amount (euros, 2 decimals), description and running
+    balance, in chronological order with several transactions per day.
+    """
+    rng = np.random.default_rng(seed)
+    days = np.sort(rng.integers(0, max(rows // 4, 1), rows))
+    is_credit = rng.random(rows) < 0.15
+    amounts = np.round(rng.exponential(35, rows) + 0.01, 2)
+    amounts = np.where(is_credit, amounts * 8, -amounts)
+    merchant = rng.integers(0, len(MERCHANTS), rows)
+    refs = rng.integers(0, 10**6, rows)
+
+    cents = np.round(amounts * 100).astype(np.int64)
+    balance = (np.cumsum(cents) + 500_000) / 100
+    return pd.DataFrame({
+        "date": START_DATE + pd.to_timedelta(days, unit="D"),
+        "amount": cents / 100,
+        "description": [f"{MERCHANTS[m]} {r:06d}" for m, r in zip(merchant, refs)],
+        "balance": balance,
+    })
+
+def _newest_first(df):
+    return df.iloc[::-1].reset_index(drop=True)
+
+def ptsb_csv(rows, seed=0):
+    df = _newest_first(transactions(rows, seed))
+    out = pd.DataFrame({
+        "Date": df["date"].dt.strftime("%d %b %Y"),
+        "Description": df["description"],
+        "Money In (€)": np.where(df["amount"] > 0, df["amount"].map("{:,.2f}".format), ""),
+        "Money Out (€)": np.where(df["amount"] < 0, (-df["amount"]).map("{:,.2f}".format), ""),
+        "Balance (€)": df["balance"].map("{:,.2f}".format),
+    })
+    return NamedBytesIO(out.to_csv(index=False).encode(), "ptsb.csv")
+
+def ptsb_excel(rows, seed=0):
+    """PTSB's Excel export: 12 preamble rows, the table, and a footer row. Needs openpyxl."""
+    df = _newest_first(transactions(rows, seed))
+    table = pd.DataFrame({
+        "Date": df["date"].dt.strftime("%d/%m/%Y"),
+        "Description": df["description"],
+        "Money In (€)": df["amount"].where(df["amount"] > 0),
+        "Money Out (€)": (-df["amount"]).where(df["amount"] < 0),
+        "Balance (€)": df["balance"],
+    })
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        pd.DataFrame([["Statement"]] * 12).to_excel(writer, index=False, header=False)
+        table.to_excel(writer, index=False, startrow=12)
+        pd.DataFrame([["End of statement"]]).to_excel(writer, index=False, header=False, startrow=13 + len(table))
+    return NamedBytesIO(buffer.getvalue(), "ptsb.xlsx")
+
+def revolut_csv(rows, seed=0):
+    df = transactions(rows, seed)
+    rng = np.random.default_rng(seed + 1)
+    started = df["date"] + pd.to_timedelta(rng.integers(0, 86_400, rows), unit="s")
+    completed = rng.random(rows) < 0.98
+    # Reverted payments never move the balance, and Revolut leaves theirs blank
+    cents = (df["amount"] * 100).round().astype(np.int64).where(completed, 0)
+    balance = (cents.cumsum() + 500_000) / 100
+    out = pd.DataFrame({
+        "Type": "CARD_PAYMENT",
+        "Product": "Current",
+        "Started Date": started.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "Completed Date": df["date"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "Description": df["description"],
+        "Amount": df["amount"].map("{:.2f}".format),
+        "Fee": "0.00",
+        "Currency": "EUR",
+        "State": np.where(completed, "COMPLETED", "REVERTED"),
+        "Balance": balance.map("{:.2f}".format).where(completed, ""),
+    })
+    return NamedBytesIO(out.to_csv(index=False).encode(), "revolut.csv")
+
+def cmb_csv(rows, seed=0):
+    df = _newest_first(transactions(rows, seed))
+    out = pd.DataFrame({
+        "Date operation": df["date"].dt.strftime("%d/%m/%Y"),
+        "Date valeur": df["date"].dt.strftime("%d/%m/%Y"),
+        "Libelle": df["description"],
+        "Debit": df["amount"].where(df["amount"] < 0).map(lambda v: "" if pd.isna(v) else f"{v:.2f}".replace(".", ",")),
+        "Credit": df["amount"].where(df["amount"] > 0).map(lambda v: "" if pd.isna(v) else f"{v:.2f}".replace(".", ",")),
+    })
+    return NamedBytesIO(out.to_csv(index=False, sep=";").encode(), "cmb.csv")
+
+def usbank_csv(rows, seed=0):
+    df = _newest_first(transactions(rows, seed))
+    out = pd.DataFrame({
+        "Date": df["date"].dt.strftime("%d/%m/%Y"),
+        "Description": df["description"],
+        "Money In (€)": df["amount"].where(df["amount"] > 0),
+        "Money Out (€)": (-df["amount"]).where(df["amount"] < 0),
+    })
+    return NamedBytesIO(out.to_csv(index=False).encode(), "usbank.csv")
+
+def ofx(rows, seed=0):
+    """OFX 1.x (SGML, unclosed leaf tags) statement with FITIDs and a ledger balance."""
+    df = transactions(rows, seed)
+    entries = "".join(
+        f"<STMTTRN><TRNTYPE>{'CREDIT' if a > 0 else 'DEBIT'}<DTPOSTED>{d:%Y%m%d}120000[0:GMT]"
+        f"<TRNAMT>{a:.2f}<FITID>{seed}{i:09d}<NAME>{desc}</STMTTRN>\n"
+        for i, (d, a, desc) in enumerate(zip(df["date"], df["amount"], df["description"]))
+    )
+    text = (
+        "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n"
+        "<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>EUR<BANKTRANLIST>\n"
+        f"{entries}</BANKTRANLIST><LEDGERBAL><BALAMT>{df['balance'].iloc[-1]:.2f}"
+        f"<DTASOF>{df['date'].iloc[-1]:%Y%m%d}</LEDGERBAL></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+    )
+    return NamedBytesIO(text.encode("cp1252"), "statement.ofx")
+
+def qif(rows, seed=0):
+    df = transactions(rows, seed)
+    records = "".join(
+        f"D{d:%d/%m/%Y}\nT{a:,.2f}\nP{desc}\n^\n"
+        for d, a, desc in zip(df["date"], df["amount"], df["description"])
+    )
+    return NamedBytesIO(f"!Type:Bank\n{records}".encode(), "statement.qif")
+
+def camt053(rows, seed=0, statements=1):
+    """camt.053.001.02 XML split into `statements` statements, each with opening and closing balances."""
+    df = transactions(rows, seed)
+    cents = np.round(df["amount"] * 100).astype(np.int64)
+    opening = (np.round(df["balance"] * 100).astype(np.int64) - cents) / 100
+
+    def balance(code, amount):
+        indicator = "CRDT" if amount >= 0 else "DBIT"
+        return (f"<Bal><Tp><CdOrPrtry><Cd>{code}</Cd></CdOrPrtry></Tp><Amt Ccy=\"EUR\">{abs(amount):.2f}</Amt>"
+                f"<CdtDbtInd>{indicator}</CdtDbtInd></Bal>")
+
+    parts = []
+    for s, chunk in enumerate(np.array_split(np.arange(rows), statements)):
+        if len(chunk) == 0:
+            continue
+        entries = "".join(
+            f"<Ntry><Amt Ccy=\"EUR\">{abs(df['amount'].iloc[i]):.2f}</Amt>"
+            f"<CdtDbtInd>{'CRDT' if df['amount'].iloc[i] > 0 else 'DBIT'}</CdtDbtInd><Sts>BOOK</Sts>"
+            f"<BookgDt><Dt>{df['date'].iloc[i]:%Y-%m-%d}</Dt></BookgDt><AcctSvcrRef>{seed}-{i:09d}</AcctSvcrRef>"
+            f"<NtryDtls><TxDtls><RmtInf><Ustrd>{df['description'].iloc[i]}</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>\n"
+            for i in chunk
+        )
+        parts.append(
+            f"<Stmt><Id>{s}</Id>{balance('OPBD', opening[chunk[0]])}{balance('CLBD', df['balance'].iloc[chunk[-1]])}\n"
+            f"{entries}</Stmt>\n"
+        )
+    text = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt>\n'
+        f"{''.join(parts)}</BkToCstmrStmt></Document>\n"
+    )
+    return NamedBytesIO(text.encode(), "statement.xml")
+
+# PARSER_REGISTRY key -> {variant: generator}; the first variant is the bank's usual export
+BANK_EXPORTS = {
+    "ptsb": {"csv": ptsb_csv, "excel": ptsb_excel},
+    "revolut": {"csv": revolut_csv},
+    "cmb": {"csv": cmb_csv},
+    "usbank": {"csv": usbank_csv},
+    "ofx": {"ofx": ofx},
+    "qif": {"qif": qif},
+    "camt053": {"xml": camt053},
+}
+
+def rule_set(n_categories=20, keywords_per_category=25, seed=0):
+    """Categories document ({category: [{keyword, label}]}) covering the synthetic merchants."""
+    rng = np.random.default_rng(seed)
+    rules = {f"Category {c:02d}": [] for c in range(n_categories)}
+    categories = list(rules)
+    for i, merchant in enumerate(MERCHANTS):
+        rules[categories[i % n_categories]].append({"keyword": merchant, "label": merchant.title()})
+    # Filler keywords that never match, so lookups walk realistic rule lists
+    for category in categories:
+        while len(rules[category]) < keywords_per_category:
+            rules[category].append({"keyword": f"VENDOR{rng.integers(0, 10**8):08d}", "label": "Other"})
+    return rules
+
+def warehouse_rows(rows, seed=0, account_id="acc_01"):
+    """Frame shaped like the categorization query result (euros, plain dtypes)."""
+    df = transactions(rows, seed)
+    rng = np.random.default_rng(seed + 2)
+    return pd.DataFrame({
+        "transaction_number": np.arange(1, rows + 1),
+        "date": df["date"].dt.date,
+        "description": df["description"],
+        "debit": (-df["amount"]).clip(lower=0),
+        "credit": df["amount"].clip(lower=0),
+        "category": np.where(rng.random(rows) < 0.5, "TBD", ""),
+        "label": "",
+        "account_id": account_id,
+        "account": "Example Account",
+    })
+
+def mortgage_loans(n_loans, seed=0):
+    """Loan terms for the amortization engines."""
+    rng = np.random.default_rng(seed)
+    principal = np.round(rng.uniform(150_000, 600_000, n_loans), -3)
+    rate = np.round(rng.uniform(2.0, 5.5, n_loans), 2)
+    monthly_rate = rate / 100 / 12
+    payment = np.round(principal * monthly_rate / (1 - (1 + monthly_rate) ** -360), 2)
+    return pd.DataFrame({
+        "mortgage_name": [f"loan_{i}" for i in range(n_loans)],
+        "principal": principal,
+        "annual_rate_pct": rate,
+        "monthly_payment": payment,
+        "start_date": START_DATE + pd.to_timedelta(rng.integers(0, 3650, n_loans), unit="D"),
+    })
+
+def vest_schedule(rows, seed=0):
+    """Stocks-table shaped schedule (Date, GSUs, running after-tax value)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("today").normalize() + pd.to_timedelta(np.arange(rows) - rows // 2, unit="D")
+    units = rng.integers(0, 20, rows)
+    return pd.DataFrame({
+        "Date": dates,
+        "GSUs": units,
+        "Total_Vested_after_tax": np.cumsum(units) * 150.0 * 0.48,
+    })
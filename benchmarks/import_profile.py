@@ -0,0 +1,118 @@
+"""
+Measures each page's cold-start import cost and checks it against a budget.
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --pages Home,Accounts --top 15
+
+Every page's top-level imports (read from its source) run in a fresh interpreter with
+-X importtime, from the repo root so config finds .streamlit/secrets.toml: like the app
+itself this needs streamlit installed and the secrets file present.
+Exits 1 when a page is over its budget or loads a module it must not load.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(REPO_DIR, "pages")
+
+# Milliseconds for the page's imports in a cold interpreter; pages without one are only reported
+BUDGET_MS = {
+    "Home": 400,
+    "Accounts": 1500,
+    "Manage Categories": 1200,
+}
+# Heavy dependencies a page must not pull in at import time
+FORBIDDEN = {
+    "Home": ["pandas", "google.cloud.bigquery", "yfinance"],
+    "Accounts": ["google.cloud.bigquery", "yfinance"],
+    "Manage Categories": ["google.cloud.bigquery", "yfinance"],
+}
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {watch!r} if m in sys.modules]}}))
+"""
+
+def discover_pages():
+    """{page name: script path}: app.py is Home, pages/N_<emoji>_<Name>.py is <Name>."""
+    pages = {"Home": os.path.join(REPO_DIR, "app.py")}
+    for filename in sorted(os.listdir(PAGES_DIR)):
+        if filename.endswith(".py"):
+            name = filename[:-3].split("_", 2)[-1].replace("_", " ")
+            pages[name] = os.path.join(PAGES_DIR, filename)
+    return pages
+
+def top_level_imports(path):
+    """The page's module-level import statements, as source."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def parse_importtime(stderr, top):
+    """The `top` modules with the largest cumulative import time: [(module, ms)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(cumulative) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+
+def profile_page(path, watch):
+    code = _CHILD.format(imports=top_level_imports(path), watch=watch)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": REPO_DIR},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["stderr"] = proc.stderr
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile page import times against budgets.")
+    parser.add_argument("--pages", default=None, help="Comma-separated page names (default: all)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest modules to list per page")
+    args = parser.parse_args(argv)
+
+    pages = discover_pages()
+    selected = args.pages.split(",") if args.pages else list(pages)
+    unknown = set(selected) - set(pages)
+    if unknown:
+        parser.error(f"Unknown pages: {', '.join(sorted(unknown))}. Known: {', '.join(pages)}")
+
+    watch = sorted({m for modules in FORBIDDEN.values() for m in modules})
+    failures = []
+    for name in selected:
+        try:
+            result = profile_page(pages[name], watch)
+        except RuntimeError as e:
+            failures.append(f"{name}: {e}")
+            continue
+
+        budget = BUDGET_MS.get(name)
+        print(f"{name:<20}{result['ms']:>9.0f} ms" + (f"  (budget {budget} ms)" if budget else ""))
+        for module, ms in parse_importtime(result["stderr"], args.top):
+            print(f"    {module:<40}{ms:>9.1f} ms")
+
+        if budget is not None and result["ms"] > budget:
+            failures.append(f"{name}: {result['ms']:.0f} ms is over its {budget} ms budget")
+        banned = [m for m in FORBIDDEN.get(name, []) if m in result["loaded"]]
+        if banned:
+            failures.append(f"{name}: imports {', '.join(banned)} at startup")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Concurrent-session load test: N simulated users running scripted flows in one server process.
+
+    python -m benchmarks.load_test --account acc_01 --sessions 4 --iterations 3
+    python -m benchmarks.load_test --account acc_01 --sessions 8 --flows categorize,mortgage
+
+Pages are driven through Streamlit's AppTest, so every session runs the real page scripts
+with its own session state while sharing the process-wide caches, as browser sessions do.
+AppTest can't upload files or select dataframe rows, so the import flow and the
+reimbursement link call the service facades directly, from the same worker thread.
+
+Runs against the BigQuery replay client (mode = "replay" under [bigquery_replay] in
+secrets.toml) so it needs no network; record a cassette covering the flows first.
+Writes go to a scratch copy of the local store. Needs streamlit and the secrets file.
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from benchmarks import generators
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    "categorize": "2_🏷️_Categorize.py",
+    "reimbursements": "3_💰_Reimbursements.py",
+    "mortgage": "6_🏠_Mortgage.py",
+}
+
+def _page(name, timeout):
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(os.path.join(REPO_DIR, "pages", PAGES[name]), default_timeout=timeout)
+
+def _click(at, label):
+    next(b for b in at.button if b.label == label).click().run()
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+# The frames pages keep in session state: the bulk of what a session holds
+STATE_FRAMES = ["uncategorized_df", "reimbursements_df", "all_tx_df"]
+
+def _state_bytes(at):
+    """Deep size of the session's state frames (shared buffers are counted in full)."""
+    return sum(
+        int(at.session_state[key].memory_usage(deep=True).sum())
+        for key in STATE_FRAMES if key in at.session_state
+    )
+
+# Each flow yields (step name, callable); the callables share the flow's locals through ctx
+def flow_import(ctx):
+    from backend.domain import transaction_schema
+    from backend.services import ingestion_service
+    state = {}
+
+    def parse():
+        state["new"], _, _ = ingestion_service.process_transaction_upload(
+            ctx.account, ctx.table_id, ctx.export(), ctx.categories
+        )
+    def save():
+        if not state["new"].empty:
+            ingestion_service.save_transactions_workflow(
+                ctx.table_id, ctx.account, transaction_schema.to_plain_dtypes(state["new"])
+            )
+    yield "import.process_upload", parse
+    yield "import.save", save
+
+def flow_categorize(ctx):
+    at = _page("categorize", ctx.timeout)
+    yield "categorize.open", at.run
+    yield "categorize.pick_account", lambda: at.selectbox(key="categorize_account_picker").set_value(ctx.account).run()
+    yield "categorize.fetch", lambda: _click(at, "Fetch Uncategorized Transactions")
+    ctx.record_state(at)
+    if "uncategorized_df" in at.session_state:
+        yield "categorize.save", lambda: _click(at, "💾 Save Category Updates")
+    _check(at)
+
+def flow_reimbursements(ctx):
+    from backend.services import reimbursement_service
+    at = _page("reimbursements", ctx.timeout)
+    yield "reimbursements.open", at.run
+    yield "reimbursements.pick_accounts", lambda: (
+        at.selectbox(key="reimb_account_picker").set_value(ctx.account).run(),
+        at.selectbox(key="all_tx_picker").set_value(ctx.account).run(),
+    )
+    yield "reimbursements.fetch_credits", lambda: at.button(key="fetch_reimb").click().run()
+    yield "reimbursements.fetch_expenses", lambda: at.button(key="fetch_all").click().run()
+    ctx.record_state(at)
+    if "reimbursements_df" in at.session_state and "all_tx_df" in at.session_state:
+        reimb_row = at.session_state["reimbursements_df"].iloc[0]
+        expense_row = at.session_state["all_tx_df"].iloc[0]
+        yield "reimbursements.link", lambda: reimbursement_service.link_reimbursement_to_expense(
+            ctx.table_id, reimb_row, expense_row
+        )
+    _check(at)
+
+def flow_mortgage(ctx):
+    at = _page("mortgage", ctx.timeout)
+    yield "mortgage.open", at.run
+    # One step of the payment input re-runs the simulation
+    yield "mortgage.simulate", lambda: next(
+        n for n in at.number_input if n.label == "Monthly Payment (€)"
+    ).increment().run()
+    ctx.record_state(at)
+    _check(at)
+
+FLOWS = {
+    "import": flow_import,
+    "categorize": flow_categorize,
+    "reimbursements": flow_reimbursements,
+    "mortgage": flow_mortgage,
+}
+
+class Session:
+    """What one simulated user needs: its account, the shared context and its own stats."""
+    def __init__(self, number, args, table_id, categories, bank):
+        self.number = number
+        self.account = args.account
+        self.table_id = table_id
+        self.categories = categories
+        self.timeout = args.timeout
+        self._bank = bank
+        self._rows = args.rows
+        self.state_bytes = 0
+
+    def export(self):
+        # Every session uploads its own synthetic export for the account's bank
+        usual_export = next(iter(generators.BANK_EXPORTS[self._bank].values()))
+        return usual_export(self._rows, seed=self.number)
+
+    def record_state(self, at):
+        self.state_bytes = max(self.state_bytes, _state_bytes(at))
+
+def run_session(session, flows, iterations, latencies, errors, lock):
+    for i in range(iterations):
+        flow = flows[(session.number + i) % len(flows)]
+        try:
+            for step, fn in FLOWS[flow](session):
+                start = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.setdefault(step, []).append(elapsed)
+        except Exception as e:
+            with lock:
+                errors.append(f"session {session.number} {flow}: {type(e).__name__}: {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scripted flows across concurrent sessions.")
+    parser.add_argument("--account", required=True, help="Account id the flows work on")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=4, help="Flows per session")
+    parser.add_argument("--flows", default=",".join(FLOWS), help=f"Comma-separated mix of: {', '.join(FLOWS)}")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows in each synthetic upload")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds allowed per page run")
+    args = parser.parse_args(argv)
+
+    flows = args.flows.split(",")
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        parser.error(f"Unknown flows: {', '.join(sorted(unknown))}")
+
+    import config
+    if config.BQ_CLIENT_MODE != "replay":
+        parser.error('Set mode = "replay" under [bigquery_replay] in secrets.toml first.')
+    scratch = tempfile.mkdtemp(prefix="finoob_load_")
+    if os.path.exists(config.LOCAL_DB_PATH):
+        shutil.copy(config.LOCAL_DB_PATH, os.path.join(scratch, "finoob.db"))
+    config.LOCAL_DB_PATH = os.path.join(scratch, "finoob.db")
+
+    from backend.domain import account_logic
+    from backend.services import accounts_service, app_service
+    categories, _, _, table_id = app_service.load_global_context()
+    bank = account_logic.get_bank_from_account(accounts_service.load_account_data(), args.account)
+    if bank not in generators.BANK_EXPORTS:
+        parser.error(f"No synthetic export for bank '{bank}' of account {args.account}")
+
+    sessions = [Session(n, args, table_id, categories, bank) for n in range(args.sessions)]
+    latencies, errors, lock = {}, [], threading.Lock()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            for session in sessions:
+                pool.submit(run_session, session, flows, args.iterations, latencies, errors, lock)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    wall = time.perf_counter() - start
+
+    print(f"{args.sessions} sessions x {args.iterations} flows in {wall:.1f} s\n")
+    print(f"{'step':<32}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step in sorted(latencies):
+        ms = np.array(latencies[step]) * 1000
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        print(f"{step:<32}{len(ms):>6}{p50:>10.1f}{p90:>10.1f}{p99:>10.1f}{ms.max():>10.1f}")
+
+    state_mb = [s.state_bytes / 1024 ** 2 for s in sessions]
+    print(f"\nSession state: median {np.median(state_mb):.1f} MB, max {max(state_mb):.1f} MB per session")
+    # ru_maxrss is in KB on Linux
+    print(f"Process peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    stats = app_service.get_frame_cache().stats
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / lookups if lookups else 0
+    print(f"Shared frame cache: {hit_rate:.0%} hits ({stats['hits']}/{lookups}), "
+          f"{stats['evictions']} evictions, {stats['expirations']} expirations")
+
+    for error in errors:
+        print(f"ERROR {error}")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
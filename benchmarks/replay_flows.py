@@ -0,0 +1,84 @@
+"""
+Profiles the import flows end to end against a recorded BigQuery cassette, offline.
+
+    python -m benchmarks.replay_flows --account acc_01 --file export.csv
+    python -m benchmarks.replay_flows --account acc_01 --file export.csv --save --latency-ms 0 --trace out.json
+
+Record the cassette first: set mode = "record" under [bigquery_replay] in secrets.toml and
+do the same import in the app. Then set mode = "replay" and run this from the repo root
+(it needs streamlit and the secrets file, like the app). The save flow writes to a
+temporary copy of the local store, never to the real one.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from benchmarks.generators import NamedBytesIO
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the import flows against a recorded cassette.")
+    parser.add_argument("--account", required=True, help="Account id the file belongs to")
+    parser.add_argument("--file", required=True, help="Bank export to upload (the one used when recording)")
+    parser.add_argument("--save", action="store_true", help="Also run save_transactions_workflow")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=None,
+                        help="Fixed delay per BigQuery call (default: the recorded durations)")
+    parser.add_argument("--trace", default=None, help="Write the last run's spans as a Chrome trace")
+    args = parser.parse_args(argv)
+
+    import config
+    if config.BQ_CLIENT_MODE != "replay":
+        parser.error('Set mode = "replay" under [bigquery_replay] in secrets.toml first.')
+
+    # Work on a copy of the local store: the save flow updates balances and net worth
+    scratch = tempfile.mkdtemp(prefix="finoob_replay_")
+    if os.path.exists(config.LOCAL_DB_PATH):
+        shutil.copy(config.LOCAL_DB_PATH, os.path.join(scratch, "finoob.db"))
+    config.LOCAL_DB_PATH = os.path.join(scratch, "finoob.db")
+
+    from backend.domain import transaction_schema
+    from backend.infrastructure import db_client, tracing
+    from backend.services import app_service, ingestion_service
+
+    client = db_client.get_client()
+    client.latency_ms = args.latency_ms
+    categories, _, _, table_id = app_service.load_global_context()
+    with open(args.file, "rb") as f:
+        data = f.read()
+
+    timings = {"process_transaction_upload": [], "save_transactions_workflow": []}
+    try:
+        for _ in range(args.repeat):
+            client.reset()
+            tracing.clear()
+
+            start = time.perf_counter()
+            new_transactions, _, _ = ingestion_service.process_transaction_upload(
+                args.account, table_id, NamedBytesIO(data, os.path.basename(args.file)), categories
+            )
+            timings["process_transaction_upload"].append(time.perf_counter() - start)
+
+            if args.save and not new_transactions.empty:
+                start = time.perf_counter()
+                ingestion_service.save_transactions_workflow(
+                    table_id, args.account, transaction_schema.to_plain_dtypes(new_transactions)
+                )
+                timings["save_transactions_workflow"].append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    for flow, runs in timings.items():
+        if runs:
+            print(f"{flow:<30} best {min(runs) * 1000:>9.1f} ms   worst {max(runs) * 1000:>9.1f} ms   ({len(runs)} runs)")
+
+    print("\nLast run:")
+    for row in tracing.summarize():
+        print(f"  {row['span']:<50}{row['ms']:>10.2f} ms" + (f"{row['rows']:>10,} rows" if row["rows"] is not None else ""))
+    if args.trace:
+        print(f"\nWrote {tracing.export_chrome_trace(args.trace)} spans to {args.trace}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Runs the benchmark cases and appends the results to a JSON history.
+
+    python -m benchmarks.run --sizes 1k,10k,100k
+    python -m benchmarks.run --sizes 1k,1m,10m --cases parse_revolut,get_changed_rows
+    python -m benchmarks.run --save-baseline          # record this machine's reference
+    python -m benchmarks.run --threshold 0.25         # fail if >25% slower than the baseline
+
+Timings are the best of --repeat runs (setup excluded); --memory adds the peak
+traced allocation of one extra run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from benchmarks.cases import CASES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "results", "history.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "results", "baseline.json")
+
+def parse_size(text):
+    """'1k' -> 1000, '10m' -> 10_000_000, '2500' -> 2500."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def time_case(case, rows, seed, repeat, memory):
+    fn = case.setup(rows, seed)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        "case": case.name,
+        "rows": rows,
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "rows_per_s": rows / min(timings) if min(timings) > 0 else None,
+    }
+    if memory:
+        tracemalloc.start()
+        fn()
+        result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return result
+
+def run(sizes, case_names=None, seed=0, repeat=3, memory=False, caps=True):
+    results, skipped = [], []
+    for case in CASES:
+        if case_names and case.name not in case_names:
+            continue
+        if not case.available():
+            skipped.append(f"{case.name} (needs {case.requires})")
+            continue
+        for rows in sizes:
+            if caps and case.max_rows is not None and rows > case.max_rows:
+                skipped.append(f"{case.name} @ {rows:,} (cap {case.max_rows:,})")
+                continue
+            result = time_case(case, rows, seed, repeat, memory)
+            results.append(result)
+            print(f"  {case.name:<26}{rows:>12,}{result['min_s'] * 1000:>12.1f} ms"
+                  + (f"{result['peak_mb']:>10.1f} MB" if memory else ""))
+    return results, skipped
+
+def compare(results, baseline, threshold):
+    """Returns [(case, rows, baseline_s, current_s, ratio)] for cases slower than baseline by > threshold."""
+    reference = {(r["case"], r["rows"]): r["min_s"] for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        base = reference.get((r["case"], r["rows"]))
+        if base and r["min_s"] / base - 1 > threshold:
+            regressions.append((r["case"], r["rows"], base, r["min_s"], r["min_s"] / base))
+    return regressions
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the finoob hot paths.")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="Comma-separated row counts (1k, 1m, 10m...)")
+    parser.add_argument("--cases", default=None, help="Comma-separated case names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="Also record peak traced memory")
+    parser.add_argument("--no-caps", action="store_true", help="Run capped cases at every size")
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    case_names = set(args.cases.split(",")) if args.cases else None
+    known = {case.name for case in CASES}
+    if case_names and case_names - known:
+        parser.error(f"Unknown cases: {', '.join(sorted(case_names - known))}. Known: {', '.join(sorted(known))}")
+
+    print(f"{'case':<28}{'rows':>12}{'best':>15}")
+    results, skipped = run(sizes, case_names, args.seed, args.repeat, args.memory, caps=not args.no_caps)
+    for note in skipped:
+        print(f"  skipped {note}")
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    history = _load_json(args.history, [])
+    history.append(record)
+    _save_json(args.history, history)
+    print(f"Appended {len(results)} results to {args.history}")
+
+    if args.save_baseline:
+        _save_json(args.baseline, record)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    baseline = _load_json(args.baseline, None)
+    if baseline is None:
+        print("No baseline yet (run with --save-baseline to record one).")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for case, rows, base, current, ratio in regressions:
+        print(f"REGRESSION {case} @ {rows:,}: {base * 1000:.1f} ms -> {current * 1000:.1f} ms ({ratio:.2f}x)")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against baseline {baseline.get('commit')}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
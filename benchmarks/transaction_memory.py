@@ -0,0 +1,87 @@
+"""
+Memory footprint of transaction frames with and without the shared dtype plan.
+
+Builds query rows the way db_client.run_query returns them (a list of dicts), turns them into
+a frame with pd.DataFrame(rows) as fetch_uncategorized_transactions / fetch_expense_candidates
+do, and compares deep memory usage as loaded vs after apply_dtype_plan.
+Exits non-zero when the planned frame is above the allowed share of the raw one.
+
+    python -m benchmarks.transaction_memory --rows 1000000 --max-ratio 0.5
+"""
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+from backend.domain import transaction_schema
+
+ACCOUNTS = ["acc_01", "acc_02", "acc_03", "acc_04"]
+CATEGORIES = ["Groceries", "Rent", "Transport", "Dining", "Utilities", "Shopping", "Travel", "TBD", ""]
+MERCHANTS = ["TESCO STORES", "LIDL", "DUBLIN BUS", "NETFLIX.COM", "AMAZON EU", "SPAR", "ELECTRIC IRELAND", "RYANAIR"]
+
+def make_query_rows(rows, seed=0):
+    """Rows shaped like a BigQuery result: dicts of Python str, int, float and date values."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 3000, rows), unit="D")
+    account_idx = rng.integers(0, len(ACCOUNTS), rows)
+    merchant_idx = rng.integers(0, len(MERCHANTS), rows)
+    category_idx = rng.integers(0, len(CATEGORIES), rows)
+    debit = np.round(rng.exponential(40, rows), 2)
+
+    columns = {
+        "transaction_number": range(1, rows + 1),
+        "date": dates.date,
+        # Card descriptions repeat the merchant with a varying reference
+        "description": [f"{MERCHANTS[m]} {ref:06d}" for m, ref in zip(merchant_idx, rng.integers(0, 10**6, rows))],
+        "debit": debit.tolist(),
+        "credit": [0.0] * rows,
+        "category": [CATEGORIES[i] for i in category_idx],
+        "label": [MERCHANTS[i] for i in merchant_idx],
+        "account_id": [ACCOUNTS[i] for i in account_idx],
+        "account": [f"Account {ACCOUNTS[i]}" for i in account_idx],
+        "month": dates.strftime("%Y-%m").tolist(),
+        "transaction_type": ["Debit" if d > 0 else "Info" for d in debit],
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def run(rows, seed=0):
+    # The frame the services start from: whatever dtypes pandas infers for the query rows
+    raw = pd.DataFrame(make_query_rows(rows, seed))
+    planned = transaction_schema.apply_dtype_plan(raw, date32=True)
+    editable = transaction_schema.apply_dtype_plan(raw, date32=True, editable=("category", "label"))
+
+    raw_bytes = transaction_schema.memory_footprint(raw)
+    return {
+        "rows": rows,
+        "raw_bytes": raw_bytes,
+        "planned_bytes": transaction_schema.memory_footprint(planned),
+        "editable_bytes": transaction_schema.memory_footprint(editable),
+        "columns": {
+            col: [int(raw[col].memory_usage(deep=True, index=False)), int(planned[col].memory_usage(deep=True, index=False))]
+            for col in raw.columns
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ratio", type=float, default=0.5, help="Allowed planned/raw memory ratio")
+    args = parser.parse_args(argv)
+
+    result = run(args.rows, args.seed)
+    mb = 1024 ** 2
+    print(f"{result['rows']:,} rows")
+    print(f"  {'column':<20}{'raw MB':>10}{'plan MB':>10}")
+    for col, (raw_b, plan_b) in result["columns"].items():
+        print(f"  {col:<20}{raw_b / mb:>10.2f}{plan_b / mb:>10.2f}")
+    ratio = result["planned_bytes"] / result["raw_bytes"]
+    print(f"  {'total':<20}{result['raw_bytes'] / mb:>10.2f}{result['planned_bytes'] / mb:>10.2f}  ({ratio:.0%})")
+    print(f"  editor input (category/label as strings): {result['editable_bytes'] / mb:.2f} MB")
+
+    if ratio > args.max_ratio:
+        print(f"FAIL: planned frame is {ratio:.0%} of raw, budget {args.max_ratio:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
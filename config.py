@@ -2,13 +2,6 @@ import streamlit as st
 import os
 import shutil
 
-# --- Environment ---
-# Fetches 'env', defaulting to None. If it's not strictly 'dev' or 'prod', we stop.
-ENV = st.secrets.get("environment")
-if ENV not in ["dev", "prod"]:
-    st.error(f"🚨 CONFIG ERROR: 'env' secret is missing or invalid. Must be 'dev' or 'prod'. Got: '{ENV}'")
-    st.stop()
-
 # --- File Paths --- 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CATEGORIES_PATH = os.path.join(BASE_DIR, "config_data", "categories.json")
@@ -16,23 +9,111 @@ CATEGORIES_TEMPLATE_PATH = os.path.join(BASE_DIR, "config_data", "categories_exa
 ACCOUNTS_PROD_PATH = os.path.join(BASE_DIR, "config_data", "accounts.json")
 ACCOUNTS_DEV_PATH = os.path.join(BASE_DIR, "config_data", "accounts_dev.json")
 ACCOUNTS_TEMPLATE_PATH = os.path.join(BASE_DIR, "config_data", "accounts_example.json")
+LOCAL_DB_PROD_PATH = os.path.join(BASE_DIR, "config_data", "finoob.db")
+LOCAL_DB_DEV_PATH = os.path.join(BASE_DIR, "config_data", "finoob_dev.db")
+# Categorization rules are shared by both environments
+RULES_DB_PATH = os.path.join(BASE_DIR, "config_data", "finoob_rules.db")
+GRANTS_PATH = os.path.join(BASE_DIR, "config_data", "grants.json")
+STOCK_SALES_PATH = os.path.join(BASE_DIR, "config_data", "stock_sales.json")
 
 # --- BigQuery Configuration ---
-BQ_PROJECT_ID = st.secrets["gcp_service_account"]["project_id"]
 NET_WORTH_DATASET_ID = "reporting"
-NET_WORTH_PROCEDURE = f"{BQ_PROJECT_ID}.{NET_WORTH_DATASET_ID}.sp_refresh_net_worth"
-MORTGAGE_TABLE_ID = f"{BQ_PROJECT_ID}.liabilities.dim_mortgage_terms"
-MORTGAGE_SCHEDULE_VIEW_ID = f"{BQ_PROJECT_ID}.liabilities.view_mortgage_full_schedule"
-STOCKS_TABLE_ID = f"{BQ_PROJECT_ID}.assets.stocks"
 STOCK_TICKER = "GOOG"
 
-# Select accounts path based on environment
-if ENV == "dev":
-    ACCOUNTS_PATH = ACCOUNTS_DEV_PATH
-    # Optional: Print a warning so you know you are in dev mode
-    print("⚠️  [CONFIG] Running in DEV mode")
-else:
-    ACCOUNTS_PATH = ACCOUNTS_PROD_PATH
+# --- Tracing ---
+TRACE_BUFFER_SIZE = 5000
+TRACE_EXPORT_PATH = os.path.join(BASE_DIR, "config_data", "traces", "trace.json")
+
+# --- Import inbox ---
+INBOX_POLL_SECONDS = 30
+
+# --- Shared query cache ---
+# Query results shared by all sessions; evicted least-recently-used beyond the size budget
+SHARED_CACHE_MAX_MB = 256
+SHARED_CACHE_TTL_SECONDS = 600
+
+# --- Currencies ---
+# Net worth and reports are expressed in this currency. Accounts default to it.
+BASE_CURRENCY = "EUR"
+CURRENCY_SYMBOLS = {"EUR": "€", "USD": "$", "GBP": "£"}
+
+# --- Market Data ---
+MARKET_DATA_FILE_DIR = os.path.join(BASE_DIR, "config_data", "market_data")
+PRICE_STORE_DIR = os.path.join(BASE_DIR, "config_data", "prices")
+QUOTE_TTL_SECONDS = 300
+PRICE_HISTORY_TTL_SECONDS = 3600
+# Roughly the pixel width of a wide-layout chart; more points than this can't be drawn anyway
+CHART_MAX_POINTS = 1000
+
+# --- Settings read from secrets.toml ---
+# Resolved on first access (config.NAME), not when every page imports config
+def _secret(section, key, default):
+    return st.secrets.get(section, {}).get(key, default)
+
+def _get(name):
+    """A setting from inside this module, resolving it if it hasn't been yet."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
+def _env():
+    # Fetches 'env', defaulting to None. If it's not strictly 'dev' or 'prod', we stop.
+    env = st.secrets.get("environment")
+    if env not in ["dev", "prod"]:
+        st.error(f"🚨 CONFIG ERROR: 'env' secret is missing or invalid. Must be 'dev' or 'prod'. Got: '{env}'")
+        st.stop()
+    if env == "dev":
+        # Optional: Print a warning so you know you are in dev mode
+        print("⚠️  [CONFIG] Running in DEV mode")
+    return env
+
+def _inbox_dir():
+    return _secret("inbox", "dir", os.path.join(BASE_DIR, "config_data", "inbox"))
+
+_LAZY_SETTINGS = {
+    "ENV": _env,
+    # Select accounts path based on environment
+    "ACCOUNTS_PATH": lambda: ACCOUNTS_DEV_PATH if _get("ENV") == "dev" else ACCOUNTS_PROD_PATH,
+    "LOCAL_DB_PATH": lambda: LOCAL_DB_DEV_PATH if _get("ENV") == "dev" else LOCAL_DB_PROD_PATH,
+    "BQ_PROJECT_ID": lambda: st.secrets["gcp_service_account"]["project_id"],
+    "NET_WORTH_PROCEDURE": lambda: f"{_get('BQ_PROJECT_ID')}.{NET_WORTH_DATASET_ID}.sp_refresh_net_worth",
+    "MORTGAGE_TABLE_ID": lambda: f"{_get('BQ_PROJECT_ID')}.liabilities.dim_mortgage_terms",
+    "MORTGAGE_SCHEDULE_VIEW_ID": lambda: f"{_get('BQ_PROJECT_ID')}.liabilities.view_mortgage_full_schedule",
+    "STOCKS_TABLE_ID": lambda: f"{_get('BQ_PROJECT_ID')}.assets.stocks",
+    # Net worth is also computed locally after each import; the warehouse table (and the
+    # dashboards built on it) keeps being rebuilt unless this is turned off
+    "NET_WORTH_WAREHOUSE_REFRESH": lambda: bool(_secret("net_worth", "warehouse_refresh", True)),
+    # "live" (default), "record" (live, and every call is saved to the cassette) or
+    # "replay" (served from the cassette, no network)
+    "BQ_CLIENT_MODE": lambda: _secret("bigquery_replay", "mode", "live"),
+    "BQ_CASSETTE_DIR": lambda: os.path.join(BASE_DIR, "config_data", "cassettes", _secret("bigquery_replay", "cassette", "default")),
+    # Delay per replayed call; unset replays each call's recorded duration
+    "BQ_REPLAY_LATENCY_MS": lambda: _secret("bigquery_replay", "latency_ms", None),
+    # Share of each vest withheld for income tax (Irish marginal rate + USC + PRSI by default)
+    "STOCK_WITHHOLDING_RATE": lambda: float(_secret("stocks", "withholding_rate", 0.52)),
+    # Currency STOCK_TICKER is quoted in; the net worth history converts it to BASE_CURRENCY
+    "STOCK_CURRENCY": lambda: _secret("stocks", "currency", "USD"),
+    # Spans on service facades and BigQuery calls; cheap enough to stay on in production
+    "TRACING_ENABLED": lambda: bool(_secret("tracing", "enabled", True)),
+    # Show the recent spans in a sidebar panel on every page
+    "TRACE_PANEL": lambda: bool(_secret("tracing", "panel", False)),
+    # Exports dropped here are imported by `python -m backend.cli.inbox`
+    "INBOX_DIR": _inbox_dir,
+    "INBOX_ARCHIVE_DIR": lambda: os.path.join(_inbox_dir(), "archive"),
+    "INBOX_FAILED_DIR": lambda: os.path.join(_inbox_dir(), "failed"),
+    # {filename pattern: account_id}; unmatched files are routed by their detected bank format
+    "INBOX_MAPPING": lambda: dict(_secret("inbox", "mapping", {})),
+    # Provider key from PROVIDER_REGISTRY ("yfinance", or "file" for offline use)
+    "MARKET_DATA_PROVIDER": lambda: _secret("market_data", "provider", "yfinance"),
+    # Tickers shown in the watchlist. STOCK_TICKER (the grant's ticker) is always included.
+    "STOCK_TICKERS": lambda: list(dict.fromkeys([STOCK_TICKER] + list(_secret("market_data", "tickers", [])))),
+}
+
+def __getattr__(name):
+    """Resolves a setting on first access, then keeps it as a plain module attribute."""
+    if name not in _LAZY_SETTINGS:
+        raise AttributeError(f"module 'config' has no attribute '{name}'")
+    value = _LAZY_SETTINGS[name]()
+    globals()[name] = value
+    return value
 
 def get_categories_path():
     if os.path.exists(CATEGORIES_PATH):
@@ -42,24 +123,33 @@ def get_categories_path():
 
 # --- BigQuery Configuration ---
 def get_table_id():
+    env = _get("ENV")
     try:
-        return st.secrets["bigquery_table"][ENV]
+        return st.secrets["bigquery_table"][env]
     except KeyError:
-        st.error(f"🚨 CONFIG ERROR: The key '{ENV}' is missing from the [bigquery] section in secrets.toml.")
+        st.error(f"🚨 CONFIG ERROR: The key '{env}' is missing from the [bigquery] section in secrets.toml.")
         st.stop()
 
+_data_files_checked = False
+
 def ensure_data_files_exist():
     """
     Checks if sensitive files exist. If not, creates them from templates.
+    Called by the stores on first use rather than on import; runs once per process.
     """
+    global _data_files_checked
+    if _data_files_checked:
+        return
+
     # 1. Check Accounts
-    if not os.path.exists(ACCOUNTS_PATH):
-        print(f"⚠️ {ACCOUNTS_PATH} not found. Creating from template...")
+    accounts_path = _get("ACCOUNTS_PATH")
+    if not os.path.exists(accounts_path):
+        print(f"⚠️ {accounts_path} not found. Creating from template...")
         if os.path.exists(ACCOUNTS_TEMPLATE_PATH):
-            shutil.copy(ACCOUNTS_TEMPLATE_PATH, ACCOUNTS_PATH)
+            shutil.copy(ACCOUNTS_TEMPLATE_PATH, accounts_path)
         else:
             # Fallback if template is missing too
-            with open(ACCOUNTS_PATH, "w") as f:
+            with open(accounts_path, "w") as f:
                 f.write("{}")
 
     # 2. Check Categories
@@ -72,5 +162,13 @@ def ensure_data_files_exist():
             with open(CATEGORIES_PATH, "w") as f:
                 f.write("{}")
 
-# On module load, ensure data files exist
-ensure_data_files_exist()
\ No newline at end of file
+    # 3. Check Grants
+    # Starts empty, not from the template: with no grants the schedule is read from the
+    # warehouse, and saving made-up grants would overwrite the warehouse table.
+    # grants_example.json only documents the format.
+    if not os.path.exists(GRANTS_PATH):
+        print(f"⚠️ {GRANTS_PATH} not found. Creating an empty one...")
+        with open(GRANTS_PATH, "w") as f:
+            f.write("{}")
+
+    _data_files_checked = True
@@ -19,6 +19,9 @@ account_id = ui.pick_account(
     on_change=ui.clear_session_state_data
 )
 
+# Files the inbox watcher imported without this page
+ui.render_inbox_history(ingestion_service.get_inbox_history())
+
 # File uploader
 uploaded_file = st.file_uploader("Choose a CSV file", type=["csv","xls"])
 
@@ -31,6 +34,8 @@ if uploaded_file is not None:
             )
         except Exception:
             print(traceback.format_exc()) 
+            # Shown by the handler below (e.g. a file from another bank)
+            raise
         # Check if a warning was returned and display it
         if warning:
             st.warning(warning)
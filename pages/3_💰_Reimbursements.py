@@ -1,7 +1,7 @@
 import streamlit as st
 import ui
 from backend.domain import reimbursement_logic, transaction_logic
-from backend.services import app_service, reimbursement_service
+from backend.services import accounts_service, app_service, reimbursement_service
 
 # This sets the title, layout
 ui.init_page("Reimbursements")
@@ -31,6 +31,8 @@ with col1:
     # Fetch Logic
     if st.button("Fetch Reimbursements", key="fetch_reimb"):
         df = reimbursement_service.fetch_reimbursement_candidates(table_id, account_id_reimb)
+        # Amounts in the base currency too, at each transaction's date
+        df = accounts_service.convert_transactions_to_base(df, account_id_reimb, ["credit"])
         if df is not None:
             st.session_state.reimbursements_df = df
         else:
@@ -43,7 +45,7 @@ with col1:
         st.dataframe(
             # Filter cols for cleaner view
             st.session_state.reimbursements_df[[
-                'transaction_number', 'date', 'description', 'credit', 'to_transaction_id'
+                'transaction_number', 'date', 'description', 'credit', 'credit_base', 'to_transaction_id'
             ]],
             hide_index=True,
             selection_mode="single-row", # Critical for matching
@@ -63,6 +65,7 @@ with col2:
     # Fetch Logic
     if st.button("Fetch last 1000 expenses", key="fetch_all"):
         df = reimbursement_service.fetch_expense_candidates(table_id, account_id_all)
+        df = accounts_service.convert_transactions_to_base(df, account_id_all, ["debit"])
         if df is not None:
             st.session_state.all_tx_df = df
 
@@ -76,7 +79,7 @@ with col2:
         df_display = transaction_logic.filter_expenses(st.session_state.all_tx_df, search_term)
 
         st.dataframe(
-            df_display[['transaction_number', 'date', 'description', 'debit', 'category']],
+            df_display[['transaction_number', 'date', 'description', 'debit', 'debit_base', 'category']],
             hide_index=True,
             selection_mode="single-row",
             on_select="rerun",
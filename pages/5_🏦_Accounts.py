@@ -1,5 +1,6 @@
 import streamlit as st
-from backend.services import accounts_service, app_service
+import pandas as pd
+from backend.services import accounts_service, app_service, net_worth_service
 import ui
 
 # This sets the title, layout
@@ -16,8 +17,8 @@ show_archived = st.toggle("Show Archived Accounts", value=False)
 # 2. Load Data
 df = accounts_service.get_accounts_dataframe(show_archived=show_archived)
 
-total_net_worth = accounts_service.calculate_total_balance(df)
-ui.render_net_worth(total_net_worth)
+total_net_worth, unconverted = accounts_service.calculate_total_balance(df)
+ui.render_net_worth(total_net_worth, unconverted)
 
 # --- SECTION 2: TABLE ---
 styled_df = ui.format_accounts_table(df)
@@ -27,9 +28,16 @@ st.dataframe(
     column_config=ui.get_accounts_table_config(),
     use_container_width=True,
     hide_index=True,
-    column_order=["account_name", "balance", "last_updated"]
+    column_order=["account_name", "currency", "balance", "balance_base", "last_updated"]
 )
 
+# --- SECTION 2.5: HISTORY ---
+with st.expander("📈 Net Worth History"):
+    # Accounts, mortgages and vested stock, maintained locally; no warehouse query
+    lookback_days = st.selectbox("Period", options=[30, 90, 365, 1825], index=2, format_func=lambda d: f"Last {d} days")
+    start_date = pd.Timestamp("today").normalize() - pd.Timedelta(days=lookback_days)
+    ui.render_net_worth_history(net_worth_service.get_net_worth_history(start_date))
+
 # --- SECTION 3: UPDATE ACTION ---
 submitted, acc_id, new_balance = ui.render_update_balance_form(df)
 
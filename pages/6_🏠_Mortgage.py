@@ -33,21 +33,43 @@ edited_df = st.data_editor(
 st.divider()
 st.subheader("📉 Current Amortization Schedule")
 
-with st.spinner("Loading schedule..."):
-    schedule_df = mortgage_service.get_mortgage_schedule(config.MORTGAGE_SCHEDULE_VIEW_ID)
+mortgage_names = mortgage_service.get_mortgage_names(df)
+
+# Computed locally from the saved terms (cached until they change)
+schedule_df = mortgage_service.get_saved_schedule(df)
 
 if not schedule_df.empty:
+    if len(mortgage_names) > 1:
+        st.caption(f"Aggregated liability schedule across {len(mortgage_names)} mortgages.")
     ui.render_mortgage_schedule(schedule_df)
 else:
     st.info("No schedule data available. Please ensure mortgage terms are saved.")
 
+with st.expander("🔍 Cross-check against BigQuery"):
+    st.caption("Compares the local schedule with the warehouse view. Runs a query, so only on demand.")
+    if st.button("Run cross-check"):
+        with st.spinner("Querying schedule view..."):
+            all_match, comparison_df = mortgage_service.cross_check_schedule(config.MORTGAGE_SCHEDULE_VIEW_ID, df)
+        if all_match:
+            st.success("✅ Local schedule matches the BigQuery view.")
+        else:
+            st.warning(f"⚠️ {int((~comparison_df['matches']).sum())} months differ from the BigQuery view.")
+            st.dataframe(comparison_df[~comparison_df["matches"]], hide_index=True)
+
 # --- SIMULATION MODULE ---
 st.divider()
 st.header("🧪 Scenario & Simulation")
 st.info("View saved events and simulate new scenarios. Changes made here are reflected in the simulation below but are only saved when you click the 'Save All Changes' button.")
 
+# Pick which mortgage to simulate (events are stored per mortgage)
+selected_mortgage = None
+if len(mortgage_names) > 1:
+    selected_mortgage = st.selectbox("Mortgage to simulate", options=mortgage_names, key="sim_mortgage_picker")
+elif mortgage_names:
+    selected_mortgage = mortgage_names[0]
+
 # Get defaults from service
-defaults, saved_events_df = mortgage_service.get_simulation_defaults(df)
+defaults, saved_events_df = mortgage_service.get_simulation_defaults(df, selected_mortgage)
 
 sim_balance, sim_rate, sim_payment, sim_start_date = ui.render_simulation_inputs(defaults)
 
@@ -62,7 +84,7 @@ sim_events_df = st.data_editor(
     saved_events_df if not saved_events_df.empty else events_schema, 
     column_config=events_config, 
     num_rows="dynamic", 
-    key="sim_events_editor", 
+    key=f"sim_events_editor_{selected_mortgage}", 
     use_container_width=True
 )
 
@@ -96,7 +118,8 @@ else:
 st.divider()
 if st.button("💾 Save All Changes (Terms & Events)", type="primary"):
     with st.spinner("Saving changes..."):
-        success, msg = mortgage_service.save_mortgage_terms(config.MORTGAGE_TABLE_ID, edited_df, sim_events_df)
+        events_by_mortgage = {selected_mortgage: sim_events_df} if selected_mortgage else None
+        success, msg = mortgage_service.save_mortgage_terms(config.MORTGAGE_TABLE_ID, edited_df, events_by_mortgage)
         
     if success:
         st.success(msg)
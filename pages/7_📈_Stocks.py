@@ -2,36 +2,95 @@ import streamlit as st
 import ui
 import config
 from backend.domain import stocks_logic
-from backend.services import stocks_service, market_data_service
+from backend.services import stocks_service, market_data_service, fx_service
 
 ui.init_page("Stocks")
 st.title("📈 Stocks & Vesting")
 
-# Fetch Data
+# --- Market Data ---
+# Served from cache when available; stale quotes refresh in the background
+with st.spinner(f"Fetching live price for {config.STOCK_TICKER}..."):
+    stock_info = market_data_service.get_stock_price(config.STOCK_TICKER)
+    watchlist_quotes = market_data_service.get_quotes(config.STOCK_TICKERS)
+
+# Fetch Data (generated locally from the grants, priced at the live quote)
 try:
-    df = stocks_service.get_stocks_data(config.STOCKS_TABLE_ID)
+    live_price = stock_info.get('price') if stock_info else None
+    df = stocks_service.get_stocks_data(config.STOCKS_TABLE_ID, price=live_price)
 except Exception as e:
     st.error(f"Error fetching stock data: {e}")
     st.stop()
 
 if df.empty:
-    st.info("No stock data available.")
-    st.stop()
+    st.info("No stock data available. Add a grant below to generate the vesting schedule.")
+else:
+    # --- Logic ---
+    metrics = stocks_logic.calculate_stock_metrics(df)
+    # Vest values are reported in the base currency (falls back to share currency if no rate is known)
+    share_currency = stock_info.get('currency') if stock_info else None
+    fx_rate = fx_service.get_latest_rate(share_currency)
+    valuation_currency = config.BASE_CURRENCY if fx_rate is not None else share_currency
+    valuation_df = stocks_service.get_vest_valuation(df, config.STOCK_TICKER, fx_rate=fx_rate or 1.0)
 
-# --- Market Data ---
-with st.spinner(f"Fetching live price for {config.STOCK_TICKER}..."):
-    stock_info = market_data_service.get_stock_price(config.STOCK_TICKER)
+    # --- UI ---
+    if stock_info:
+        ui.render_stock_price_card(
+            stock_info,
+            load_chart_series=lambda start, end: market_data_service.get_chart_series(config.STOCK_TICKER, start, end)
+        )
+        st.divider()
+    else:
+        st.warning(f"Could not retrieve live market data for ticker: **{config.STOCK_TICKER}**")
 
-# --- Logic ---
-metrics = stocks_logic.calculate_stock_metrics(df)
+    if len(config.STOCK_TICKERS) > 1:
+        st.subheader("Watchlist")
+        ui.render_watchlist(watchlist_quotes)
+        st.divider()
 
-# --- UI ---
-if stock_info:
-    ui.render_stock_price_card(stock_info)
+    ui.render_stock_metrics(metrics)
     st.divider()
-else:
-    st.warning(f"Could not retrieve live market data for ticker: **{config.STOCK_TICKER}**")
+    currency_symbol = "$" if not stock_info or share_currency == "USD" else "€"
+    ui.render_stock_visualizations(df, valuation_df, config.CURRENCY_SYMBOLS.get(valuation_currency, currency_symbol))
+
+    # --- LOTS & GAINS ---
+    st.divider()
+    st.subheader("💼 Lots & Capital Gains")
+    ledger = stocks_service.get_lot_ledger(df, config.STOCK_TICKER)
+    current_price = live_price or 0.0
+    lots_df = ledger.lots_frame(current_price)
+    ui.render_lots_and_gains(ledger.summary(current_price), lots_df, ledger.realized_frame(), currency_symbol)
 
-ui.render_stock_metrics(metrics)
+    submitted, sale_date, units, sale_price, lot_ids = ui.render_sale_form(lots_df, live_price)
+    if submitted:
+        success, msg = stocks_service.record_sale(df, config.STOCK_TICKER, sale_date, units, sale_price, lot_ids)
+        if success:
+            st.success(msg)
+            st.rerun()
+        else:
+            st.error(msg)
+
+# --- GRANTS ---
 st.divider()
-ui.render_stock_visualizations(df)
+with st.expander("🎁 Manage Grants"):
+    st.caption("The vesting schedule is generated from these grants. Saving refreshes the BigQuery copy only if a grant changed.")
+
+    grants_df = stocks_logic.grants_to_dataframe(stocks_service.get_grants())
+    edited_grants_df = st.data_editor(
+        grants_df,
+        column_config=ui.get_grants_editor_config(),
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key="grants_editor"
+    )
+
+    if st.button("💾 Save Grants", type="primary"):
+        with st.spinner("Saving grants..."):
+            success, msg = stocks_service.save_grants(
+                config.STOCKS_TABLE_ID, stocks_logic.dataframe_to_grants(edited_grants_df), price=live_price
+            )
+        if success:
+            st.success(msg)
+            st.rerun()
+        else:
+            st.error(f"Failed to save: {msg}")
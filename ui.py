@@ -1,7 +1,9 @@
 import streamlit as st
 import config
 from datetime import datetime
-import pandas as pd
+
+# pandas is imported inside the renderers that need it, so the Home page
+# (ui + config only) starts without loading it
 
 def clear_session_state_data():
     """Clears transactions from session state."""
@@ -113,7 +115,12 @@ def get_import_editor_config(category_options):
             width="medium",
             options=category_options,
             required=True,
-        )
+        ),
+        "bank_tx_id": st.column_config.TextColumn(
+            "bank id",
+            help="The bank's own id for the transaction (OFX/CAMT.053 statements)",
+            disabled=True,
+        ),
     }
 
 def init_page(page_title_suffix=None):
@@ -134,6 +141,32 @@ def init_page(page_title_suffix=None):
     # 2. Visual Header
     display_title(config.ENV)
 
+    # 3. Optional trace panel (spans of the previous runs in this process)
+    if config.TRACE_PANEL:
+        # Deferred: ui otherwise doesn't depend on the backend
+        from backend.services import app_service
+        render_trace_panel(app_service.get_trace_summary(), app_service.export_trace)
+
+def render_trace_panel(summary_rows, export_trace):
+    """Sidebar expander with recent spans (indented by nesting) and a Chrome-trace export."""
+    import pandas as pd
+    with st.sidebar.expander("⏱️ Traces"):
+        if not summary_rows:
+            st.caption("No spans recorded yet.")
+            return
+        st.dataframe(
+            pd.DataFrame(summary_rows).drop(columns=["depth"]),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "ms": st.column_config.NumberColumn("ms", format="%.1f"),
+                "bytes": st.column_config.NumberColumn("bytes", format="%d"),
+            }
+        )
+        if st.button("Export Chrome trace", key="export_trace"):
+            path, count = export_trace()
+            st.caption(f"Wrote {count} spans to `{path}` (open in chrome://tracing or Perfetto).")
+
 def get_keywords_editor_config():
     """Returns the config for the Keywords Management editor."""
     return {
@@ -156,19 +189,34 @@ def get_accounts_table_config():
     return {
         "account_name": st.column_config.TextColumn("Account Name", width="medium"),
         "bank": st.column_config.TextColumn("Bank", width="small"),
+        "currency": st.column_config.TextColumn("Currency", width="small"),
         "balance": st.column_config.NumberColumn(
             "Balance",
             width="small"
         ),
+        "balance_base": st.column_config.NumberColumn(
+            f"Balance ({config.BASE_CURRENCY})",
+            width="small"
+        ),
         "account_id": None  # Hide ID
     }
 
-def render_net_worth(amount):
-    """Renders the top-level metric card."""
+def render_net_worth(amount, unconverted=None):
+    """Renders the top-level metric card, with a warning for accounts left out of the total."""
     col1, _ = st.columns([1, 3])
-    col1.metric("Total Net Worth", f"€{amount:,.2f}")
+    col1.metric("Total Net Worth", f"{config.CURRENCY_SYMBOLS.get(config.BASE_CURRENCY, '')}{amount:,.2f}")
+    if unconverted is not None and not unconverted.empty:
+        missing = ", ".join(f"{row.account_name} ({row.balance:,.2f} {row.currency})" for row in unconverted.itertuples())
+        st.warning(f"⚠️ Not included in the total, no {config.BASE_CURRENCY} rate available: {missing}")
     st.divider()
 
+def render_net_worth_history(history_df):
+    """Renders the daily net worth line chart (accounts, mortgages and vested stock)."""
+    if history_df.empty:
+        st.caption("No balance history recorded yet.")
+        return
+    st.line_chart(history_df["net_worth"], use_container_width=True)
+
 def render_update_balance_form(accounts_df):
     """
     Renders the form to update a balance.
@@ -202,6 +250,7 @@ def format_date_with_days_ago(val):
     """
     Converts a timestamp to 'YYYY-MM-DD (X days ago)'.
     """
+    import pandas as pd
     if pd.isna(val) or val == "":
         return ""
     
@@ -238,10 +287,13 @@ def format_accounts_table(df):
 
     df["last_updated"] = df["last_updated"].apply(format_date_with_days_ago)
 
-    # Apply the numeric formatting to the balance column
+    # Apply the numeric formatting to the balance columns
+    # (native balances are in each account's own currency)
+    base_symbol = config.CURRENCY_SYMBOLS.get(config.BASE_CURRENCY, "")
     return df.style.format({
-        "balance": "€{:,.2f}"
-    })
+        "balance": "{:,.2f}",
+        "balance_base": base_symbol + "{:,.2f}"
+    }, na_rep="—")
 
 def get_mortgage_editor_config():
     """Returns the column configuration for the mortgage editor."""
@@ -258,6 +310,7 @@ def get_mortgage_editor_config():
 
 def render_mortgage_schedule(schedule_df):
     """Renders the mortgage amortization schedule chart and data."""
+    import pandas as pd
     if schedule_df.empty:
         st.info("No schedule data available. Please ensure mortgage terms are saved.")
         return
@@ -350,8 +403,13 @@ def render_stock_metrics(metrics):
         help=metrics.get('next_vest_help')
     )
 
-def render_stock_price_card(stock_info):
-    """Renders a card with the current stock price information and a historical chart."""
+def render_stock_price_card(stock_info, load_chart_series=None):
+    """
+    Renders a card with the current stock price information and a historical chart.
+    load_chart_series(start_date, end_date) returns the (downsampled) closes to plot;
+    without it the full history is filtered here.
+    """
+    import pandas as pd
     price = stock_info.get('price', 0)
     prev_close = stock_info.get('previous_close', 0)
     currency_symbol = "$" if stock_info.get('currency') == "USD" else "€" # Simple currency handling
@@ -391,16 +449,139 @@ def render_stock_price_card(stock_info):
                 format="YYYY-MM-DD"
             )
             
-            filtered_df = history_df[(history_df.index.date >= start_date) & (history_df.index.date <= end_date)]
-            st.line_chart(filtered_df['Close'], use_container_width=True)
+            if load_chart_series is not None:
+                chart_series = load_chart_series(start_date, end_date)
+            else:
+                filtered_df = history_df[(history_df.index.date >= start_date) & (history_df.index.date <= end_date)]
+                chart_series = filtered_df['Close']
+            st.line_chart(chart_series, use_container_width=True)
         else:
             st.caption("Historical chart data not available.")
 
-def render_stock_visualizations(df):
+def get_grants_editor_config():
+    """Returns the column configuration for the stock grants editor."""
+    return {
+        "grant_id": st.column_config.TextColumn("Grant ID", required=True),
+        "grant_date": st.column_config.DateColumn("Grant Date", required=True),
+        "units": st.column_config.NumberColumn("Units", min_value=0, step=1, required=True),
+        "vesting_months": st.column_config.NumberColumn("Vesting (months)", min_value=1, step=1, default=48),
+        "cliff_months": st.column_config.NumberColumn("Cliff (months)", min_value=0, step=1, default=0),
+        "cadence_months": st.column_config.NumberColumn("Every (months)", min_value=1, step=1, default=1),
+        "yearly_weights": st.column_config.TextColumn(
+            "Yearly Weights %",
+            help="Front-loading per year, e.g. '33,33,22,12'. Leave empty for linear vesting."
+        ),
+    }
+
+def render_inbox_history(history_df):
+    """Expander with the files the import inbox processed recently."""
+    with st.expander("📬 Inbox Imports"):
+        if history_df.empty:
+            st.caption("No files imported from the inbox yet.")
+            return
+        st.dataframe(
+            history_df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "status": st.column_config.TextColumn("Status"),
+                "rows": st.column_config.NumberColumn("New Rows", format="%d"),
+                "processed_at": st.column_config.DatetimeColumn("Processed", format="YYYY-MM-DD HH:mm"),
+            }
+        )
+
+def render_lots_and_gains(summary, lots_df, realized_df, currency_symbol="$"):
+    """Renders the lot ledger: gain KPIs, open lots and realized sales."""
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Shares Held", f"{summary['open_units']:,.0f}")
+    m2.metric("Cost Basis", f"{currency_symbol}{summary['cost_basis']:,.0f}")
+    m3.metric("Unrealized Gain", f"{currency_symbol}{summary['unrealized_gain']:,.0f}")
+    m4.metric("Realized Gain", f"{currency_symbol}{summary['realized_gain']:,.0f}")
+
+    tab1, tab2 = st.tabs(["Open Lots", "Realized"])
+    with tab1:
+        st.dataframe(
+            lots_df[lots_df["open_units"] > 0],
+            hide_index=True,
+            use_container_width=True,
+            column_config={"vest_date": st.column_config.DateColumn("Vest Date", format="YYYY-MM-DD")}
+        )
+    with tab2:
+        if realized_df.empty:
+            st.caption("No sales recorded yet.")
+        else:
+            st.dataframe(realized_df, hide_index=True, use_container_width=True)
+
+def render_sale_form(lots_df, default_price):
+    """
+    Renders the form to record a share sale.
+    Returns (clicked, sale_date, units, price, lot_ids)
+    """
+    with st.expander("➖ Record a Sale"):
+        c1, c2, c3 = st.columns(3)
+        sale_date = c1.date_input("Sale Date", value=datetime.now().date())
+        units = c2.number_input("Units Sold", min_value=0.0, step=1.0)
+        price = c3.number_input("Sale Price", min_value=0.0, value=float(default_price or 0.0), format="%.2f")
+
+        open_lots = lots_df.loc[lots_df["open_units"] > 0, "lot_id"].tolist()
+        lot_ids = st.multiselect(
+            "Specific lots (optional)",
+            options=open_lots,
+            help="Leave empty to sell the oldest lots first (FIFO)."
+        )
+
+        if st.button("Record Sale", type="primary"):
+            return True, sale_date, units, price, lot_ids
+
+    return False, None, None, None, None
+
+def render_watchlist(quotes):
+    """Renders a compact table of quotes for the watchlist tickers."""
+    import pandas as pd
+    rows = []
+    for ticker, quote in quotes.items():
+        if quote is None:
+            rows.append({"Ticker": ticker, "Name": "Unavailable", "Price": None, "Change %": None})
+            continue
+
+        price = quote.get('price')
+        prev_close = quote.get('previous_close')
+        change_pct = None
+        if price and prev_close:
+            change_pct = (price - prev_close) / prev_close * 100
+        rows.append({
+            "Ticker": ticker,
+            "Name": quote.get('name', ticker),
+            "Price": price,
+            "Change %": change_pct
+        })
+
+    st.dataframe(
+        pd.DataFrame(rows),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Price": st.column_config.NumberColumn("Price", format="%.2f"),
+            "Change %": st.column_config.NumberColumn("Change %", format="%+.2f%%")
+        }
+    )
+
+def render_stock_visualizations(df, valuation_df=None, currency_symbol="$"):
     """Renders the charts and data table for the stocks page."""
     tab1, tab2 = st.tabs(["📊 Charts", "📄 Data"])
 
     with tab1:
+        if valuation_df is not None and not valuation_df.empty:
+            st.subheader(f"Daily Vested vs Unvested Value (after tax, {currency_symbol})")
+            st.area_chart(
+                valuation_df.rename(columns={
+                    "vested_value_after_tax": "Vested",
+                    "unvested_value_after_tax": "Unvested"
+                }),
+                x="Date",
+                y=["Vested", "Unvested"]
+            )
+
         st.subheader("Cumulative Net Value Over Time")
         st.line_chart(df, x="Date", y="Total_Vested_after_tax")
         